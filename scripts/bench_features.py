@@ -0,0 +1,66 @@
+"""
+Throughput de FeatureEngineering: camino fila a fila (compute_features sobre
+entidades) frente al camino columnar vectorizado (compute_features_columnar).
+
+Uso:
+    python -m scripts.bench_features --rows 1e5 1e6 1e7 --row-by-row-max 1e5
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.domain.entities import EnviosCliente, Transaccion
+from src.features.feature_engineering import FeatureEngineering
+
+
+def synthetic_columns(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n_clients = max(1, n_rows // 20)
+    client_id = pd.Series(rng.integers(0, n_clients, n_rows)).astype(str).to_numpy(dtype=object)
+    sent_at = np.datetime64("2025-01-01T00:00:00", "s") + rng.integers(0, 180 * 86400, n_rows).astype("timedelta64[s]")
+    delay = rng.exponential(300, n_rows).astype("timedelta64[s]")
+    response_at = np.where(rng.random(n_rows) < 0.6, sent_at + delay, np.datetime64("NaT"))
+    status = rng.choice(np.array(["approved", "alert", "declined"], dtype=object), n_rows)
+    return client_id, sent_at, response_at, status
+
+
+def to_entities(client_id, sent_at, response_at, status):
+    envios = []
+    for i, (c, s, r, st) in enumerate(zip(client_id, sent_at.tolist(), response_at.tolist(), status)):
+        envios.append(EnviosCliente(
+            envio_id=str(i), client_id=c, sent_at=s, response_at=r,
+            transaction=Transaccion(str(i), c, 0.0, st, s),
+        ))
+    return envios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e5, 1e6, 1e7])
+    parser.add_argument("--row-by-row-max", type=float, default=1e5,
+                        help="Tamaño máximo para medir también el camino fila a fila")
+    args = parser.parse_args()
+
+    print(f"{'filas':>10} {'columnar (s)':>13} {'filas/s':>12} {'fila a fila (s)':>16} {'speedup':>8}")
+    for n in (int(r) for r in args.rows):
+        columns = synthetic_columns(n)
+
+        t0 = time.perf_counter()
+        FeatureEngineering.compute_features_columnar(*columns)
+        t_columnar = time.perf_counter() - t0
+
+        t_rows, speedup = "-", "-"
+        if n <= args.row_by_row_max:
+            envios = to_entities(*columns)
+            t0 = time.perf_counter()
+            FeatureEngineering.compute_features(envios)
+            elapsed = time.perf_counter() - t0
+            t_rows, speedup = f"{elapsed:.3f}", f"{elapsed / t_columnar:.0f}x"
+
+        print(f"{n:>10} {t_columnar:>13.3f} {n / t_columnar:>12,.0f} {t_rows:>16} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
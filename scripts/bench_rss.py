@@ -0,0 +1,99 @@
+"""
+Mide la memoria por worker al cargar el modelo en N procesos simultáneos,
+como lo haría uvicorn --workers N.
+
+Modos:
+    pickle  motor sklearn: cada proceso deserializa su propia copia del modelo.
+    flat    motor flat sin mmap: arrays .npy copiados al heap de cada proceso.
+    mmap    motor flat con mmap: todos los procesos comparten las páginas.
+
+PSS (proportional set size) reparte cada página compartida entre los procesos
+que la usan, así que la suma de PSS es la memoria real del conjunto.
+
+Uso:
+    python -m scripts.bench_rss --workers 4 --modes pickle mmap
+"""
+import argparse
+import multiprocessing as mp
+from typing import Dict
+
+from src.infra.models_store import ModelStore
+
+
+def _memory_kb() -> Dict[str, int]:
+    """Rss y Pss del proceso actual (Linux, /proc/self/smaps_rollup)."""
+    values = {}
+    try:
+        with open("/proc/self/smaps_rollup", encoding="utf-8") as fh:
+            for line in fh:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key] = int(rest.split()[0])
+    except FileNotFoundError:
+        pass
+    return values
+
+
+def _worker(model_dir: str, mode: str, results, release) -> None:
+    from src.ml.inference import FraudPredictor
+
+    before = _memory_kb()
+    engine = "sklearn" if mode == "pickle" else "flat"
+    predictor = FraudPredictor(model_dir, engine=engine, mmap=(mode == "mmap"))
+    predictor.warmup()
+    after = _memory_kb()
+    results.put({"before": before, "after": after, "engine": predictor.engine, "mmap": predictor.mmap})
+    # Mantener el proceso vivo hasta que todos midieron (las páginas siguen compartidas)
+    release.wait()
+
+
+def measure(model_dir: str, mode: str, workers: int) -> Dict[str, float]:
+    ctx = mp.get_context("spawn")
+    results, release = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=_worker, args=(model_dir, mode, results, release)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    samples = [results.get(timeout=120) for _ in procs]
+    release.set()
+    for p in procs:
+        p.join()
+
+    def mean(key: str, when: str) -> float:
+        return sum(s[when].get(key, 0) for s in samples) / len(samples) / 1024
+
+    return {
+        "mode": mode,
+        "engine": samples[0]["engine"],
+        "rss_mb": mean("Rss", "after"),
+        "pss_mb": mean("Pss", "after"),
+        "model_rss_mb": mean("Rss", "after") - mean("Rss", "before"),
+        "model_pss_mb": mean("Pss", "after") - mean("Pss", "before"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS/PSS por worker según el formato de carga del modelo")
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", choices=["pickle", "flat", "mmap"], default=["pickle", "flat", "mmap"])
+    args = parser.parse_args()
+
+    store = ModelStore(args.model_dir)
+    if not store.has_flat_model():
+        # Versiones guardadas antes del formato plano: se exporta una vez
+        if not store.save_flat_model(store.load_model()):
+            print("El modelo activo no es un bosque de árboles; solo se mide el modo pickle.")
+            args.modes = ["pickle"]
+
+    print(f"versión={store.current_version()} workers={args.workers}")
+    print(f"{'modo':>8} {'motor':>8} {'RSS/worker':>11} {'PSS/worker':>11} {'modelo RSS':>11} {'modelo PSS':>11} {'PSS total':>10}")
+    for mode in args.modes:
+        r = measure(args.model_dir, mode, args.workers)
+        print(
+            f"{r['mode']:>8} {r['engine']:>8} {r['rss_mb']:>9.1f}MB {r['pss_mb']:>9.1f}MB "
+            f"{r['model_rss_mb']:>9.1f}MB {r['model_pss_mb']:>9.1f}MB {r['pss_mb'] * args.workers:>8.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
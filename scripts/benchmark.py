@@ -0,0 +1,273 @@
+"""
+Suite de benchmarks reproducible con datos sintéticos (SyntheticDataGenerator).
+
+Mide:
+    features.compute_features        camino fila a fila sobre entidades
+    features.compute_features_frame  camino columnar (compute_features_from_frame)
+    features.from_payload            latencia p50/p99 de compute_features_from_payload
+    features.encode_payload          latencia p50/p99 de FeatureEncoder.encode (camino rápido de predict)
+    train.execute                    tiempo total y memoria pico de TrainModelUseCase.execute
+    predict.<motor>                  p50/p99 de FraudPredictor.predict y throughput de predict_batch
+    api.predict                      p50/p99 de POST /predict de punta a punta (TestClient)
+
+Los resultados se guardan en JSON. Con --compare se contrastan contra una
+corrida anterior y el script termina con código 1 si alguna métrica empeora
+más que --tolerance.
+
+Uso:
+    python -m scripts.benchmark --rows 200000 --output bench.json
+    python -m scripts.benchmark --rows 200000 --compare bench.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.infra.synthetic_data import SyntheticDataGenerator
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+# --- Utilidades de medición ---
+def latency_stats(samples_s: List[float]) -> Dict[str, float]:
+    ms = np.asarray(samples_s) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def time_calls(fn: Callable[[Any], Any], inputs: List[Any], warmup: int = 20) -> Dict[str, float]:
+    for item in inputs[:warmup]:
+        fn(item)
+    samples = []
+    for item in inputs:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return latency_stats(samples)
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (FileNotFoundError, ValueError):
+        # ru_maxrss está en KB en Linux: es el pico del proceso, no el actual
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class PeakRSS:
+    """Muestrea el RSS en un hilo aparte mientras dura el bloque (sin trazar allocations)."""
+
+    def __init__(self, interval_s: float = 0.01) -> None:
+        self.interval_s = interval_s
+        self.start_mb = self.peak_mb = 0.0
+        self._stop = threading.Event()
+
+    def __enter__(self) -> "PeakRSS":
+        self.start_mb = self.peak_mb = _rss_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.peak_mb = max(self.peak_mb, _rss_mb())
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, _rss_mb())
+
+
+# --- Benchmarks ---
+def bench_features(generator: SyntheticDataGenerator, rows: int, row_by_row_max: int) -> Dict[str, Any]:
+    from src.features.feature_encoder import FeatureEncoder
+    from src.features.feature_engineering import FeatureEngineering
+
+    frame = generator.envios_frame(rows)
+    started = time.perf_counter()
+    FeatureEngineering.compute_features_from_frame(frame)
+    columnar_s = time.perf_counter() - started
+    results = {"compute_features_frame": {"rows": rows, "wall_s": columnar_s, "rows_per_s": rows / columnar_s}}
+
+    n_entities = min(rows, row_by_row_max)
+    entities = generator.to_entities(frame.iloc[:n_entities])
+    started = time.perf_counter()
+    FeatureEngineering.compute_features(entities)
+    rows_s = time.perf_counter() - started
+    results["compute_features"] = {"rows": n_entities, "wall_s": rows_s, "rows_per_s": n_entities / rows_s}
+
+    payloads = generator.payloads(1000)
+    results["from_payload"] = time_calls(FeatureEngineering.compute_features_from_payload, payloads)
+    results["encode_payload"] = time_calls(FeatureEncoder().encode, payloads)
+    return results
+
+
+def bench_train(generator: SyntheticDataGenerator, rows: int, n_estimators: int, model_dir: str) -> Dict[str, Any]:
+    from src.infra.models_store import ModelStore
+    from src.usecases.train_model import TrainModelUseCase
+
+    frame = generator.envios_frame(rows)
+    usecase = TrainModelUseCase(ModelStore(model_dir), n_estimators=n_estimators)
+    with PeakRSS() as memory:
+        started = time.perf_counter()
+        metrics = usecase.execute(frame)
+        wall_s = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "n_estimators": n_estimators,
+        "wall_s": wall_s,
+        "peak_rss_mb": memory.peak_mb,
+        "peak_rss_delta_mb": memory.peak_mb - memory.start_mb,
+        "roc_auc": metrics["roc_auc"],
+    }
+
+
+def bench_predict(payloads: List[Dict[str, Any]], model_dir: str, batch_size: int) -> Dict[str, Any]:
+    from src.ml.inference import FraudPredictor
+
+    results = {}
+    for engine in FraudPredictor.ENGINES:
+        predictor = FraudPredictor(model_dir, engine=engine)
+        predictor.warmup()
+        stats = time_calls(predictor.predict, payloads)
+
+        batch = (payloads * (batch_size // len(payloads) + 1))[:batch_size]
+        predictor.predict_batch(batch)
+        started = time.perf_counter()
+        predictor.predict_batch(batch)
+        elapsed = time.perf_counter() - started
+        stats.update(batch_size=batch_size, batch_rows_per_s=batch_size / elapsed)
+        results[predictor.engine] = stats
+    return results
+
+
+def bench_api(payloads: List[Dict[str, Any]], model_dir: str) -> Dict[str, Any]:
+    # La API lee MODEL_PATH al importarse: se apunta al modelo recién entrenado
+    os.environ["MODEL_PATH"] = str(Path(model_dir) / "model.pkl")
+    from fastapi.testclient import TestClient
+    from src.entrypoints import api
+
+    with TestClient(api.app) as client:
+        deadline = time.monotonic() + 60
+        while client.get("/readyz").status_code != 200:
+            if time.monotonic() > deadline:
+                raise RuntimeError("La API no quedó lista en 60 s")
+            time.sleep(0.05)
+        return {"predict": time_calls(lambda p: client.post("/predict", json=p).raise_for_status(), payloads)}
+
+
+# --- Comparación ---
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compara métricas con el mismo nombre. Tiempos (_ms, _s) empeoran si
+    suben; throughput (_per_s) si baja.
+
+    Returns:
+        List[str]: Descripción de cada regresión encontrada.
+    """
+    regressions = []
+
+    def walk(cur: Any, base: Any, path: str) -> None:
+        if isinstance(cur, dict) and isinstance(base, dict):
+            for key in cur.keys() & base.keys():
+                walk(cur[key], base[key], f"{path}.{key}" if path else key)
+            return
+        if not isinstance(cur, (int, float)) or not isinstance(base, (int, float)) or base == 0:
+            return
+        change = (cur - base) / base
+        if path.endswith("_per_s"):
+            worse = change < -tolerance
+        elif path.endswith(("_ms", "_s")):
+            worse = change > tolerance
+        else:
+            return
+        if worse:
+            regressions.append(f"{path}: {base:.4g} -> {cur:.4g} ({change:+.0%})")
+
+    walk(current.get("results", {}), baseline.get("results", {}), "")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=float, default=2e5, help="Filas sintéticas para features y entrenamiento")
+    parser.add_argument("--row-by-row-max", type=float, default=5e4, help="Máximo de filas para el camino fila a fila")
+    parser.add_argument("--fraud-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--latency-samples", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--skip", nargs="*", default=[], choices=["features", "train", "predict", "api"])
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    parser.add_argument("--compare", default=None, help="JSON de una corrida anterior")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Empeoramiento relativo tolerado")
+    args = parser.parse_args()
+
+    rows = int(args.rows)
+    generator = SyntheticDataGenerator(fraud_ratio=args.fraud_ratio, seed=args.seed)
+    payloads = generator.payloads(args.latency_samples)
+    model_dir = tempfile.mkdtemp(prefix="bench_models_")
+
+    results: Dict[str, Any] = {}
+    if "features" not in args.skip:
+        results["features"] = bench_features(generator, rows, int(args.row_by_row_max))
+    # El entrenamiento siempre corre: predict y api necesitan el modelo
+    results["train"] = bench_train(generator, rows, args.n_estimators, model_dir)
+    if "train" in args.skip:
+        results.pop("train")
+    if "predict" not in args.skip:
+        results["predict"] = bench_predict(payloads, model_dir, args.batch_size)
+    if "api" not in args.skip:
+        results["api"] = bench_api(payloads, model_dir)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.tolerance)
+        if regressions:
+            print(f"Regresiones (tolerancia {args.tolerance:.0%}):", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Sin regresiones respecto de {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
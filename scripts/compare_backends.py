@@ -0,0 +1,104 @@
+"""
+Compara los backends de entrenamiento (random_forest y lightgbm) sobre el
+mismo dataset sintético y el mismo split train/test.
+
+Por backend reporta: tiempo de entrenamiento (etapa fit), tamaño del
+artefacto en disco, latencia p50/p99 de FraudPredictor.predict, throughput
+de predict_batch y ROC AUC sobre el holdout.
+
+Uso:
+    python -m scripts.compare_backends --rows 200000 --n-estimators 200
+    python -m scripts.compare_backends --rows 50000 --output backends.json
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from scripts.benchmark import time_calls
+from src.infra.models_store import ModelStore
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.ml.inference import FraudPredictor
+from src.usecases.train_model import TrainModelUseCase
+
+
+def _dir_size_mb(path: Path) -> float:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / 2**20
+
+
+def compare_backend(
+    backend: str,
+    frame: Any,
+    payloads: List[Dict[str, Any]],
+    n_estimators: int,
+    batch_size: int,
+    engine: str,
+) -> Dict[str, Any]:
+    store = ModelStore(tempfile.mkdtemp(prefix=f"backend_{backend}_"))
+    # Mismo random_state y test_size: los dos backends ven el mismo split
+    metrics = TrainModelUseCase(store, n_estimators=n_estimators, backend=backend).execute(frame)
+    version_dir = store.version_dir(metrics["version"])
+
+    predictor = FraudPredictor(str(store.base_dir), engine=engine)
+    predictor.warmup()
+    stats = time_calls(predictor.predict, payloads)
+
+    batch = (payloads * (batch_size // len(payloads) + 1))[:batch_size]
+    predictor.predict_batch(batch)
+    started = time.perf_counter()
+    predictor.predict_batch(batch)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "engine": predictor.engine,
+        "fit_s": metrics["stage_seconds"]["fit"],
+        "model_pkl_mb": (version_dir / "model.pkl").stat().st_size / 2**20,
+        "artifact_mb": _dir_size_mb(version_dir),
+        "predict_p50_ms": stats["p50_ms"],
+        "predict_p99_ms": stats["p99_ms"],
+        "batch_rows_per_s": batch_size / elapsed,
+        "roc_auc": metrics["roc_auc"],
+    }
+
+
+def print_table(results: Dict[str, Dict[str, Any]]) -> None:
+    columns = ["engine", "fit_s", "model_pkl_mb", "artifact_mb", "predict_p50_ms", "predict_p99_ms",
+               "batch_rows_per_s", "roc_auc"]
+    print(f"{'backend':<14}" + "".join(f"{c:>17}" for c in columns))
+    for backend, row in results.items():
+        cells = (f"{row[c]:>17.4g}" if isinstance(row[c], float) else f"{row[c]:>17}" for c in columns)
+        print(f"{backend:<14}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=float, default=1e5, help="Filas sintéticas de entrenamiento")
+    parser.add_argument("--fraud-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--latency-samples", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--backends", nargs="*", default=list(TrainModelUseCase.BACKENDS),
+                        choices=TrainModelUseCase.BACKENDS)
+    parser.add_argument("--engine", choices=FraudPredictor.ENGINES, default="flat",
+                        help="Motor de inferencia; LightGBM usa siempre su Booster nativo")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    generator = SyntheticDataGenerator(fraud_ratio=args.fraud_ratio, seed=args.seed)
+    frame = generator.envios_frame(int(args.rows))
+    payloads = generator.payloads(args.latency_samples)
+
+    results = {
+        backend: compare_backend(backend, frame, payloads, args.n_estimators, args.batch_size, args.engine)
+        for backend in args.backends
+    }
+    print_table(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"args": vars(args), "results": results}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
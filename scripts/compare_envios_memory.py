@@ -0,0 +1,74 @@
+"""
+Memoria de los envíos en memoria antes del feature engineering: lista de
+EnviosCliente (con su Transaccion anidada, como fetch_as_entities) frente a
+EnviosBatch (columnas tipadas de NumPy, client_id y status categóricos).
+
+Mide con tracemalloc (NumPy reporta sus buffers) la memoria retenida por
+cada representación y el pico al construirla, y el tiempo de
+FeatureEngineering.compute_features sobre cada una.
+
+Uso:
+    python -m scripts.compare_envios_memory --rows 1000000 --clients 50000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from src.domain.envios_batch import EnviosBatch
+from src.features.feature_engineering import FeatureEngineering
+from src.infra.synthetic_data import SyntheticDataGenerator
+
+
+def measure(build: Callable[[], Any]) -> Dict[str, Any]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    envios = build()
+    build_s = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    FeatureEngineering.compute_features(envios)
+    features_s = time.perf_counter() - started
+    return {
+        "rows": len(envios),
+        "retained_mb": retained / 2**20,
+        "peak_mb": peak / 2**20,
+        "bytes_per_row": retained / max(1, len(envios)),
+        "build_s": build_s,
+        "features_s": features_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Guardar el resultado en JSON")
+    args = parser.parse_args()
+
+    frame = SyntheticDataGenerator(seed=args.seed, n_clients=args.clients).envios_frame(args.rows)
+    results = {
+        "entities": measure(lambda: SyntheticDataGenerator.to_entities(frame)),
+        "batch": measure(lambda: EnviosBatch.from_frame(frame)),
+    }
+    results["ratio_retained"] = results["entities"]["retained_mb"] / max(results["batch"]["retained_mb"], 1e-9)
+
+    print(f"{'':10s} {'retenido MB':>12s} {'pico MB':>10s} {'bytes/fila':>11s} {'armado s':>9s} {'features s':>11s}")
+    for name in ("entities", "batch"):
+        r = results[name]
+        print(f"{name:10s} {r['retained_mb']:12.1f} {r['peak_mb']:10.1f} {r['bytes_per_row']:11.0f} "
+              f"{r['build_s']:9.2f} {r['features_s']:11.2f}")
+    print(f"EnviosBatch ocupa {results['ratio_retained']:.1f}x menos memoria que la lista de entidades")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
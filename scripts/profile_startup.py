@@ -0,0 +1,77 @@
+"""
+Reporte de tiempo de arranque de la API.
+
+1. Import: ejecuta `python -X importtime -c "import <módulo>"` en un proceso
+   limpio y lista los módulos con mayor tiempo acumulado.
+2. Carga del modelo (--load-model): mide la fase explícita load_model()
+   que la API ejecuta en segundo plano antes de responder /readyz.
+
+Con --budget-ms el script termina con código 1 si el import supera el
+presupuesto, para detectar regresiones de arranque en CI.
+
+Uso:
+    python -m scripts.profile_startup --top 15 --load-model --budget-ms 1500
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_profile(module: str) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """
+    Returns:
+        Tuple: (tiempo total de import en ms, [(módulo, propio_ms, acumulado_ms), ...]).
+    """
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    total_ms = next((cum for name, _, cum in rows if name == module), wall_ms)
+    return total_ms, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de tiempo de arranque (imports y carga del modelo)")
+    parser.add_argument("--module", default="src.entrypoints.api")
+    parser.add_argument("--top", type=int, default=15, help="Módulos a mostrar, por tiempo acumulado")
+    parser.add_argument("--load-model", action="store_true", help="Medir también load_model()")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Falla si el import supera este tiempo")
+    args = parser.parse_args()
+
+    total_ms, rows = import_profile(args.module)
+    print(f"import {args.module}: {total_ms:.0f} ms")
+    print(f"{'acumulado':>10} {'propio':>8}  módulo")
+    for name, self_ms, cumulative_ms in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_ms:>8.1f}ms {self_ms:>6.1f}ms  {name}")
+    heavy = [m for m in ("pandas", "sklearn", "scipy") if any(name == m for name, _, _ in rows)]
+    print(f"módulos pesados importados: {', '.join(heavy) or 'ninguno'}")
+
+    if args.load_model:
+        from src.entrypoints import api
+
+        started = time.perf_counter()
+        api.load_model()
+        print(f"load_model (carga + warmup): {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"(versión {api.model_manager.predictor.version}, motor {api.model_manager.predictor.engine})")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"ERROR: el import supera el presupuesto de {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
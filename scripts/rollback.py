@@ -0,0 +1,26 @@
+import argparse
+
+from src.infra.models_store import ModelStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cambia la versión activa del modelo (puntero CURRENT)")
+    parser.add_argument("--to", default=None, help="Versión a activar (por defecto la anterior a la activa)")
+    parser.add_argument("--list", action="store_true", help="Solo listar versiones disponibles")
+    parser.add_argument("--model-dir", default="models")
+    args = parser.parse_args()
+
+    store = ModelStore(args.model_dir)
+    current = store.current_version()
+    if args.list:
+        for version in store.list_versions():
+            print(f"{'*' if version == current else ' '} {version}")
+        return
+
+    version = store.rollback(args.to)
+    print(f"Versión activa: {current} -> {version}")
+    print("Las APIs en ejecución cargan la nueva versión en segundo plano (MODEL_POLL_INTERVAL_S).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Re-scoring masivo de envíos históricos con el modelo activo (o --version).
+
+Lee envios_cliente por bloques paginados por id, calcula las features de
+cada bloque con los agregados por cliente de todo el rango, puntúa los
+bloques en un pool de procesos (modelo cargado una vez por worker) y los
+escribe en la tabla predicciones (COPY en PostgreSQL). Después de cada bloque
+se guarda un checkpoint: si el job se corta, se retoma con --run-id.
+
+Uso:
+    python -m scripts.score --sent-from 2025-01-01 --workers 8
+    python -m scripts.score --run-id <run_id>      # retomar una corrida
+"""
+import argparse
+import json
+import logging
+from datetime import datetime
+
+from src.infra.config import get_settings
+from src.infra.models_store import ModelStore
+from src.infra.repository_postgres import EnviosRepository, PredictionsRepository
+from src.infra.scoring_checkpoint import ScoringCheckpointStore
+from src.ml.inference import FraudPredictor
+from src.usecases.bulk_score import BulkScoringUseCase
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sent-from", type=datetime.fromisoformat, default=None,
+                        help="Solo envíos con sent_at >= esta fecha (ISO)")
+    parser.add_argument("--sent-to", type=datetime.fromisoformat, default=None,
+                        help="Solo envíos con sent_at < esta fecha (ISO)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos del pool (por defecto uno por CPU; 0 = sin pool)")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Envíos por bloque")
+    parser.add_argument("--engine", choices=FraudPredictor.ENGINES, default="sklearn")
+    parser.add_argument("--version", default=None, help="Versión del modelo (por defecto la activa)")
+    parser.add_argument("--run-id", default=None, help="Corrida a retomar desde su checkpoint")
+    parser.add_argument("--max-chunks", type=int, default=None,
+                        help="Cortar después de esta cantidad de bloques (retomable con --run-id)")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="Carpeta de checkpoints (por defecto models/scoring_checkpoints)")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+    settings = get_settings()
+
+    repository = EnviosRepository()
+    usecase = BulkScoringUseCase(
+        repository=repository,
+        predictions=PredictionsRepository(repository.engine),
+        model_store=ModelStore(str(settings.MODEL_DIR)),
+        checkpoints=ScoringCheckpointStore(args.checkpoint_dir),
+        threshold=settings.THRESHOLD,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        engine=args.engine,
+        version=args.version,
+    )
+    summary = usecase.execute(args.sent_from, args.sent_to, run_id=args.run_id, max_chunks=args.max_chunks)
+    print(json.dumps(summary, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
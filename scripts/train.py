@@ -1,27 +1,163 @@
+import argparse
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from src.features.feature_engineering import FeatureEngineering
+from src.infra.config import get_settings
 from src.infra.repository_postgres import EnviosRepository
+from src.ml.compaction import CompactionConfig
 from src.usecases.train_model import TrainModelUseCase
 from src.infra.models_store import ModelStore
+from src.infra.training_state import TrainingStateStore
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Entrenamiento del modelo de fraude/comportamiento")
+    parser.add_argument(
+        "--source", choices=["entities", "stream", "columnar", "batch", "pushdown"], default="entities",
+        help="entities: lista completa de entidades; stream: entidades leídas por bloques "
+             "con cursor del servidor; columnar: DataFrames por bloque sin objetos por fila; "
+             "batch: EnviosBatch con columnas tipadas y categóricas (menor memoria); "
+             "pushdown: agregados por cliente calculados en SQL más una proyección mínima por envío",
+    )
+    parser.add_argument(
+        "--backend", choices=TrainModelUseCase.BACKENDS, default="random_forest",
+        help="Algoritmo del modelo: random_forest (sklearn) o lightgbm (boosting por histogramas)",
+    )
+    parser.add_argument("--compact", action="store_true",
+                        help="Guardar además una versión compactada del bosque (queda activa) con reporte "
+                             "de fidelidad frente al modelo completo")
+    parser.add_argument("--compact-trees", type=int, default=50, help="Con --compact: árboles del modelo compacto")
+    parser.add_argument("--compact-depth", type=int, default=None, help="Con --compact: profundidad máxima")
+    parser.add_argument("--compact-selection", choices=CompactionConfig.SELECTIONS, default="contribution",
+                        help="Con --compact: cómo elegir los árboles (o destilar en un bosque nuevo)")
+    parser.add_argument("--point-in-time", action="store_true",
+                        help="Agregar features por cliente en ventanas de 1h/24h/7d calculadas a la fecha de "
+                             "cada envío (sin información futura); en la API requiere ROLLING_FEATURES_ENABLED")
+    parser.add_argument("--chunk-size", type=int, default=EnviosRepository.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--sent-from", type=datetime.fromisoformat, default=None,
+                        help="Solo envíos con sent_at >= esta fecha (ISO)")
+    parser.add_argument("--sent-to", type=datetime.fromisoformat, default=None,
+                        help="Solo envíos con sent_at < esta fecha (ISO)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Leer solo envíos posteriores al watermark guardado y combinarlos "
+                             "con los agregados en disco (usa lectura columnar)")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Con --incremental: ignorar el estado guardado y recalcular todo")
+    parser.add_argument("--state-dir", default=None,
+                        help="Carpeta del estado incremental (por defecto models/training_state)")
+    parser.add_argument("--lookback-hours", type=float, default=168.0,
+                        help="Con --incremental: horas de envíos recientes que se releen en cada corrida "
+                             "(respuestas y cargas tardías); debe cubrir la demora máxima de respuesta")
+    parser.add_argument("--max-rows", type=int, default=None,
+                        help="Con --incremental: máximo de envíos (los más recientes) en la matriz de "
+                             "entrenamiento; los agregados por cliente siguen cubriendo todo el historial")
+    parser.add_argument("--warm-start", action="store_true",
+                        help="Agregar árboles al modelo activo entrenados con los envíos del rango "
+                             "--sent-from/--sent-to (datos recientes) en lugar de reentrenar todo")
+    parser.add_argument("--new-trees", type=int, default=50, help="Con --warm-start: árboles nuevos")
+    parser.add_argument("--max-trees", type=int, default=None,
+                        help="Con --warm-start: tamaño máximo del bosque (se quitan los más antiguos)")
+    parser.add_argument("--no-compare", action="store_true",
+                        help="Con --warm-start: no entrenar el bosque completo de comparación")
+    args = parser.parse_args()
+    if args.point_in_time and (args.source == "pushdown" or args.incremental or args.warm_start):
+        parser.error("--point-in-time necesita los envíos completos: no aplica a --source pushdown, "
+                     "--incremental ni --warm-start")
+    return args
 
 
 def main():
+    args = parse_args()
     print(">>> Iniciando entrenamiento del modelo de fraude/comportamiento")
 
     # --- Repositorio (infraestructura) ---
     repo = EnviosRepository()
-    envios_entities = repo.fetch_as_entities()
-    print(f"Datos cargados: {len(envios_entities)} registros")
+    settings = get_settings()
+    # Mismo registro que lee la API (MODEL_PATH)
+    model_store = ModelStore(str(settings.MODEL_DIR))
+    compaction = None
+    if args.compact:
+        compaction = CompactionConfig(
+            n_trees=args.compact_trees, selection=args.compact_selection, max_depth=args.compact_depth
+        )
+    trainer = TrainModelUseCase(
+        model_store=model_store, backend=args.backend, compaction=compaction, threshold=settings.THRESHOLD,
+        point_in_time=args.point_in_time,
+    )
+
+    if args.incremental:
+        state_store = TrainingStateStore(args.state_dir)
+        watermark = None if args.full_rebuild else state_store.load().watermark
+        print(f"Watermark actual: {watermark}")
+        envios = repo.fetch_frame(
+            args.chunk_size, args.sent_from, args.sent_to,
+            sent_after=watermark.to_pydatetime() if watermark is not None else None,
+        )
+        print(f"Envíos nuevos: {len(envios)} registros")
+        metrics = trainer.execute_incremental(
+            envios, state_store, full_rebuild=args.full_rebuild,
+            lookback=pd.Timedelta(hours=args.lookback_hours), max_rows=args.max_rows,
+        )
+        print("Estado incremental:", metrics["incremental"])
+        report(metrics)
+        return
+
+    if args.warm_start:
+        envios = repo.fetch_frame(args.chunk_size, args.sent_from, args.sent_to)
+        print(f"Envíos recientes: {len(envios)} registros")
+        metrics = trainer.execute_warm_start(
+            envios, n_new_trees=args.new_trees, max_trees=args.max_trees, compare_full_refit=not args.no_compare
+        )
+        print("Warm start:", metrics["warm_start"])
+        if "full_refit" in metrics:
+            print("Comparación con reentrenamiento completo:", metrics["full_refit"])
+        report(metrics)
+        return
+
+    if args.source == "pushdown":
+        started = time.perf_counter()
+        sends, aggregates = repo.fetch_pushdown(args.chunk_size, args.sent_from, args.sent_to)
+        print(f"Datos cargados: {len(sends)} envíos, {len(aggregates)} clientes")
+        features_df = FeatureEngineering.compute_features_from_projection(sends, aggregates)
+        metrics = trainer.execute_features(features_df)
+        metrics["stage_seconds"] = {"load_and_features": time.perf_counter() - started, **metrics["stage_seconds"]}
+        report(metrics)
+        return
+
+    if args.source == "columnar":
+        envios = repo.fetch_frame(args.chunk_size, args.sent_from, args.sent_to)
+    elif args.source == "batch":
+        envios = repo.fetch_batch(args.chunk_size, args.sent_from, args.sent_to)
+    elif args.source == "stream":
+        envios = []
+        for chunk in repo.iter_entities(args.chunk_size, args.sent_from, args.sent_to):
+            envios.extend(chunk)
+    else:
+        envios = repo.fetch_as_entities(args.sent_from, args.sent_to)
+    print(f"Datos cargados: {len(envios)} registros")
 
     # --- Caso de uso ---
-    model_store = ModelStore("models")
-    trainer = TrainModelUseCase(model_store=model_store)
+    metrics = trainer.execute(envios)
+    report(metrics)
 
-    metrics = trainer.execute(envios_entities)
 
-    # --- Reporte ---
+def report(metrics):
+    print("Backend:", metrics.get("backend"), "| versión:", metrics.get("version"))
     print("ROC AUC:", metrics["roc_auc"])
     print("Reporte de clasificación:")
     print(metrics["classification_report"])
+    if "compaction" in metrics:
+        compaction = metrics["compaction"]
+        print(f"Modelo compactado: versión {compaction['version']} (desde {compaction['base_version']})")
+        print("  Fidelidad:", compaction["fidelity"])
+        print("  Tamaño:", compaction["size"])
+        print("  Latencia:", compaction["latency"])
+    stages = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in metrics.get("stage_seconds", {}).items())
+    print("Tiempo por etapa:", stages)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -154,4 +154,39 @@ VALUES
 (27, '208', 'TXN247', 'MSG247', '2025-09-16 11:20:00', '2025-09-16 11:21:00', '2025-09-16 11:25:00', 'No reconozco', 'deny', 'whatsapp', 1, 'TPL001', '{"lang":"es"}'),
 (28, '208', 'TXN248', 'MSG248', '2025-09-17 19:05:05', '2025-09-17 19:06:00', NULL, NULL, 'no_answer', 'sms', 1, 'TPL001', '{"lang":"es"}'),
 (29, '208', 'TXN249', 'MSG249', '2025-09-18 13:55:00', '2025-09-18 13:56:00', '2025-09-18 13:58:15', 'Ok, entiendo', 'other', 'whatsapp', 1, 'TPL001', '{"lang":"es"}'),
-(30, '208', 'TXN250', 'MSG250', '2025-09-19 15:15:00', '2025-09-19 15:16:00', '2025-09-19 15:18:00', 'Sí, correcto', 'confirm', 'whatsapp', 1, 'TPL001', '{"lang":"es"}');
\ No newline at end of file
+(30, '208', 'TXN250', 'MSG250', '2025-09-19 15:15:00', '2025-09-19 15:16:00', '2025-09-19 15:18:00', 'Sí, correcto', 'confirm', 'whatsapp', 1, 'TPL001', '{"lang":"es"}');
+
+-- ===========================================
+-- Predicciones (scoring masivo, scripts/score.py)
+-- ===========================================
+
+CREATE TABLE IF NOT EXISTS predicciones (
+run_id TEXT NOT NULL,                -- Corrida del job de scoring
+model_version TEXT NOT NULL,         -- Versión del ModelStore usada
+chunk_id INTEGER NOT NULL,           -- Bloque de lectura (permite retomar desde el checkpoint)
+envio_id BIGINT NOT NULL,            -- envios_cliente.id
+transaction_id TEXT,
+client_id TEXT NOT NULL,
+probability DOUBLE PRECISION NOT NULL,
+prediction TEXT NOT NULL,            -- 'fraude' | 'no_fraude'
+scored_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_predicciones_run ON predicciones(run_id, chunk_id);
+
+-- Auditoría de decisiones de /predict (escrita en lotes por WriteBehindAuditLog)
+CREATE TABLE IF NOT EXISTS auditoria_decisiones (
+decision_id TEXT PRIMARY KEY,
+logged_at TIMESTAMP NOT NULL,
+client_id TEXT,
+request_timestamp TEXT,               -- timestamp del payload
+model_version TEXT,
+probability DOUBLE PRECISION NOT NULL,
+threshold DOUBLE PRECISION NOT NULL,
+prediction TEXT NOT NULL,             -- 'fraude' | 'no_fraude'
+unusual_response_rate BOOLEAN NOT NULL,
+unusual_mean_delay BOOLEAN NOT NULL,
+payload TEXT                          -- Request completa en JSON (etiquetado posterior)
+);
+
+CREATE INDEX IF NOT EXISTS idx_auditoria_decisiones_logged_at ON auditoria_decisiones(logged_at);
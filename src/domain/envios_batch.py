@@ -0,0 +1,277 @@
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.domain.entities import EnviosCliente, Transaccion
+
+# Módulo aparte de entities.py: este tipo necesita NumPy/pandas y entities.py
+# se importa desde la API, que no carga pandas al arrancar.
+
+def _categorical(values: Any, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Valores -> (códigos, categorías); los nulos quedan con código -1."""
+    codes, categories = pd.factorize(pd.Series(values, dtype=object), sort=False)
+    return codes.astype(dtype), np.asarray(categories, dtype=str)
+
+
+def _merge_categoricals(parts: Sequence[Tuple[np.ndarray, np.ndarray]], dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatena columnas categóricas unificando las categorías, sin decodificar las filas."""
+    categories, inverse = np.unique(np.concatenate([cats for _, cats in parts]), return_inverse=True)
+    merged, offset = [], 0
+    for codes, cats in parts:
+        remap = inverse[offset:offset + len(cats)]
+        offset += len(cats)
+        merged.append(np.where(codes >= 0, remap[np.maximum(codes, 0)] if len(cats) else -1, -1).astype(dtype))
+    return np.concatenate(merged), categories
+
+
+def _datetime_column(values: Any) -> Tuple[np.ndarray, Any]:
+    """
+    Fechas (datetime, Timestamp o texto) -> (datetime64[us], zona). Con zona
+    horaria se guarda el instante en UTC y la zona aparte; si los offsets
+    están mezclados se normaliza a UTC, igual que FeatureEngineering.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    try:
+        parsed = pd.to_datetime(series)
+    except (ValueError, TypeError):
+        parsed = pd.to_datetime(series, utc=True)
+    tz = parsed.dt.tz
+    if tz is not None:
+        parsed = parsed.dt.tz_convert("UTC").dt.tz_localize(None)
+    return parsed.to_numpy(dtype="datetime64[us]"), tz
+
+
+@dataclass(eq=False)
+class EnviosBatch:
+    """
+    Lote de envíos en formato struct-of-arrays: los mismos campos que una
+    lista de EnviosCliente (con su Transaccion) guardados como columnas
+    tipadas de NumPy. client_id, status y response_class van como códigos
+    enteros más un array de categorías.
+
+    Permite indexar y recorrer como la lista (cada fila se materializa como
+    EnviosCliente al pedirla) y se corta sin copiar (batch[a:b]).
+    transaction_id se asume igual a envio_id y Transaccion.client_id igual
+    a client_id, como arma las entidades EnviosRepository.
+    """
+
+    envio_id: np.ndarray                  # str
+    client_codes: np.ndarray              # int32 -> client_categories
+    client_categories: np.ndarray         # str
+    sent_at: np.ndarray                   # datetime64[us] (UTC si tz no es None)
+    response_at: np.ndarray               # datetime64[us], NaT sin respuesta
+    response_class_codes: np.ndarray      # int16, -1 = None
+    response_class_categories: np.ndarray
+    amount: np.ndarray                    # float64
+    status_codes: np.ndarray              # int16, -1 = sin transacción
+    status_categories: np.ndarray
+    trx_timestamp: np.ndarray             # datetime64[us], NaT sin transacción
+    tz: Any = None                        # zona horaria de las fechas (None = sin zona)
+
+    # Columnas con un valor por fila (las categorías y tz son del lote)
+    ROW_COLUMNS = (
+        "envio_id", "client_codes", "sent_at", "response_at", "response_class_codes",
+        "amount", "status_codes", "trx_timestamp",
+    )
+
+    # --- Construcción ---
+    @classmethod
+    def empty(cls) -> "EnviosBatch":
+        return cls.from_columns([], [], [], [], [], [], [], [])
+
+    @classmethod
+    def from_columns(
+        cls,
+        envio_id: Any,
+        client_id: Any,
+        sent_at: Any,
+        response_at: Any,
+        response_class: Any,
+        amount: Any,
+        status: Any,
+        trx_timestamp: Any,
+    ) -> "EnviosBatch":
+        """
+        Una columna por campo (arrays, listas o Series del mismo largo).
+
+        Raises:
+            ValueError: Si unas columnas de fechas tienen zona horaria y otras no
+                        (el lote guarda una sola zona para todas).
+        """
+        client_codes, client_categories = _categorical(client_id, "int32")
+        response_class_codes, response_class_categories = _categorical(response_class, "int16")
+        status_codes, status_categories = _categorical(status, "int16")
+        sent, tz = _datetime_column(sent_at)
+        response, response_tz = _datetime_column(response_at)
+        trx, trx_tz = _datetime_column(trx_timestamp)
+        # Las columnas sin ningún valor (p. ej. sin respuestas) no fijan zona
+        dated = {
+            name: zone for name, values, zone in
+            (("sent_at", sent, tz), ("response_at", response, response_tz), ("trx_timestamp", trx, trx_tz))
+            if not np.isnat(values).all()
+        }
+        if len({zone is None for zone in dated.values()}) > 1:
+            raise ValueError(f"Fechas con y sin zona horaria en el mismo lote: {dated}")
+        return cls(
+            envio_id=np.asarray(pd.Series(envio_id, dtype=object).fillna("").astype(str), dtype=str),
+            client_codes=client_codes,
+            client_categories=client_categories,
+            sent_at=sent,
+            response_at=response,
+            response_class_codes=response_class_codes,
+            response_class_categories=response_class_categories,
+            amount=pd.to_numeric(pd.Series(amount, dtype=object)).fillna(0).to_numpy(dtype=np.float64),
+            status_codes=status_codes,
+            status_categories=status_categories,
+            trx_timestamp=trx,
+            tz=tz if tz is not None else response_tz if response_tz is not None else trx_tz,
+        )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "EnviosBatch":
+        """DataFrame con las columnas de EnviosRepository.iter_frames / SyntheticDataGenerator.envios_frame."""
+        return cls.from_columns(
+            frame["transaction_id"], frame["client_id"], frame["sent_at"], frame["response_at"],
+            frame["response_class"], frame["amount"], frame["status"], frame["trx_timestamp"],
+        )
+
+    @classmethod
+    def from_entities(cls, envios: Sequence[EnviosCliente]) -> "EnviosBatch":
+        transactions = [e.transaction for e in envios]
+        return cls.from_columns(
+            [e.envio_id for e in envios],
+            [e.client_id for e in envios],
+            [e.sent_at for e in envios],
+            [e.response_at for e in envios],
+            [e.response_class for e in envios],
+            [t.amount if t is not None else 0.0 for t in transactions],
+            [t.status if t is not None else None for t in transactions],
+            [t.timestamp if t is not None else None for t in transactions],
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable["EnviosBatch"]) -> "EnviosBatch":
+        """Une lotes (p. ej. los bloques de EnviosRepository.iter_batches) unificando categorías."""
+        batches = list(batches)
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        zones = {str(b.tz) for b in batches if len(b)}
+        if len(zones) > 1:
+            raise ValueError(f"Lotes con zonas horarias distintas: {sorted(zones)}")
+        client_codes, client_categories = _merge_categoricals(
+            [(b.client_codes, b.client_categories) for b in batches], "int32"
+        )
+        response_class_codes, response_class_categories = _merge_categoricals(
+            [(b.response_class_codes, b.response_class_categories) for b in batches], "int16"
+        )
+        status_codes, status_categories = _merge_categoricals(
+            [(b.status_codes, b.status_categories) for b in batches], "int16"
+        )
+        return cls(
+            envio_id=np.concatenate([b.envio_id for b in batches]),
+            client_codes=client_codes,
+            client_categories=client_categories,
+            sent_at=np.concatenate([b.sent_at for b in batches]),
+            response_at=np.concatenate([b.response_at for b in batches]),
+            response_class_codes=response_class_codes,
+            response_class_categories=response_class_categories,
+            amount=np.concatenate([b.amount for b in batches]),
+            status_codes=status_codes,
+            status_categories=status_categories,
+            trx_timestamp=np.concatenate([b.trx_timestamp for b in batches]),
+            tz=next((b.tz for b in batches if b.tz is not None), None),
+        )
+
+    # --- Columnas decodificadas ---
+    @staticmethod
+    def _decode(codes: np.ndarray, categories: np.ndarray) -> np.ndarray:
+        if len(categories) == 0:
+            return np.full(len(codes), None, dtype=object)
+        values = categories[np.maximum(codes, 0)]
+        if (codes < 0).any():
+            values = values.astype(object)
+            values[codes < 0] = None
+        return values
+
+    @property
+    def client_id(self) -> np.ndarray:
+        return self._decode(self.client_codes, self.client_categories)
+
+    @property
+    def status(self) -> np.ndarray:
+        """status por fila; None en los envíos sin transacción."""
+        return self._decode(self.status_codes, self.status_categories)
+
+    @property
+    def response_class(self) -> np.ndarray:
+        return self._decode(self.response_class_codes, self.response_class_categories)
+
+    def localized(self, name: str) -> pd.Series:
+        """Columna de fechas como Series en la zona original (la misma hora local que las entidades)."""
+        series = pd.Series(getattr(self, name))
+        if self.tz is not None:
+            series = series.dt.tz_localize("UTC").dt.tz_convert(self.tz)
+        return series
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, f.name).nbytes for f in fields(self) if f.name != "tz")
+
+    # --- Vista por filas ---
+    def __len__(self) -> int:
+        return len(self.envio_id)
+
+    def _datetime(self, value: np.datetime64) -> Optional[datetime]:
+        if np.isnat(value):
+            return None
+        ts = pd.Timestamp(value)
+        if self.tz is not None:
+            ts = ts.tz_localize("UTC").tz_convert(self.tz)
+        return ts.to_pydatetime()
+
+    def _row(self, i: int) -> EnviosCliente:
+        client_id = str(self.client_categories[self.client_codes[i]])
+        envio_id = str(self.envio_id[i])
+        status_code = self.status_codes[i]
+        response_class_code = self.response_class_codes[i]
+        transaction = None
+        if status_code >= 0:
+            transaction = Transaccion(
+                transaction_id=envio_id,
+                client_id=client_id,
+                amount=float(self.amount[i]),
+                status=str(self.status_categories[status_code]),
+                timestamp=self._datetime(self.trx_timestamp[i]),
+            )
+        return EnviosCliente(
+            envio_id=envio_id,
+            client_id=client_id,
+            sent_at=self._datetime(self.sent_at[i]),
+            response_at=self._datetime(self.response_at[i]),
+            response_class=str(self.response_class_categories[response_class_code]) if response_class_code >= 0 else None,
+            transaction=transaction,
+        )
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[EnviosCliente, "EnviosBatch"]:
+        if isinstance(key, slice):
+            # Vistas de los mismos arrays; las categorías se comparten
+            return EnviosBatch(**{
+                f.name: getattr(self, f.name)[key] if f.name in self.ROW_COLUMNS else getattr(self, f.name)
+                for f in fields(self)
+            })
+        n = len(self)
+        if not -n <= key < n:
+            raise IndexError("índice fuera de rango")
+        return self._row(key % n)
+
+    def __iter__(self) -> Iterator[EnviosCliente]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def to_entities(self) -> List[EnviosCliente]:
+        return list(self)
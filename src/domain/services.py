@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
 
 class PredictorService(ABC):
     @abstractmethod
@@ -9,3 +9,70 @@ class PredictorService(ABC):
         un diccionario con la predicción (prediction, probability, etc).
         """
         raise NotImplementedError
+
+    def predict_batch(self, features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Recibe una lista de payloads y devuelve una predicción por cada uno,
+        en el mismo orden. Las implementaciones que puedan vectorizar la
+        inferencia deben sobrescribirlo; por defecto delega en predict().
+        """
+        return [self.predict(f) for f in features]
+
+    def predict_columns(self, columns: Mapping[str, Sequence[Any]]) -> Sequence[float]:
+        """
+        Recibe un lote en formato columnar (nombre -> valores, todas del mismo
+        largo) y devuelve la probabilidad de fraude por fila. Por defecto arma
+        un payload por fila y delega en predict_batch().
+        """
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        payloads = [{name: values[i] for name, values in columns.items()} for i in range(n_rows)]
+        return [result["probability"] for result in self.predict_batch(payloads)]
+
+    def score(self, features: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[Any]]:
+        """
+        Como predict(), pero devuelve también lo que usó la inferencia:
+        (payload efectivo, resultado, matriz de entrada del modelo). El
+        payload efectivo incluye lo que agrega el servidor (p. ej. los
+        agregados del feature store) y es el que deben usar las reglas de
+        negocio. La matriz es None si la implementación no la expone.
+        """
+        return features, self.predict(features), None
+
+    def score_batch(
+        self, features: List[Dict[str, Any]], mode: str = "batch"
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[Any]]:
+        """
+        Versión por lote de score(): (payloads efectivos, resultados, matriz (n, n_features)).
+        mode es la etiqueta de las métricas por etapa ("batch" o "micro_batch").
+        """
+        return features, self.predict_batch(features), None
+
+    def score_columns(
+        self, columns: Mapping[str, Sequence[Any]]
+    ) -> Tuple[Mapping[str, Sequence[Any]], Sequence[float], Optional[Any]]:
+        """Versión columnar de score(): (columnas efectivas, probabilidades, matriz (n, n_features))."""
+        return columns, self.predict_columns(columns), None
+
+
+
+class DecisionAuditLog(ABC):
+    @abstractmethod
+    def record(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Registra decisiones de fraude para auditoría y etiquetado posterior.
+        Se llama en el camino de la request: no debe bloquear ni fallar por
+        problemas del almacenamiento.
+        """
+        raise NotImplementedError
+
+
+class DriftMonitor(ABC):
+    @abstractmethod
+    def record(self, inputs: Optional[Any], probabilities: Sequence[float], version: Optional[str] = None) -> None:
+        """
+        Acumula la entrada del modelo (la matriz de PredictorService.score*,
+        puede ser None) y la probabilidad de cada predicción de la versión
+        indicada. Se llama en el camino de la request: debe ser barato y con
+        memoria acotada.
+        """
+        raise NotImplementedError
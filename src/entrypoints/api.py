@@ -1,15 +1,344 @@
-from fastapi import FastAPI
-from src.usecases.schemas import PredictRequestDTO
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
+from src.entrypoints.middleware import MetricsMiddleware
+from src.usecases.schemas import ClientEventDTO, PredictRequestDTO
 from src.usecases.predict_response import PredictResponseUseCase
-from src.ml.inference import FraudPredictor
-from src.infra.config import settings
+from src.ml.model_manager import PredictorManager
+from src.infra.config import get_settings
+from src.infra.models_store import ModelStore
+from src.infra.micro_batcher import MicroBatcher
+from src.infra.admission import AdmissionController, InferenceExecutor, Overloaded
+from src.infra.audit_log import JsonlAuditWriter, SqlAuditWriter, WriteBehindAuditLog
+from src.infra.metrics import PREDICT_ERRORS, PREDICT_STAGE_SECONDS, metrics
+from src.features.online_store import ClientFeatureStore
+from src.features.rolling import RollingFeatureStore
+from src.ml.drift import StreamingDriftMonitor
+from src.ml.prediction_cache import PredictionCache, parse_quantization
 
-app = FastAPI(title="Fraud Detection API")
+logger = logging.getLogger(__name__)
 
-# Inyección de dependencias
-predictor_impl = FraudPredictor(settings.MODEL_DIR)
-usecase = PredictResponseUseCase(predictor_impl, threshold=settings.THRESHOLD)
+# Inyección de dependencias. Solo se arman objetos livianos al importar: la
+# carga del modelo (pandas, sklearn, joblib) es una fase explícita del
+# arranque, ver load_model().
+settings = get_settings()
+metrics.enabled = settings.METRICS_ENABLED
+feature_store = ClientFeatureStore(
+    max_clients=settings.FEATURE_STORE_MAX_CLIENTS,
+    snapshot_path=settings.FEATURE_STORE_SNAPSHOT_PATH,
+    snapshot_interval_s=settings.FEATURE_STORE_SNAPSHOT_INTERVAL_S,
+) if settings.FEATURE_STORE_ENABLED else None
+rolling_store = RollingFeatureStore(
+    max_clients=settings.ROLLING_FEATURES_MAX_CLIENTS
+) if settings.ROLLING_FEATURES_ENABLED else None
+prediction_cache = PredictionCache(
+    max_size=settings.PREDICTION_CACHE_MAX_SIZE,
+    ttl_s=settings.PREDICTION_CACHE_TTL_S or None,
+    quantization=parse_quantization(settings.PREDICTION_CACHE_QUANTIZATION),
+    bypass=settings.PREDICTION_CACHE_BYPASS,
+) if settings.PREDICTION_CACHE_ENABLED else None
+audit_log = WriteBehindAuditLog(
+    JsonlAuditWriter(settings.AUDIT_LOG_PATH) if settings.AUDIT_LOG_PATH
+    else SqlAuditWriter(settings.AUDIT_LOG_DATABASE_URL, pool_size=settings.AUDIT_LOG_POOL_SIZE),
+    max_queue=settings.AUDIT_LOG_QUEUE_SIZE,
+    flush_size=settings.AUDIT_LOG_FLUSH_SIZE,
+    flush_interval_s=settings.AUDIT_LOG_FLUSH_INTERVAL_S,
+    on_full=settings.AUDIT_LOG_ON_FULL,
+) if settings.AUDIT_LOG_ENABLED else None
+# El ModelStore crea directorios en su constructor: el registro de modelos, el
+# PredictorManager y el monitor de drift se arman en el arranque, ver
+# build_model_manager().
+model_manager: Optional[PredictorManager] = None
+drift_monitor: Optional[StreamingDriftMonitor] = None
+usecase: Optional[PredictResponseUseCase] = None
+# Estado del arranque para /readyz
+startup_state: Dict[str, Any] = {"ready": False, "error": None}
+# Manager que ya tiene registrado _on_swap (un único listener por manager)
+_swap_wired: Optional[PredictorManager] = None
 
-@app.post("/predict")
-def predict_endpoint(request: PredictRequestDTO):
-    return usecase.execute(request.dict())
\ No newline at end of file
+
+def build_predictor(version: Optional[str]):
+    # Import diferido: FraudPredictor arrastra pandas y el modelo
+    from src.ml.inference import FraudPredictor
+
+    return FraudPredictor(
+        settings.MODEL_DIR, engine=settings.INFERENCE_ENGINE, feature_store=feature_store, version=version,
+        mmap=settings.MODEL_MMAP, cache=prediction_cache, rolling_store=rolling_store,
+    )
+
+
+def _on_swap(predictor) -> None:
+    """Hot swap: cada versión nueva llega a la caché, al monitor de drift y al usecase."""
+    if prediction_cache is not None:
+        # Las entradas del modelo anterior ya no se consultan: se libera la memoria
+        prediction_cache.clear()
+    if drift_monitor is not None:
+        # Cada versión se compara contra su propia referencia de entrenamiento
+        drift_monitor.use_version(predictor.version)
+    if usecase is not None:
+        usecase.predictor = predictor
+
+
+def build_model_manager() -> PredictorManager:
+    """
+    Arma, una sola vez, el ModelStore, el PredictorManager y el monitor de drift,
+    y registra el listener de hot swap. Es idempotente: el lifespan y
+    load_model() pueden llamarla sin duplicar listeners.
+    """
+    global model_manager, drift_monitor, _swap_wired
+    if model_manager is None:
+        model_manager = PredictorManager(
+            ModelStore(str(settings.MODEL_DIR)), build_predictor, poll_interval_s=settings.MODEL_POLL_INTERVAL_S
+        )
+    if drift_monitor is None and settings.DRIFT_MONITOR_ENABLED:
+        drift_monitor = StreamingDriftMonitor(
+            model_manager.model_store.load_drift_reference,
+            psi_threshold=settings.DRIFT_PSI_THRESHOLD,
+            min_samples=settings.DRIFT_MIN_SAMPLES,
+        )
+    if _swap_wired is not model_manager:
+        model_manager.on_swap(_on_swap)
+        _swap_wired = model_manager
+    return model_manager
+
+
+def load_model() -> PredictResponseUseCase:
+    """
+    Carga y calienta el modelo activo (PredictorManager.load ejecuta una
+    predicción de prueba) y arma el usecase. Hasta que termina, /readyz
+    responde 503 y los endpoints de predicción también.
+    """
+    global usecase
+    try:
+        predictor = build_model_manager().load()
+        usecase = PredictResponseUseCase(
+            predictor, threshold=settings.THRESHOLD, audit=audit_log, drift=drift_monitor
+        )
+    except Exception as exc:
+        startup_state["error"] = f"{type(exc).__name__}: {exc}"
+        logger.exception("No se pudo cargar el modelo")
+        raise
+    startup_state.update(ready=True, error=None, load_seconds=model_manager.last_load_seconds)
+    return usecase
+
+
+def _ready_usecase() -> PredictResponseUseCase:
+    if usecase is None:
+        raise HTTPException(status_code=503, detail="Modelo cargándose")
+    return usecase
+
+
+# Executor dedicado a la inferencia y control de admisión de /predict: con el cupo
+# lleno se responde 429 de inmediato y cada request tiene un deadline (503)
+inference_executor = InferenceExecutor(settings.INFERENCE_WORKERS or None) if settings.ADMISSION_ENABLED else None
+admission = AdmissionController(
+    inference_executor,
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    timeout_s=settings.ADMISSION_TIMEOUT_MS / 1000.0 or None,
+    retry_after_s=settings.ADMISSION_RETRY_AFTER_S,
+) if settings.ADMISSION_ENABLED else None
+
+# Micro-batcher: agrupa los /predict concurrentes en una sola inferencia vectorizada
+batcher = MicroBatcher(
+    lambda payloads: _ready_usecase().execute_batch(payloads, mode="micro_batch"),
+    max_wait_ms=settings.BATCH_WINDOW_MS,
+    max_batch_size=settings.BATCH_MAX_SIZE,
+    executor=inference_executor,
+) if settings.BATCH_ENABLED else None
+
+
+async def _load_and_watch() -> None:
+    await run_in_threadpool(load_model)
+    model_manager.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    build_model_manager()
+    if feature_store is not None:
+        feature_store.restore()
+    if audit_log is not None:
+        audit_log.start()
+    if batcher is not None:
+        await batcher.start()
+    # El modelo se carga en segundo plano: /healthz responde de inmediato
+    loader = asyncio.create_task(_load_and_watch())
+    yield
+    if not loader.done():
+        loader.cancel()
+    model_manager.stop()
+    if batcher is not None:
+        await batcher.stop()
+    if audit_log is not None:
+        # Después del batcher: las últimas decisiones ya están encoladas
+        await run_in_threadpool(audit_log.stop)
+    if feature_store is not None:
+        feature_store.snapshot()
+
+
+app = FastAPI(title="Fraud Detection API", lifespan=lifespan)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=exc.status_code, content={"detail": "Servicio saturado", "reason": exc.reason}, headers=exc.headers
+    )
+
+
+@app.get("/healthz")
+def healthz_endpoint():
+    """Liveness: el proceso responde, aunque el modelo aún no esté listo."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz_endpoint():
+    """Readiness: modelo cargado y calentado con una predicción de prueba."""
+    if not startup_state["ready"]:
+        status = "error" if startup_state["error"] else "loading"
+        return JSONResponse(status_code=503, content={**startup_state, "status": status})
+    return {**startup_state, "status": "ready", "version": model_manager.predictor.version}
+
+async def _validate_predict_request(request: Request) -> Dict[str, Any]:
+    """Parseo y validación de PredictRequestDTO, medidos como etapa "validation"."""
+    with PREDICT_STAGE_SECONDS.time(stage="validation", mode="single"):
+        try:
+            body = await request.json()
+            return PredictRequestDTO(**body).dict()
+        except ValidationError as exc:
+            PREDICT_ERRORS.inc(stage="validation")
+            raise RequestValidationError(exc.errors())
+        except (ValueError, TypeError) as exc:
+            # JSON inválido o cuerpo que no es un objeto
+            PREDICT_ERRORS.inc(stage="validation")
+            raise RequestValidationError([{"loc": ("body",), "msg": str(exc), "type": "value_error"}])
+
+
+@app.post(
+    "/predict",
+    openapi_extra={"requestBody": {
+        "required": True, "content": {"application/json": {"schema": PredictRequestDTO.model_json_schema()}},
+    }},
+)
+async def predict_endpoint(request: Request):
+    if admission is None:
+        payload = await _validate_predict_request(request)
+        if batcher is not None and batcher.running:
+            return await batcher.submit(payload)
+        return await run_in_threadpool(_ready_usecase().execute, payload)
+
+    async def predict():
+        payload = await _validate_predict_request(request)
+        if batcher is not None and batcher.running:
+            return await batcher.submit(payload)
+        return await admission.submit(_ready_usecase().execute, payload)
+
+    # La admisión va antes de leer el cuerpo: rechazar por saturación no cuesta parseo
+    return await admission.run(predict)
+
+@app.post("/predict/batch")
+async def predict_batch_endpoint(requests: List[PredictRequestDTO]):
+    payloads = [r.dict() for r in requests]
+    if admission is None:
+        return await run_in_threadpool(_ready_usecase().execute_batch, payloads)
+    return await admission.call(_ready_usecase().execute_batch, payloads)
+
+def _score_columnar(body: bytes, content_type: str) -> Response:
+    # Import diferido: el códec columnar arrastra NumPy (y pyarrow para Arrow IPC)
+    from src.infra import columnar
+
+    try:
+        columns = columnar.decode(body, content_type)
+    except columnar.UnsupportedFormatError as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+    except columnar.ColumnarFormatError as exc:
+        PREDICT_ERRORS.inc(stage="validation")
+        raise HTTPException(status_code=422, detail=str(exc))
+    output = _ready_usecase().execute_columns(columns)
+    return Response(content=columnar.encode(output, content_type), media_type=columnar.media_type(content_type))
+
+@app.post("/predict/columnar")
+async def predict_columnar_endpoint(request: Request):
+    """
+    Lote binario columnar (npz o Arrow IPC, según Content-Type): sin pydantic
+    ni un dict por fila. Responde columnas en el mismo formato, fila por fila
+    iguales a /predict/batch.
+    """
+    content_type = request.headers.get("content-type", "")
+    if admission is None:
+        return await run_in_threadpool(_score_columnar, await request.body(), content_type)
+
+    async def score():
+        return await admission.submit(_score_columnar, await request.body(), content_type)
+
+    return await admission.run(score)
+
+@app.get("/predict/admission")
+def admission_stats_endpoint():
+    return admission.stats() if admission is not None else {"enabled": False}
+
+@app.get("/predict/batcher")
+def batcher_stats_endpoint():
+    return batcher.stats() if batcher is not None else {"enabled": False}
+
+@app.get("/predict/cache")
+def prediction_cache_endpoint():
+    return prediction_cache.stats() if prediction_cache is not None else {"enabled": False}
+
+@app.get("/audit")
+def audit_log_endpoint():
+    return audit_log.stats() if audit_log is not None else {"enabled": False}
+
+@app.get("/drift")
+def drift_endpoint():
+    """PSI/KS por feature y de la probabilidad servida contra la referencia de entrenamiento."""
+    return drift_monitor.report() if drift_monitor is not None else {"enabled": False}
+
+@app.post("/drift/reset")
+def drift_reset_endpoint():
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Monitor de drift deshabilitado (DRIFT_MONITOR_ENABLED)")
+    drift_monitor.reset()
+    return drift_monitor.report()
+
+@app.post("/events")
+def client_event_endpoint(event: ClientEventDTO):
+    if feature_store is None and rolling_store is None:
+        raise HTTPException(
+            status_code=404, detail="Feature store deshabilitado (FEATURE_STORE_ENABLED / ROLLING_FEATURES_ENABLED)"
+        )
+    if event.event == "response" and event.delay_seconds is None:
+        raise HTTPException(status_code=422, detail="delay_seconds es obligatorio para event='response'")
+    stats = {}
+    if feature_store is not None:
+        if event.event == "send":
+            feature_store.record_send(event.client_id)
+        else:
+            feature_store.record_response(event.client_id, event.delay_seconds)
+        stats = feature_store.stats()
+    if rolling_store is not None:
+        if event.event == "send":
+            rolling_store.record_send(event.client_id, event.timestamp)
+        else:
+            rolling_store.record_response(event.client_id, event.delay_seconds, event.timestamp)
+        stats = {**stats, "rolling": rolling_store.stats()}
+    return stats
+
+@app.get("/model")
+def model_status_endpoint():
+    if model_manager is None:
+        raise HTTPException(status_code=503, detail="Modelo cargándose")
+    return model_manager.status()
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Histogramas por etapa y contadores en formato de texto de Prometheus."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,38 @@
+import time
+
+from src.infra.metrics import HTTP_REQUEST_SECONDS
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide la duración de cada request HTTP. Etiqueta con
+    la plantilla de la ruta (p. ej. /predict) y no con la URL cruda, para
+    que la cantidad de series no crezca con los parámetros.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                path=getattr(route, "path", "unmatched"),
+                status=str(status[0]),
+            )
@@ -0,0 +1,162 @@
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import FeatureEngineering
+from src.features.rolling import window_columns
+from src.infra.columnar import local_timestamps
+
+
+def _parse_timestamp(payload: Dict[str, Any]) -> datetime:
+    ts = payload.get("timestamp") or payload.get("sent_at")
+    if not ts:
+        return datetime.now()
+    if isinstance(ts, datetime):
+        return ts
+    if isinstance(ts, str):
+        try:
+            return datetime.fromisoformat(ts)
+        except ValueError:
+            pass
+    # Formatos no ISO: mismo parser que compute_features_from_payload
+    return pd.to_datetime(ts)
+
+
+def _coerce(value: Any) -> float:
+    """
+    Mismas reglas que el camino pandas (reindex + fillna + to_numeric(errors="coerce")):
+    lo que no es numérico, None o NaN termina en 0.0.
+    """
+    if value is None:
+        return 0.0
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if value != value else value
+
+
+# Cada extractor replica una columna de FeatureEngineering._payload_row
+_EXTRACTORS: Dict[str, Callable[[Dict[str, Any], Optional[datetime]], Any]] = {
+    "hour": lambda p, ts: ts.hour,
+    "weekday": lambda p, ts: ts.weekday(),
+    "total_sent_agg": lambda p, ts: int(p.get("total_sent", 1)),
+    "response_rate": lambda p, ts: float(p.get("response_rate", 0.0)),
+    "mean_delay": lambda p, ts: float(p.get("mean_delay", 0.0)),
+    "unusual_response_rate": lambda p, ts: int(p.get("response_rate", 0.0) < 0.25),
+    "unusual_mean_delay": lambda p, ts: int(p.get("mean_delay", 0.0) > 120.0),
+    "status": lambda p, ts: p.get("status", "unknown"),
+}
+# Features por ventana (RollingFeatureStore.enrich las agrega al payload); ausentes valen 0
+_EXTRACTORS.update({
+    name: (lambda p, ts, name=name: p.get(name, 0.0)) for name in window_columns()
+})
+_TIME_COLUMNS = {"hour", "weekday"}
+
+
+def _numeric_column(columns: Mapping[str, Any], name: str, default: float, n_rows: int) -> np.ndarray:
+    """Columna como float64; ausente o no numérica queda en el default del camino por payload."""
+    if name not in columns:
+        return np.full(n_rows, default, dtype=np.float64)
+    values = np.asarray(columns[name])
+    try:
+        return values.astype(np.float64, copy=False)
+    except (TypeError, ValueError):
+        return np.array([_coerce(v) for v in values], dtype=np.float64)
+
+
+def column_timestamps(columns: Mapping[str, Any], n_rows: int) -> np.ndarray:
+    """timestamp (o sent_at) como datetime64[us] en hora local (ver columnar.local_timestamps)."""
+    values = columns.get("timestamp", columns.get("sent_at"))
+    if values is None:
+        return np.full(n_rows, np.datetime64(datetime.now(), "us"))
+    return local_timestamps(values)
+
+
+# Versión vectorizada de _EXTRACTORS para lotes columnares (mismos valores por fila)
+_COLUMN_EXTRACTORS: Dict[str, Callable[[Mapping[str, Any], Optional[np.ndarray], int], np.ndarray]] = {
+    "hour": lambda c, ts, n: (ts - ts.astype("datetime64[D]")).astype("timedelta64[h]").astype(np.float64),
+    # 1970-01-01 fue jueves (weekday 3)
+    "weekday": lambda c, ts, n: ((ts.astype("datetime64[D]").astype(np.int64) + 3) % 7).astype(np.float64),
+    "total_sent_agg": lambda c, ts, n: np.trunc(_numeric_column(c, "total_sent", 1.0, n)),
+    "response_rate": lambda c, ts, n: _numeric_column(c, "response_rate", 0.0, n),
+    "mean_delay": lambda c, ts, n: _numeric_column(c, "mean_delay", 0.0, n),
+    "unusual_response_rate": lambda c, ts, n: (_numeric_column(c, "response_rate", 0.0, n) < 0.25).astype(np.float64),
+    "unusual_mean_delay": lambda c, ts, n: (_numeric_column(c, "mean_delay", 0.0, n) > 120.0).astype(np.float64),
+    "status": lambda c, ts, n: _numeric_column(c, "status", 0.0, n),
+}
+_COLUMN_EXTRACTORS.update({
+    name: (lambda c, ts, n, name=name: _numeric_column(c, name, 0.0, n)) for name in window_columns()
+})
+
+
+class FeatureEncoder:
+    """
+    Codificador precompilado de payloads a la matriz de entrada del modelo.
+
+    Se construye una sola vez con las columnas de features.pkl (o
+    FeatureEngineering.COLUMNS) y escribe cada payload directamente en una
+    fila float64 de NumPy, sin pasar por DataFrames. Produce los mismos valores
+    que compute_features_from_payload + la coerción de FraudPredictor.
+    """
+
+    def __init__(self, feature_columns: Optional[Sequence[str]] = None) -> None:
+        self.feature_columns: List[str] = list(feature_columns or FeatureEngineering.COLUMNS)
+        self.n_features = len(self.feature_columns)
+        # Columnas desconocidas quedan en 0, igual que reindex(...).fillna(0)
+        self._plan = [
+            (i, _EXTRACTORS[c]) for i, c in enumerate(self.feature_columns) if c in _EXTRACTORS
+        ]
+        self._needs_timestamp = any(c in _TIME_COLUMNS for c in self.feature_columns)
+        # Buffer preasignado por hilo (FastAPI atiende requests en un threadpool)
+        self._local = threading.local()
+
+    def _row_buffer(self) -> np.ndarray:
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.zeros((1, self.n_features), dtype=np.float64)
+            self._local.row = row
+        return row
+
+    def _fill(self, payload: Dict[str, Any], out: np.ndarray) -> None:
+        ts = _parse_timestamp(payload) if self._needs_timestamp else None
+        out[:] = 0.0
+        for i, extract in self._plan:
+            out[i] = _coerce(extract(payload, ts))
+
+    def encode(self, payload: Dict[str, Any]) -> np.ndarray:
+        """
+        Codifica un payload en una matriz (1, n_features).
+
+        El array devuelto es un buffer reutilizado por el hilo actual: se
+        sobrescribe en la siguiente llamada, copiarlo si se necesita conservar.
+        """
+        row = self._row_buffer()
+        self._fill(payload, row[0])
+        return row
+
+    def encode_batch(self, payloads: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Codifica un lote de payloads en una matriz nueva (n, n_features)."""
+        X = np.empty((len(payloads), self.n_features), dtype=np.float64)
+        for r, payload in enumerate(payloads):
+            self._fill(payload, X[r])
+        return X
+
+    def encode_columns(self, columns: Mapping[str, Any], n_rows: int) -> np.ndarray:
+        """
+        Codifica un lote columnar (nombre -> array) en una matriz (n_rows, n_features)
+        con operaciones sobre columnas completas, sin armar un payload por fila.
+        Produce los mismos valores que encode_batch sobre los payloads equivalentes.
+        """
+        X = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        ts = column_timestamps(columns, n_rows) if self._needs_timestamp else None
+        for i, name in enumerate(self.feature_columns):
+            extract = _COLUMN_EXTRACTORS.get(name)
+            if extract is not None:
+                X[:, i] = extract(columns, ts, n_rows)
+        # Misma coerción que _coerce: NaN -> 0
+        X[np.isnan(X)] = 0.0
+        return X
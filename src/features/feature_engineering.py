@@ -1,6 +1,43 @@
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Sequence, Tuple, Union
+import numpy as np
 import pandas as pd
 from src.domain.entities import EnviosCliente
+from src.domain.envios_batch import EnviosBatch
+from src.features.rolling import WINDOWS, window_columns
+
+ArrayLike = Union[np.ndarray, pd.Series, Sequence[Any]]
+
+
+def _to_datetime(values: pd.Series) -> pd.Series:
+    """
+    Convierte una columna de fechas (datetime, Timestamp o texto) a datetime64.
+    Si mezcla offsets de zona horaria (p. ej. cambio de horario) no hay un
+    dtype común y se normaliza a UTC.
+    """
+    try:
+        return pd.to_datetime(values)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, utc=True)
+
+
+def _epoch_micros(values: ArrayLike) -> np.ndarray:
+    """
+    Fechas -> int64 en microsegundos desde 1970 (NaT queda como el mínimo de
+    int64). Con zona se usa el instante UTC; sin zona, la fecha tal cual,
+    igual que rolling.to_micros.
+    """
+    dates = _to_datetime(pd.Series(values).reset_index(drop=True))
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+    return dates.to_numpy(dtype="datetime64[us]").astype(np.int64)
+
+
+def _sorted_search(haystack: np.ndarray, needles: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """np.searchsorted(haystack, needles) recorriendo needles en el orden dado (argsort de needles)."""
+    out = np.empty(len(needles), dtype=np.int64)
+    out[order] = np.searchsorted(haystack, needles[order])
+    return out
+
 
 class FeatureEngineering:
     COLUMNS = [
@@ -9,7 +46,9 @@ class FeatureEngineering:
     ]
 
     @staticmethod
-    def compute_features(envios: List[EnviosCliente]) -> pd.DataFrame:
+    def compute_features(envios: Union[List[EnviosCliente], EnviosBatch]) -> pd.DataFrame:
+        if isinstance(envios, EnviosBatch):
+            return FeatureEngineering.compute_features_from_batch(envios)
         if not envios:
             return pd.DataFrame(columns=FeatureEngineering.COLUMNS)
 
@@ -30,8 +69,276 @@ class FeatureEngineering:
                 "status": getattr(e.transaction, "status", "approved"),
             })
 
-        df = pd.DataFrame(rows)
+        return FeatureEngineering._aggregate_and_flag(pd.DataFrame(rows))
+
+    @staticmethod
+    def compute_features_from_frame(frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Igual que compute_features pero sobre datos columnares (por ejemplo
+        EnviosRepository.iter_frames): requiere las columnas client_id, sent_at,
+        response_at y status, y no crea objetos por fila.
+        """
+        return FeatureEngineering.compute_features_columnar(
+            frame["client_id"], frame["sent_at"], frame["response_at"], frame["status"]
+        )
+
+    @staticmethod
+    def compute_features_from_batch(batch: EnviosBatch) -> pd.DataFrame:
+        """
+        compute_features sobre un EnviosBatch: usa sus columnas directamente,
+        sin materializar una entidad por fila. Las fechas se evalúan en la zona
+        original del lote, así hora y día coinciden con los de las entidades.
+        """
+        # Envíos sin transacción: mismo valor por defecto que compute_features
+        status = np.where(batch.status_codes >= 0, batch.status, "approved")
+        return FeatureEngineering.compute_features_columnar(
+            batch.client_id, batch.localized("sent_at"), batch.localized("response_at"), status
+        )
+
+    @staticmethod
+    def compute_features_columnar(
+        client_id: ArrayLike,
+        sent_at: ArrayLike,
+        response_at: ArrayLike,
+        status: ArrayLike,
+    ) -> pd.DataFrame:
+        """
+        Versión completamente vectorizada de compute_features.
+
+        Recibe una columna por campo (arrays, listas o Series del mismo largo)
+        y calcula hora, día, demora, agregados por cliente y flags sin bucles
+        en Python: los agregados se obtienen con groupby(...).transform sobre
+        los códigos de client_id, sin merge. El resultado es idéntico al de
+        compute_features con los mismos envíos.
+        """
+        if len(client_id) == 0:
+            return pd.DataFrame(columns=FeatureEngineering.COLUMNS)
+
+        rows = FeatureEngineering.project_rows(client_id, sent_at, response_at, status)
+
+        # Agregación por cliente (códigos enteros en lugar de strings)
+        codes, _ = pd.factorize(rows["client_id"].to_numpy(), sort=False)
+        by_client = rows["delay"].groupby(codes, sort=False)
+        total_sent = by_client.transform("size").to_numpy(dtype="int64")
+        mean_delay = by_client.transform("mean").to_numpy()
+        response_rate = rows["responded"].groupby(codes, sort=False).transform("mean").to_numpy()
+
+        return FeatureEngineering._final_frame(rows, total_sent, response_rate, mean_delay)
+
+    @staticmethod
+    def point_in_time_features(envios: Union[List[EnviosCliente], EnviosBatch, pd.DataFrame]) -> pd.DataFrame:
+        """compute_point_in_time_features sobre entidades, un EnviosBatch o un DataFrame columnar (mismo orden)."""
+        if isinstance(envios, pd.DataFrame):
+            return FeatureEngineering.compute_point_in_time_features(
+                envios["client_id"], envios["sent_at"], envios["response_at"]
+            )
+        if isinstance(envios, EnviosBatch):
+            return FeatureEngineering.compute_point_in_time_features(
+                envios.client_id, envios.localized("sent_at"), envios.localized("response_at")
+            )
+        return FeatureEngineering.compute_point_in_time_features(
+            [e.client_id for e in envios], [e.sent_at for e in envios], [e.response_at for e in envios]
+        )
+
+    @staticmethod
+    def compute_point_in_time_features(
+        client_id: ArrayLike,
+        sent_at: ArrayLike,
+        response_at: ArrayLike,
+        windows: Sequence[Tuple[str, int]] = WINDOWS,
+    ) -> pd.DataFrame:
+        """
+        Features por cliente en ventanas móviles (1h, 24h y 7d por defecto)
+        vistas desde el sent_at de cada envío, sin información futura: solo
+        cuentan los envíos y las respuestas (en su response_at) ocurridos en
+        [sent_at - ventana, sent_at). Una fila por envío, en el mismo orden,
+        con sent_<w>, response_rate_<w> y mean_delay_<w> (ver rolling.window_values).
+
+        O(n log n): cada evento se codifica como (cliente, posición de su fecha
+        en el orden global) en un único int64, se ordena una vez y los bordes
+        de todas las ventanas se resuelven con searchsorted; las demoras se
+        suman con sumas acumuladas en microsegundos enteros. Da los mismos
+        valores que RollingFeatureStore alimentado con los mismos envíos.
+        """
+        columns = window_columns(windows)
+        n = len(client_id)
+        if n == 0:
+            return pd.DataFrame(columns=columns)
+
+        codes, _ = pd.factorize(np.asarray(client_id, dtype=object), sort=False)
+        codes = codes.astype(np.int64)
+        sent = _epoch_micros(sent_at)
+        response = _epoch_micros(response_at)
+        responded = response != np.iinfo(np.int64).min
+        response_codes = codes[responded]
+        response_times = response[responded]
+        delays = response_times - sent[responded]
+
+        # Posición de cada fecha en el orden global de eventos: clave = código * span + posición.
+        # Todas las búsquedas se hacen con las agujas ordenadas (acceso secuencial a memoria).
+        times = np.unique(np.concatenate([sent, response_times]))
+        span = len(times) + 1
+        sent_order = np.argsort(sent, kind="stable")
+        base = codes * span
+        end = base + _sorted_search(times, sent, sent_order)
+        # Orden por (cliente, fecha): en él end y los inicios de cada ventana quedan ordenados
+        row_order = np.argsort(end, kind="stable")
+        send_keys = end[row_order]
+        response_keys = response_codes * span + _sorted_search(
+            times, response_times, np.argsort(response_times, kind="stable")
+        )
+        order = np.argsort(response_keys, kind="stable")
+        response_keys = response_keys[order]
+        delay_cumsum = np.concatenate([[0], np.cumsum(delays[order])])
+        # Fin exclusivo de las ventanas: los envíos simultáneos del mismo cliente no cuentan entre sí
+        first = np.searchsorted(send_keys, send_keys)
+        hi = np.searchsorted(response_keys, send_keys)
+
+        out = {}
+        for suffix, seconds in windows:
+            start = (base + _sorted_search(times, sent - seconds * 1_000_000, sent_order))[row_order]
+            n_sent = first - np.searchsorted(send_keys, start)
+            lo = np.searchsorted(response_keys, start)
+            n_responses = hi - lo
+            delay_us = delay_cumsum[hi] - delay_cumsum[lo]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                response_rate = np.where(n_sent > 0, np.minimum(1.0, n_responses / n_sent), 0.0)
+                mean_delay = np.where(n_responses > 0, delay_us / n_responses / 1e6, 0.0)
+            for name, values in (("sent", n_sent), ("response_rate", response_rate), ("mean_delay", mean_delay)):
+                column = np.empty_like(values)
+                column[row_order] = values
+                out[f"{name}_{suffix}"] = column
+        return pd.DataFrame(out, columns=columns)
 
+    @staticmethod
+    def project_rows(
+        client_id: ArrayLike,
+        sent_at: ArrayLike,
+        response_at: ArrayLike,
+        status: ArrayLike,
+    ) -> pd.DataFrame:
+        """
+        Proyección por envío con lo mínimo que necesita el modelo: client_id,
+        hour, weekday, responded (0/1), delay (segundos, 0 sin respuesta) y status.
+        """
+        sent = _to_datetime(pd.Series(sent_at).reset_index(drop=True))
+        response = _to_datetime(pd.Series(response_at).reset_index(drop=True))
+        responded = response.notna().to_numpy()
+        response_time = (response - sent).dt.total_seconds().to_numpy(dtype=float, na_value=0.0)
+        response_time[~responded] = 0.0
+
+        rows = FeatureEngineering.project_sends(client_id, sent, status)
+        rows.insert(3, "responded", responded.astype("int64"))
+        rows.insert(4, "delay", response_time)
+        return rows
+
+    @staticmethod
+    def project_sends(client_id: ArrayLike, sent_at: ArrayLike, status: ArrayLike) -> pd.DataFrame:
+        """Parte de project_rows que no depende de la respuesta: client_id, hour, weekday y status."""
+        sent = _to_datetime(pd.Series(sent_at).reset_index(drop=True))
+        return pd.DataFrame({
+            "client_id": np.asarray(client_id),
+            "hour": sent.dt.hour.to_numpy(dtype="int64"),
+            "weekday": sent.dt.weekday.to_numpy(dtype="int64"),
+            "status": pd.Series(status).to_numpy(),
+        })
+
+    @staticmethod
+    def compute_features_from_projection(sends: pd.DataFrame, aggregates: pd.DataFrame) -> pd.DataFrame:
+        """
+        compute_features con la agregación resuelta en la base: sends es la
+        proyección por envío (EnviosRepository.fetch_send_projection: client_id,
+        sent_at, status) y aggregates los agregados por cliente del mismo rango
+        (EnviosRepository.fetch_client_aggregates). Se unen por client_id en
+        memoria; el resultado es el de compute_features_from_frame sobre los
+        envíos completos.
+        """
+        if sends.empty:
+            return pd.DataFrame(columns=FeatureEngineering.COLUMNS)
+        rows = FeatureEngineering.project_sends(sends["client_id"], sends["sent_at"], sends["status"])
+        return FeatureEngineering.features_from_aggregates(rows, aggregates)
+
+    @staticmethod
+    def aggregate_clients(rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Agregados sumables por cliente (total_sent, responded, delay_sum), indexados
+        por client_id. Al ser sumas se pueden combinar entre lotes con merge_aggregates.
+        """
+        agg = rows.groupby("client_id", sort=False, observed=True).agg(
+            total_sent=("responded", "size"),
+            responded=("responded", "sum"),
+            delay_sum=("delay", "sum"),
+        )
+        return agg.astype({"total_sent": "int64", "responded": "int64", "delay_sum": float})
+
+    @staticmethod
+    def merge_aggregates(current: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """Suma dos tablas de aggregate_clients (clientes nuevos o ya conocidos)."""
+        if current.empty:
+            return new.copy()
+        merged = current.add(new, fill_value=0)
+        return merged.astype({"total_sent": "int64", "responded": "int64", "delay_sum": float})
+
+    @staticmethod
+    def flag_reference(aggregates: pd.DataFrame) -> Tuple[float, float]:
+        """
+        Promedios por envío de response_rate y mean_delay que usan los flags
+        heurísticos, calculados desde los agregados: permiten armar las
+        features de un bloque de envíos con el mismo resultado que sobre el
+        historial completo.
+        """
+        total = float(aggregates["total_sent"].sum())
+        if total == 0:
+            return 0.0, 0.0
+        return float(aggregates["responded"].sum()) / total, float(aggregates["delay_sum"].sum()) / total
+
+    @staticmethod
+    def features_from_aggregates(
+        rows: pd.DataFrame,
+        aggregates: pd.DataFrame,
+        reference: Optional[Tuple[float, float]] = None,
+    ) -> pd.DataFrame:
+        """
+        Matriz de features a partir de la proyección por envío (project_rows) y
+        los agregados por cliente (aggregate_clients), unidos por client_id.
+        reference (ver flag_reference) reemplaza los promedios de los flags
+        cuando rows es solo una parte de los envíos agregados.
+        """
+        if rows.empty:
+            return pd.DataFrame(columns=FeatureEngineering.COLUMNS)
+
+        idx = aggregates.index.get_indexer(rows["client_id"].to_numpy())
+        if (idx < 0).any():
+            raise ValueError("Hay envíos de clientes sin agregados")
+        total_sent = aggregates["total_sent"].to_numpy()[idx].astype("int64")
+        response_rate = aggregates["responded"].to_numpy()[idx] / total_sent
+        mean_delay = aggregates["delay_sum"].to_numpy()[idx] / total_sent
+        return FeatureEngineering._final_frame(rows, total_sent, response_rate, mean_delay, reference)
+
+    @staticmethod
+    def _final_frame(
+        rows: pd.DataFrame,
+        total_sent: np.ndarray,
+        response_rate: np.ndarray,
+        mean_delay: np.ndarray,
+        reference: Optional[Tuple[float, float]] = None,
+    ) -> pd.DataFrame:
+        if reference is None:
+            reference = (pd.Series(response_rate).mean(), pd.Series(mean_delay).mean())
+        return pd.DataFrame({
+            "hour": rows["hour"].to_numpy(dtype="int64"),
+            "weekday": rows["weekday"].to_numpy(dtype="int64"),
+            "total_sent_agg": total_sent,
+            "response_rate": response_rate,
+            "mean_delay": mean_delay,
+            # Flags heurísticos (mismas reglas que _aggregate_and_flag)
+            "unusual_response_rate": (response_rate < reference[0] * 0.5).astype(int),
+            "unusual_mean_delay": (mean_delay > reference[1] * 2).astype(int),
+            "status": rows["status"].to_numpy(),
+        }, columns=FeatureEngineering.COLUMNS)
+
+    @staticmethod
+    def _aggregate_and_flag(df: pd.DataFrame) -> pd.DataFrame:
         # Agregación por cliente
         agg = df.groupby("client_id").agg(
             total_sent=("total_sent", "sum"),
@@ -56,11 +363,11 @@ class FeatureEngineering:
         return df[FeatureEngineering.COLUMNS]
 
     @staticmethod
-    def compute_features_from_payload(payload: Dict) -> pd.DataFrame:
+    def _payload_row(payload: Dict) -> Dict:
         ts = payload.get("timestamp") or payload.get("sent_at")
         sent_at = pd.to_datetime(ts) if ts else pd.Timestamp.now()
 
-        row = {
+        return {
             "hour": sent_at.hour,
             "weekday": sent_at.weekday(),
             "total_sent_agg": int(payload.get("total_sent", 1)),
@@ -71,4 +378,16 @@ class FeatureEngineering:
             "status": payload.get("status", "unknown"),
         }
 
-        return pd.DataFrame([row], columns=FeatureEngineering.COLUMNS)
\ No newline at end of file
+    @staticmethod
+    def compute_features_from_payload(payload: Dict) -> pd.DataFrame:
+        row = FeatureEngineering._payload_row(payload)
+        return pd.DataFrame([row], columns=FeatureEngineering.COLUMNS)
+
+    @staticmethod
+    def compute_features_from_payloads(payloads: List[Dict]) -> pd.DataFrame:
+        """
+        Versión por lotes de compute_features_from_payload: una fila por payload,
+        en el mismo orden, construida en un único DataFrame.
+        """
+        rows = [FeatureEngineering._payload_row(p) for p in payloads]
+        return pd.DataFrame(rows, columns=FeatureEngineering.COLUMNS)
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from src.domain.entities import EnviosCliente
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClientAggregates:
+    """
+    Estado acumulado de un cliente. Con estos tres contadores se obtienen los
+    mismos agregados que compute_features calcula con groupby.
+    """
+    total_sent: int = 0
+    responded: int = 0
+    delay_sum: float = 0.0
+
+    @property
+    def response_rate(self) -> float:
+        return self.responded / self.total_sent if self.total_sent else 0.0
+
+    @property
+    def mean_delay(self) -> float:
+        # Los envíos sin respuesta cuentan con demora 0, igual que compute_features
+        return self.delay_sum / self.total_sent if self.total_sent else 0.0
+
+
+class ClientFeatureStore:
+    """
+    Feature store en proceso con agregados por client_id.
+
+    Cada evento de envío o respuesta actualiza los contadores del cliente en
+    O(1). La memoria está acotada a max_clients con desalojo LRU y el estado
+    se guarda periódicamente en disco (JSON, escritura atómica) para poder
+    restaurarlo al reiniciar.
+
+    Nota: si un cliente fue desalojado, sus eventos posteriores empiezan un
+    estado nuevo; max_clients debe dimensionarse para los clientes activos.
+    """
+
+    def __init__(
+        self,
+        max_clients: Optional[int] = 100_000,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval_s: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            max_clients (Optional[int]): Máximo de clientes en memoria (None = sin límite).
+            snapshot_path (Optional[str]): Archivo donde se guarda el estado.
+            snapshot_interval_s (Optional[float]): Cada cuántos segundos guardar el
+                                                   estado tras una actualización.
+        """
+        self.max_clients = max_clients
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot_interval_s = snapshot_interval_s
+
+        self._clients: "OrderedDict[str, ClientAggregates]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._last_snapshot = time.monotonic()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, client_id: str) -> bool:
+        return client_id in self._clients
+
+    # --- Eventos ---
+    def _touch(self, client_id: str) -> ClientAggregates:
+        state = self._clients.get(client_id)
+        if state is None:
+            state = ClientAggregates()
+            self._clients[client_id] = state
+            if self.max_clients is not None and len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._clients.move_to_end(client_id)
+        return state
+
+    def record_send(self, client_id: str) -> None:
+        with self._lock:
+            self._touch(client_id).total_sent += 1
+        self._maybe_snapshot()
+
+    def record_response(self, client_id: str, delay_seconds: float) -> None:
+        with self._lock:
+            state = self._touch(client_id)
+            state.responded += 1
+            state.delay_sum += float(delay_seconds)
+        self._maybe_snapshot()
+
+    def record_envio(self, envio: EnviosCliente) -> None:
+        """Registra un envío histórico completo (envío + respuesta si la hubo)."""
+        self.record_send(envio.client_id)
+        if envio.response_at:
+            import pandas as pd
+
+            delay = (pd.to_datetime(envio.response_at) - pd.to_datetime(envio.sent_at)).total_seconds()
+            self.record_response(envio.client_id, delay)
+
+    def record_envios(self, envios: Iterable[EnviosCliente]) -> None:
+        for envio in envios:
+            self.record_envio(envio)
+
+    # --- Consultas ---
+    def lookup(self, client_id: str) -> Optional[ClientAggregates]:
+        """Devuelve una copia de los agregados del cliente, o None si no se conoce."""
+        with self._lock:
+            state = self._clients.get(client_id)
+            if state is None:
+                return None
+            self._clients.move_to_end(client_id)
+            return ClientAggregates(state.total_sent, state.responded, state.delay_sum)
+
+    def enrich(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reemplaza total_sent, response_rate y mean_delay del payload por los
+        agregados del store cuando el cliente es conocido.
+        """
+        state = self.lookup(str(payload.get("client_id")))
+        if state is None or state.total_sent == 0:
+            return payload
+        return {
+            **payload,
+            "total_sent": state.total_sent,
+            "response_rate": state.response_rate,
+            "mean_delay": state.mean_delay,
+        }
+
+    def enrich_columns(self, columns: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Versión columnar de enrich(): devuelve columnas nuevas de total_sent,
+        response_rate y mean_delay con los agregados de los clientes conocidos
+        (el resto de las filas conserva los valores recibidos).
+        """
+        import numpy as np
+
+        client_ids = [str(c) for c in columns["client_id"]]
+        enriched = {
+            name: np.array(columns[name], dtype=np.float64)
+            for name in ("total_sent", "response_rate", "mean_delay")
+        }
+        for i, client_id in enumerate(client_ids):
+            state = self.lookup(client_id)
+            if state is None or state.total_sent == 0:
+                continue
+            enriched["total_sent"][i] = state.total_sent
+            enriched["response_rate"][i] = state.response_rate
+            enriched["mean_delay"][i] = state.mean_delay
+        return {**columns, **enriched}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"clients": len(self._clients), "max_clients": self.max_clients, "evictions": self.evictions}
+
+    # --- Persistencia ---
+    def snapshot(self, path: Optional[str] = None) -> Path:
+        target = Path(path) if path else self.snapshot_path
+        if target is None:
+            raise ValueError("No hay ruta de snapshot configurada")
+        with self._lock:
+            data = {
+                "max_clients": self.max_clients,
+                "clients": [[cid, s.total_sent, s.responded, s.delay_sum] for cid, s in self._clients.items()],
+            }
+            self._last_snapshot = time.monotonic()
+        with self._snapshot_lock:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(target.suffix + ".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, target)
+        logger.info(f"Feature store guardado en {target} ({len(data['clients'])} clientes)")
+        return target
+
+    def restore(self, path: Optional[str] = None) -> bool:
+        """Carga el estado desde disco. Devuelve False si el archivo no existe."""
+        source = Path(path) if path else self.snapshot_path
+        if source is None or not source.exists():
+            return False
+        data = json.loads(source.read_text(encoding="utf-8"))
+        with self._lock:
+            self._clients.clear()
+            for cid, total_sent, responded, delay_sum in data["clients"]:
+                self._clients[cid] = ClientAggregates(total_sent, responded, delay_sum)
+            while self.max_clients is not None and len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        logger.info(f"Feature store restaurado desde {source} ({len(self._clients)} clientes)")
+        return True
+
+    def _maybe_snapshot(self) -> None:
+        if self.snapshot_path is None or self.snapshot_interval_s is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            due = now - self._last_snapshot >= self.snapshot_interval_s
+            if due:
+                self._last_snapshot = now
+        if due:
+            self.snapshot()
@@ -0,0 +1,254 @@
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.domain.entities import EnviosCliente
+
+# Sin pandas/NumPy: este módulo se importa desde la API al arrancar.
+
+# Ventanas de las features point-in-time: (sufijo, duración en segundos)
+WINDOWS: Tuple[Tuple[str, int], ...] = (("1h", 3_600), ("24h", 86_400), ("7d", 604_800))
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def window_columns(windows: Sequence[Tuple[str, int]] = WINDOWS) -> List[str]:
+    """Nombres de las columnas por ventana: sent_<w>, response_rate_<w>, mean_delay_<w>."""
+    return [f"{name}_{suffix}" for suffix, _ in windows for name in ("sent", "response_rate", "mean_delay")]
+
+
+def to_micros(value: datetime) -> int:
+    """
+    Fecha -> microsegundos desde 1970 (entero, sin error de redondeo). Las
+    fechas con zona se pasan a UTC; las fechas sin zona se toman tal cual
+    (mismo criterio que FeatureEngineering.compute_point_in_time_features).
+    """
+    if value.tzinfo is not None:
+        return (value - _EPOCH_UTC) // _MICROSECOND
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def window_values(sent: int, responses: int, delay_us: int) -> Tuple[int, float, float]:
+    """
+    (envíos, respuestas, suma de demoras en µs) de una ventana -> (sent,
+    response_rate, mean_delay). response_rate son las respuestas recibidas en
+    la ventana sobre los envíos de la ventana (acotado a 1: pueden llegar
+    respuestas de envíos anteriores); mean_delay promedia solo las respuestas.
+    """
+    response_rate = min(1.0, responses / sent) if sent else 0.0
+    mean_delay = delay_us / responses / 1e6 if responses else 0.0
+    return sent, response_rate, mean_delay
+
+
+class _EventRing:
+    """
+    Buffer circular de eventos de un cliente ordenados por tiempo: una lista
+    con cabeza móvil (los eventos más viejos que la ventana mayor se
+    descartan avanzando la cabeza y compactando cada tanto) y la suma
+    acumulada de los valores, así el total de cualquier ventana sale de dos
+    búsquedas binarias. Agregar al final es O(1) amortizado; un evento fuera
+    de orden se inserta en su lugar y recalcula la suma desde ahí.
+    """
+
+    __slots__ = ("times", "cumulative", "head")
+
+    def __init__(self) -> None:
+        self.times: List[int] = []
+        self.cumulative: List[int] = []  # cumulative[i] = suma de los valores hasta i inclusive
+        self.head = 0
+
+    def __len__(self) -> int:
+        return len(self.times) - self.head
+
+    def add(self, ts: int, value: int = 0) -> None:
+        times, cumulative = self.times, self.cumulative
+        if not times or ts >= times[-1]:
+            times.append(ts)
+            cumulative.append((cumulative[-1] if cumulative else 0) + value)
+            return
+        pos = bisect_right(times, ts, self.head)
+        times.insert(pos, ts)
+        cumulative.insert(pos, (cumulative[pos - 1] if pos else 0) + value)
+        for i in range(pos + 1, len(cumulative)):
+            cumulative[i] += value
+
+    def prune(self, cutoff: int) -> None:
+        """Descarta los eventos anteriores a cutoff."""
+        self.head = bisect_left(self.times, cutoff, self.head)
+        if self.head > 32 and 2 * self.head > len(self.times):
+            # Se rebasa la suma acumulada: el primer evento que queda arranca desde su propio valor
+            offset = self.cumulative[self.head - 1]
+            del self.times[:self.head]
+            self.cumulative = [c - offset for c in self.cumulative[self.head:]]
+            self.head = 0
+
+    def window(self, start: int, end: int) -> Tuple[int, int]:
+        """(cantidad, suma de valores) de los eventos con start <= ts < end."""
+        lo = bisect_left(self.times, start, self.head)
+        hi = bisect_left(self.times, end, lo)
+        if hi == lo:
+            return 0, 0
+        return hi - lo, self.cumulative[hi - 1] - (self.cumulative[lo - 1] if lo else 0)
+
+
+class RollingClientState:
+    """Envíos y respuestas recientes de un cliente (como mucho la ventana mayor)."""
+
+    __slots__ = ("sends", "responses", "latest")
+
+    def __init__(self) -> None:
+        self.sends = _EventRing()
+        self.responses = _EventRing()  # valor: demora en µs
+        self.latest: Optional[int] = None
+
+    def advance(self, ts: int, horizon: int) -> None:
+        if self.latest is None or ts > self.latest:
+            self.latest = ts
+            self.sends.prune(ts - horizon)
+            self.responses.prune(ts - horizon)
+
+    def features(self, as_of: int, windows: Sequence[Tuple[str, int]]) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for suffix, seconds in windows:
+            start = as_of - seconds * 1_000_000
+            sent, _ = self.sends.window(start, as_of)
+            responses, delay_us = self.responses.window(start, as_of)
+            out[f"sent_{suffix}"], out[f"response_rate_{suffix}"], out[f"mean_delay_{suffix}"] = (
+                window_values(sent, responses, delay_us)
+            )
+        return out
+
+
+class RollingFeatureStore:
+    """
+    Versión en línea de FeatureEngineering.compute_point_in_time_features:
+    por cliente guarda los envíos y respuestas de la última ventana (7d por
+    defecto) y responde sent / response_rate / mean_delay de cada ventana a
+    una fecha dada, con la misma definición que el cálculo offline: eventos
+    en [as_of - ventana, as_of).
+
+    Registrar un evento es O(1) amortizado y consultar, O(log k) por
+    ventana (k = eventos del cliente en la ventana mayor). La memoria está
+    acotada a max_clients con desalojo LRU, como ClientFeatureStore. Los
+    eventos se descartan según el más reciente visto por cliente: consultar
+    una fecha muy anterior a ese evento ve el historial recortado.
+    """
+
+    def __init__(self, windows: Sequence[Tuple[str, int]] = WINDOWS, max_clients: Optional[int] = 100_000) -> None:
+        """
+        Args:
+            windows (Sequence[Tuple[str, int]]): Ventanas (sufijo, segundos).
+            max_clients (Optional[int]): Máximo de clientes en memoria (None = sin límite).
+        """
+        self.windows = tuple(windows)
+        self.columns = window_columns(self.windows)
+        self.max_clients = max_clients
+        self._horizon = max(seconds for _, seconds in self.windows) * 1_000_000
+        self._clients: "OrderedDict[str, RollingClientState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _touch(self, client_id: str) -> RollingClientState:
+        state = self._clients.get(client_id)
+        if state is None:
+            state = RollingClientState()
+            self._clients[client_id] = state
+            if self.max_clients is not None and len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._clients.move_to_end(client_id)
+        return state
+
+    # --- Eventos ---
+    def record_send(self, client_id: str, sent_at: Optional[datetime] = None) -> None:
+        ts = to_micros(sent_at or datetime.now())
+        with self._lock:
+            state = self._touch(client_id)
+            state.sends.add(ts)
+            state.advance(ts, self._horizon)
+
+    def record_response(self, client_id: str, delay_seconds: float, response_at: Optional[datetime] = None) -> None:
+        ts = to_micros(response_at or datetime.now())
+        with self._lock:
+            state = self._touch(client_id)
+            state.responses.add(ts, round(float(delay_seconds) * 1_000_000))
+            state.advance(ts, self._horizon)
+
+    def record_envio(self, envio: EnviosCliente) -> None:
+        """Registra un envío histórico completo (envío + respuesta si la hubo)."""
+        self.record_send(envio.client_id, envio.sent_at)
+        if envio.response_at:
+            delay_us = to_micros(envio.response_at) - to_micros(envio.sent_at)
+            self.record_response(envio.client_id, delay_us / 1e6, envio.response_at)
+
+    def record_envios(self, envios: Iterable[EnviosCliente]) -> None:
+        for envio in envios:
+            self.record_envio(envio)
+
+    # --- Consultas ---
+    def features(self, client_id: str, as_of: Optional[datetime] = None) -> Dict[str, float]:
+        """Features por ventana del cliente a la fecha as_of (ceros si no se conoce)."""
+        return self._features_at(client_id, to_micros(as_of or datetime.now()))
+
+    def _features_at(self, client_id: str, ts: int) -> Dict[str, float]:
+        with self._lock:
+            state = self._clients.get(client_id)
+            if state is None:
+                return dict.fromkeys(self.columns, 0.0)
+            self._clients.move_to_end(client_id)
+            return state.features(ts, self.windows)
+
+    def enrich(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Agrega al payload las columnas por ventana a la fecha de su timestamp."""
+        return {**payload, **self.features(str(payload.get("client_id")), _payload_timestamp(payload))}
+
+    def enrich_columns(self, columns: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Versión columnar de enrich(): una columna (lista) por feature de ventana.
+        Usa el instante de timestamp_utc si está (columnar.validate: "timestamp"
+        ya perdió el offset), igual que enrich() con un timestamp ISO con zona.
+        """
+        client_ids = columns["client_id"]
+        timestamps = columns.get("timestamp_utc", columns.get("timestamp", columns.get("sent_at")))
+        micros = _column_micros(timestamps, len(client_ids))
+        rows = [self._features_at(str(client_id), ts) for client_id, ts in zip(client_ids, micros)]
+        return {**columns, **{name: [row[name] for row in rows] for name in self.columns}}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            events = sum(len(s.sends) + len(s.responses) for s in self._clients.values())
+        return {
+            "clients": len(self._clients),
+            "max_clients": self.max_clients,
+            "evictions": self.evictions,
+            "events": events,
+            "windows": [suffix for suffix, _ in self.windows],
+        }
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _column_micros(timestamps: Any, n_rows: int) -> List[int]:
+    """Columna de fechas -> microsegundos desde 1970 (como to_micros) por fila."""
+    if timestamps is None:
+        return [to_micros(datetime.now())] * n_rows
+    if getattr(timestamps, "dtype", None) is not None and timestamps.dtype.kind == "M":
+        # datetime64 de NumPy (lotes columnares): la columna entera de una vez, sin importar NumPy
+        return timestamps.astype("datetime64[us]").astype("int64").tolist()
+    return [to_micros(_as_datetime(value) or datetime.now()) for value in timestamps]
+
+
+def _payload_timestamp(payload: Dict[str, Any]) -> Optional[datetime]:
+    return _as_datetime(payload.get("timestamp") or payload.get("sent_at"))
@@ -0,0 +1,174 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.infra.metrics import ADMISSION_EVENTS, ADMISSION_IN_FLIGHT, INFERENCE_QUEUE_WAIT_SECONDS, INFERENCE_TASKS
+
+
+class Overloaded(Exception):
+    """Request rechazada por control de admisión (la API responde 429/503 con Retry-After)."""
+
+    def __init__(self, reason: str, status_code: int, retry_after_s: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after_s = retry_after_s
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after_s)))}
+
+
+class DeadlineExceeded(Exception):
+    """La tarea salió de la cola del executor con el deadline de su request ya vencido."""
+
+
+class InferenceExecutor(ThreadPoolExecutor):
+    """
+    Pool de hilos dedicado a la inferencia (separado del threadpool por
+    defecto de FastAPI/Starlette). Mide la espera en cola de cada tarea y
+    publica cuántas hay en cola y cuántas corriendo.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        max_workers = max_workers or os.cpu_count() or 1
+        super().__init__(max_workers=max_workers, thread_name_prefix="inference")
+        self.workers = max_workers
+        self.queued = 0
+        self.running = 0
+        self._counts_lock = threading.Lock()
+
+    def _update(self, queued: int, running: int) -> None:
+        with self._counts_lock:
+            self.queued += queued
+            self.running += running
+            INFERENCE_TASKS.set(self.queued, state="queued")
+            INFERENCE_TASKS.set(self.running, state="running")
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        submitted = time.perf_counter()
+
+        def task():
+            INFERENCE_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - submitted)
+            self._update(-1, 1)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._update(0, -1)
+
+        self._update(1, 0)
+        future = super().submit(task)
+        # Cancelada antes de empezar (deadline vencido en cola): deja de contar como encolada
+        future.add_done_callback(lambda f: self._update(-1, 0) if f.cancelled() else None)
+        return future
+
+
+class AdmissionController:
+    """
+    Control de admisión de /predict: como máximo max_in_flight requests
+    admitidas a la vez (corriendo o esperando en el executor). Las que llegan
+    con el cupo lleno se rechazan de inmediato (429) en lugar de alargar la
+    cola, y las admitidas tienen un deadline de timeout_s desde la admisión:
+    si vence antes de responder se devuelve 503 y la tarea, si todavía no
+    empezó, se saca de la cola del executor.
+
+    Todas las llamadas a run() y call() ocurren en el event loop, por lo que
+    el contador de requests admitidas no necesita lock.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        max_in_flight: int = 256,
+        timeout_s: Optional[float] = 1.0,
+        retry_after_s: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            executor (InferenceExecutor): Pool donde corre la inferencia.
+            max_in_flight (int): Requests admitidas a la vez; el resto recibe 429.
+            timeout_s (Optional[float]): Deadline por request (None = sin deadline).
+            retry_after_s (float): Valor sugerido en el header Retry-After.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight debe ser >= 1")
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.timeout_s = timeout_s
+        self.retry_after_s = retry_after_s
+
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def run(self, start: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Admite la request y espera el awaitable que devuelve start(), con deadline.
+
+        Raises:
+            Overloaded: "queue_full" (429) sin cupo o "deadline" (503) si vence el deadline.
+        """
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            ADMISSION_EVENTS.inc(event="rejected")
+            raise Overloaded("queue_full", 429, self.retry_after_s)
+        self.in_flight += 1
+        self.admitted += 1
+        ADMISSION_EVENTS.inc(event="admitted")
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        try:
+            if self.timeout_s is None:
+                return await start()
+            try:
+                return await asyncio.wait_for(start(), self.timeout_s)
+            except asyncio.TimeoutError:
+                raise self._deadline_exceeded() from None
+            except DeadlineExceeded:
+                raise self._deadline_exceeded() from None
+        finally:
+            self.in_flight -= 1
+            ADMISSION_IN_FLIGHT.set(self.in_flight)
+
+    async def call(self, fn: Callable, *args: Any) -> Any:
+        """Admite la request y ejecuta fn(*args) en el executor de inferencia."""
+        return await self.run(lambda: self.submit(fn, *args))
+
+    def submit(self, fn: Callable, *args: Any) -> "asyncio.Future[Any]":
+        """fn(*args) en el executor de inferencia, para usar dentro de run()."""
+        return asyncio.wrap_future(self.executor.submit(self._until_deadline(fn), *args))
+
+    def _until_deadline(self, fn: Callable) -> Callable:
+        if self.timeout_s is None:
+            return fn
+        deadline = time.monotonic() + self.timeout_s
+
+        def guarded(*args: Any) -> Any:
+            # La request ya recibió 503: no gastar CPU en una respuesta que nadie espera
+            if time.monotonic() >= deadline:
+                raise DeadlineExceeded()
+            return fn(*args)
+
+        return guarded
+
+    def _deadline_exceeded(self) -> Overloaded:
+        self.timed_out += 1
+        ADMISSION_EVENTS.inc(event="deadline_exceeded")
+        return Overloaded("deadline", 503, self.retry_after_s)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.executor.workers,
+            "max_in_flight": self.max_in_flight,
+            "timeout_s": self.timeout_s,
+            "in_flight": self.in_flight,
+            "queued": self.executor.queued,
+            "running": self.executor.running,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
@@ -0,0 +1,274 @@
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.domain.services import DecisionAuditLog
+from src.infra.metrics import AUDIT_LOG_EVENTS, AUDIT_LOG_FLUSH_SECONDS, AUDIT_LOG_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+AUDIT_COLUMNS = [
+    "decision_id", "logged_at", "client_id", "request_timestamp", "model_version", "probability",
+    "threshold", "prediction", "unusual_response_rate", "unusual_mean_delay", "payload",
+]
+
+
+def to_audit_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Registro del usecase -> fila de la tabla (fecha, booleanos y payload serializados)."""
+    return {
+        "decision_id": entry["decision_id"],
+        "logged_at": datetime.fromtimestamp(entry["logged_at"], tz=timezone.utc).replace(tzinfo=None),
+        "client_id": None if entry.get("client_id") is None else str(entry["client_id"]),
+        "request_timestamp": None if entry.get("request_timestamp") is None else str(entry["request_timestamp"]),
+        "model_version": entry.get("model_version"),
+        "probability": float(entry["probability"]),
+        "threshold": float(entry["threshold"]),
+        "prediction": entry["prediction"],
+        "unusual_response_rate": bool(entry["unusual_response_rate"]),
+        "unusual_mean_delay": bool(entry["unusual_mean_delay"]),
+        "payload": json.dumps(entry.get("payload"), default=str, ensure_ascii=False),
+    }
+
+
+class SqlAuditWriter:
+    """
+    Inserta lotes de decisiones en la tabla auditoria_decisiones con un
+    engine SQLAlchemy con pool (PostgreSQL en producción, SQLite en pruebas).
+    El engine se crea en la primera escritura para no cargar SQLAlchemy al
+    importar la API.
+    """
+
+    TABLE = "auditoria_decisiones"
+
+    def __init__(self, url: Optional[str] = None, engine: Any = None, pool_size: int = 2) -> None:
+        if url is None and engine is None:
+            raise ValueError("SqlAuditWriter necesita url o engine")
+        self.url = url
+        self.pool_size = pool_size
+        self._engine = engine
+        self._table_ready = False
+
+    @property
+    def engine(self) -> Any:
+        if self._engine is None:
+            from sqlalchemy import create_engine
+
+            options = {"pool_pre_ping": True}
+            if not self.url.startswith("sqlite"):
+                options.update(pool_size=self.pool_size, max_overflow=0)
+            self._engine = create_engine(self.url, **options)
+        return self._engine
+
+    def ensure_table(self) -> None:
+        from sqlalchemy import text
+
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    decision_id TEXT PRIMARY KEY,
+                    logged_at TIMESTAMP NOT NULL,
+                    client_id TEXT,
+                    request_timestamp TEXT,
+                    model_version TEXT,
+                    probability DOUBLE PRECISION NOT NULL,
+                    threshold DOUBLE PRECISION NOT NULL,
+                    prediction TEXT NOT NULL,
+                    unusual_response_rate BOOLEAN NOT NULL,
+                    unusual_mean_delay BOOLEAN NOT NULL,
+                    payload TEXT
+                )
+            """))
+        self._table_ready = True
+
+    def write(self, entries: List[Dict[str, Any]]) -> None:
+        from sqlalchemy import text
+
+        if not self._table_ready:
+            self.ensure_table()
+        placeholders = ", ".join(f":{c}" for c in AUDIT_COLUMNS)
+        statement = text(f"INSERT INTO {self.TABLE} ({', '.join(AUDIT_COLUMNS)}) VALUES ({placeholders})")
+        with self.engine.begin() as conn:
+            conn.execute(statement, [to_audit_row(entry) for entry in entries])
+
+
+class JsonlAuditWriter:
+    """Stand-in local: agrega cada lote a un archivo JSON Lines."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    def write(self, entries: List[Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(to_audit_row(entry), default=str, ensure_ascii=False) + "\n" for entry in entries)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+
+_STOP = object()
+
+
+class WriteBehindAuditLog(DecisionAuditLog):
+    """
+    Audit log con escritura diferida: record() solo encola (sin I/O en la
+    request) y un hilo en segundo plano vacía la cola en lotes de hasta
+    flush_size registros, o cada flush_interval_s si hay menos.
+
+    La cola es acotada. Con on_full="drop" los registros que no entran se
+    descartan y se cuentan (audit_log_events_total{event="dropped"}); con
+    "block" la request espera hasta block_timeout_s a que haya lugar
+    (backpressure) y recién después descarta. Un lote que falla se reintenta
+    max_retries veces antes de contarse como "failed". stop() escribe lo que
+    quede en la cola.
+    """
+
+    ON_FULL = ("drop", "block")
+
+    def __init__(
+        self,
+        writer: Any,
+        max_queue: int = 10_000,
+        flush_size: int = 500,
+        flush_interval_s: float = 1.0,
+        on_full: str = "drop",
+        block_timeout_s: float = 0.05,
+        max_retries: int = 2,
+    ) -> None:
+        """
+        Args:
+            writer: Objeto con write(entries) (SqlAuditWriter, JsonlAuditWriter).
+            max_queue (int): Registros pendientes como máximo.
+            flush_size (int): Registros por escritura.
+            flush_interval_s (float): Espera máxima antes de escribir un lote incompleto.
+            on_full (str): "drop" o "block" cuando la cola está llena.
+            block_timeout_s (float): Con "block", espera máxima por registro.
+            max_retries (int): Reintentos de un lote que falla.
+        """
+        if on_full not in self.ON_FULL:
+            raise ValueError(f"on_full desconocido: {on_full}. Opciones: {self.ON_FULL}")
+        if max_queue < 1 or flush_size < 1:
+            raise ValueError("max_queue y flush_size deben ser positivos")
+        self.writer = writer
+        self.flush_size = flush_size
+        self.flush_interval_s = flush_interval_s
+        self.on_full = on_full
+        self.block_timeout_s = block_timeout_s
+        self.max_retries = max_retries
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """Escribe los registros pendientes y detiene el hilo."""
+        if not self.running:
+            return
+        # La señal de parada espera su lugar en la cola: todo lo encolado antes se escribe
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def record(self, entries: List[Dict[str, Any]]) -> None:
+        accepted = dropped = blocked = 0
+        for entry in entries:
+            try:
+                self._queue.put_nowait(entry)
+                accepted += 1
+                continue
+            except queue.Full:
+                pass
+            if self.on_full == "block":
+                blocked += 1
+                try:
+                    self._queue.put(entry, timeout=self.block_timeout_s)
+                    accepted += 1
+                    continue
+                except queue.Full:
+                    pass
+            dropped += 1
+        with self._lock:
+            self.enqueued += accepted
+            self.dropped += dropped
+        AUDIT_LOG_EVENTS.inc(accepted, event="enqueued")
+        if blocked:
+            AUDIT_LOG_EVENTS.inc(blocked, event="blocked")
+        if dropped:
+            AUDIT_LOG_EVENTS.inc(dropped, event="dropped")
+            logger.warning(f"Audit log lleno: se descartaron {dropped} registros")
+
+    def _collect(self) -> List[Any]:
+        """Espera el primer registro y junta hasta flush_size o hasta flush_interval_s."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval_s
+        while len(batch) < self.flush_size and batch[-1] is not _STOP:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            stopping = batch[-1] is _STOP
+            entries = batch[:-1] if stopping else batch
+            if entries:
+                self._write(entries)
+            AUDIT_LOG_QUEUE_DEPTH.set(self._queue.qsize())
+            if stopping:
+                return
+
+    def _write(self, entries: List[Dict[str, Any]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with AUDIT_LOG_FLUSH_SECONDS.time():
+                    self.writer.write(entries)
+            except Exception:
+                logger.exception(f"Error escribiendo {len(entries)} registros de auditoría (intento {attempt + 1})")
+                time.sleep(min(0.1 * 2 ** attempt, 1.0))
+                continue
+            with self._lock:
+                self.written += len(entries)
+                self.flushes += 1
+            AUDIT_LOG_EVENTS.inc(len(entries), event="written")
+            return
+        with self._lock:
+            self.failed += len(entries)
+        AUDIT_LOG_EVENTS.inc(len(entries), event="failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "flush_size": self.flush_size,
+            "flush_interval_s": self.flush_interval_s,
+            "on_full": self.on_full,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
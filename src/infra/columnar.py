@@ -0,0 +1,183 @@
+import io
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Formatos binarios de /predict/columnar: la respuesta usa el mismo que la request
+NPZ_CONTENT_TYPE = "application/x-npz"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+CONTENT_TYPES = (NPZ_CONTENT_TYPE, ARROW_CONTENT_TYPE)
+
+# Columnas que usa la predicción; el resto (amount, channel_code, ...) se acepta y solo va al audit log
+REQUIRED_COLUMNS = ("client_id", "timestamp", "total_sent", "response_rate", "mean_delay")
+NUMERIC_COLUMNS = ("total_sent", "response_rate", "mean_delay")
+# Instante (UTC, offset aplicado) de cada timestamp: lo usan las ventanas del
+# RollingFeatureStore; "timestamp" queda en hora local para hour / weekday
+UTC_TIMESTAMP_COLUMN = "timestamp_utc"
+
+
+class ColumnarFormatError(ValueError):
+    """Cuerpo binario ilegible o con columnas faltantes / de distinto largo (la API responde 422)."""
+
+
+class UnsupportedFormatError(ValueError):
+    """Content-Type no soportado o formato sin su dependencia instalada (la API responde 415)."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise UnsupportedFormatError(
+            f"{ARROW_CONTENT_TYPE} requiere pyarrow (pip install pyarrow); usar {NPZ_CONTENT_TYPE}"
+        ) from None
+    return pa
+
+
+def media_type(content_type: str) -> str:
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+def _read(body: bytes, content_type: str) -> Dict[str, np.ndarray]:
+    kind = media_type(content_type)
+    if kind == NPZ_CONTENT_TYPE:
+        try:
+            with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+                return {name: archive[name] for name in archive.files}
+        except (ValueError, OSError, zipfile.BadZipFile) as exc:
+            raise ColumnarFormatError(f"npz inválido: {exc}") from None
+    if kind == ARROW_CONTENT_TYPE:
+        pa = _pyarrow()
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+        except (pa.ArrowInvalid, OSError) as exc:
+            raise ColumnarFormatError(f"Arrow IPC inválido: {exc}") from None
+        columns = {}
+        for name in table.column_names:
+            column = table.column(name)
+            if pa.types.is_timestamp(column.type) and column.type.tz is not None:
+                if name == "timestamp":
+                    columns[UTC_TIMESTAMP_COLUMN] = column.to_numpy()
+                # Hora local de la zona, como el offset de un timestamp ISO en el camino JSON
+                column = pa.compute.local_timestamp(column)
+            columns[name] = column.to_numpy()
+        return columns
+    raise UnsupportedFormatError(f"Content-Type no soportado: {content_type!r}. Opciones: {CONTENT_TYPES}")
+
+
+def decode(body: bytes, content_type: str) -> Dict[str, np.ndarray]:
+    """
+    Cuerpo binario de una request -> columnas (nombre -> array de NumPy), validadas.
+
+    npz: archivo de np.savez con un array 1-D por columna (sin pickle: solo
+    tipos numéricos, datetime64 y strings de largo fijo). Arrow: stream IPC
+    con una tabla; las columnas numéricas sin nulos se leen sin copia.
+
+    Raises:
+        UnsupportedFormatError: Content-Type desconocido o pyarrow no instalado.
+        ColumnarFormatError: Cuerpo ilegible, columnas faltantes o de distinto largo.
+    """
+    return validate(_read(body, content_type))
+
+
+def decode_response(body: bytes, content_type: str) -> Dict[str, np.ndarray]:
+    """Cuerpo binario de una respuesta de /predict/columnar -> columnas, sin las validaciones de la request."""
+    return _read(body, content_type)
+
+
+def _offset_micros(suffix: str) -> int:
+    """Offset ISO ('+02:00', '-0300', '+02') -> microsegundos."""
+    digits = suffix[1:].replace(":", "")
+    minutes = int(digits[:2]) * 60 + int(digits[2:4] or 0)
+    return (-1 if suffix[0] == "-" else 1) * minutes * 60_000_000
+
+
+def split_timestamps(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fechas -> (hora local como datetime64[us], offset como timedelta64[us]).
+    local - offset es el instante en UTC; sin offset (o 'Z') el offset es 0.
+
+    Raises:
+        ValueError: Algún valor no es una fecha.
+    """
+    values = np.asarray(values)
+    offsets = np.zeros(len(values), dtype="timedelta64[us]")
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[us]", copy=False), offsets
+    if values.dtype.kind == "O":
+        offsets[:] = [(v.utcoffset() or 0) if isinstance(v, datetime) else 0 for v in values]
+        values = np.array([
+            v.replace(tzinfo=None) if isinstance(v, datetime) else "NaT" if v is None else str(v) for v in values
+        ], dtype=object)
+        if all(isinstance(v, datetime) for v in values):
+            return values.astype("datetime64[us]"), offsets
+    text = np.char.strip(values.astype(str))
+    text = np.where(np.char.endswith(text, "Z"), np.char.rstrip(text, "Z"), text)
+    # El signo del offset va después de la fecha (YYYY-MM-DD ocupa las posiciones 0-9)
+    cut = np.maximum(np.char.rfind(text, "+"), np.char.rfind(text, "-"))
+    offset = cut >= 10
+    if offset.any():
+        offsets[offset] = [_offset_micros(t[i:]) for t, i in zip(text[offset], cut[offset])]
+        text[offset] = [t[:i] for t, i in zip(text[offset], cut[offset])]
+    return text.astype("datetime64[us]"), offsets
+
+
+def local_timestamps(values: Any) -> np.ndarray:
+    """
+    Fechas -> datetime64[us] con la hora local del texto. Un offset ISO ('Z',
+    '+02:00', '-0300') se descarta en lugar de pasar a UTC: así hour y
+    weekday salen iguales que en el camino JSON (datetime.fromisoformat).
+
+    Raises:
+        ValueError: Algún valor no es una fecha.
+    """
+    return split_timestamps(values)[0]
+
+
+def validate(columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    columns = {name: np.asarray(values) for name, values in columns.items()}
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ColumnarFormatError(f"Faltan columnas: {missing}")
+    if any(values.ndim != 1 for values in columns.values()):
+        raise ColumnarFormatError("Cada columna debe ser un array 1-D")
+    lengths = {name: len(values) for name, values in columns.items()}
+    if len(set(lengths.values())) > 1:
+        raise ColumnarFormatError(f"Columnas de distinto largo: {lengths}")
+    for name in NUMERIC_COLUMNS:
+        if columns[name].dtype.kind not in "biuf":
+            raise ColumnarFormatError(f"La columna {name} debe ser numérica (dtype {columns[name].dtype})")
+    try:
+        timestamps, offsets = split_timestamps(columns["timestamp"])
+    except ValueError as exc:
+        raise ColumnarFormatError(f"timestamp inválido: {exc}") from None
+    if np.isnat(timestamps).any():
+        raise ColumnarFormatError("timestamp con valores nulos")
+    columns["timestamp"] = timestamps
+    utc = columns.get(UTC_TIMESTAMP_COLUMN)
+    if utc is None or utc.dtype.kind != "M":
+        # Arrow con zona ya trae el instante (ver _read); si no, sale del offset del texto
+        columns[UTC_TIMESTAMP_COLUMN] = timestamps - offsets
+    return columns
+
+
+def encode(columns: Mapping[str, Sequence[Any]], content_type: str) -> bytes:
+    """Columnas -> cuerpo binario en el formato indicado (request del cliente o respuesta de la API)."""
+    kind = media_type(content_type)
+    if kind == NPZ_CONTENT_TYPE:
+        buffer = io.BytesIO()
+        # Sin compresión: np.load lee cada columna con una sola copia
+        np.savez(buffer, **{name: np.asarray(values) for name, values in columns.items()})
+        return buffer.getvalue()
+    if kind == ARROW_CONTENT_TYPE:
+        pa = _pyarrow()
+        table = pa.table({name: np.asarray(values) for name, values in columns.items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise UnsupportedFormatError(f"Content-Type no soportado: {content_type!r}. Opciones: {CONTENT_TYPES}")
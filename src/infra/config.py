@@ -1,7 +1,11 @@
+import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 class Settings:
     """Configuración central del proyecto."""
 
@@ -12,9 +16,9 @@ class Settings:
         env_path = self.BASE_DIR / env_file
         if env_path.exists():
             load_dotenv(env_path)
-            print(f"Cargado .env desde: {env_path}")
+            logger.info(f"Cargado .env desde: {env_path}")
         else:
-            print(f"Archivo {env_file} no encontrado en {self.BASE_DIR}")
+            logger.info(f"Archivo {env_file} no encontrado en {self.BASE_DIR}")
 
         # Variables requeridas
         self.DATABASE_URL: str = self._get_env("DATABASE_URL", required=True)
@@ -23,6 +27,61 @@ class Settings:
         self.MODEL_PATH: Path = Path(self._get_env("MODEL_PATH", "models/model.pkl"))
         self.MODEL_DIR: Path = self.MODEL_PATH.parent
         self.THRESHOLD: float = self._get_float_env("THRESHOLD", 0.7)
+        self.INFERENCE_ENGINE: str = self._get_env("INFERENCE_ENGINE", "sklearn")  # "sklearn" | "flat"
+        # Con el motor "flat", abrir los arrays .npy del modelo con mmap (compartidos entre workers)
+        self.MODEL_MMAP: bool = self._get_bool_env("MODEL_MMAP", True)
+        self.MODEL_POLL_INTERVAL_S: float = self._get_float_env("MODEL_POLL_INTERVAL_S", 10.0)
+
+        # Métricas por etapa en /metrics (formato Prometheus)
+        self.METRICS_ENABLED: bool = self._get_bool_env("METRICS_ENABLED", True)
+
+        # Cache de predicciones (LRU/TTL) por vector de features
+        self.PREDICTION_CACHE_ENABLED: bool = self._get_bool_env("PREDICTION_CACHE_ENABLED", False)
+        self.PREDICTION_CACHE_MAX_SIZE: int = self._get_int_env("PREDICTION_CACHE_MAX_SIZE", 50_000)
+        self.PREDICTION_CACHE_TTL_S: float = self._get_float_env("PREDICTION_CACHE_TTL_S", 600.0)
+        # Paso de redondeo por feature, p. ej. "response_rate=0.01,mean_delay=1"
+        self.PREDICTION_CACHE_QUANTIZATION: str = self._get_env("PREDICTION_CACHE_QUANTIZATION", "")
+        self.PREDICTION_CACHE_BYPASS: bool = self._get_bool_env("PREDICTION_CACHE_BYPASS", False)
+
+        # Micro-batching de /predict
+        self.BATCH_ENABLED: bool = self._get_bool_env("BATCH_ENABLED", True)
+        self.BATCH_WINDOW_MS: float = self._get_float_env("BATCH_WINDOW_MS", 2.0)
+        self.BATCH_MAX_SIZE: int = self._get_int_env("BATCH_MAX_SIZE", 64)
+
+        # Control de admisión y executor dedicado de /predict
+        self.ADMISSION_ENABLED: bool = self._get_bool_env("ADMISSION_ENABLED", True)
+        self.INFERENCE_WORKERS: int = self._get_int_env("INFERENCE_WORKERS", 0)  # 0 = os.cpu_count()
+        self.ADMISSION_MAX_IN_FLIGHT: int = self._get_int_env("ADMISSION_MAX_IN_FLIGHT", 256)
+        self.ADMISSION_TIMEOUT_MS: float = self._get_float_env("ADMISSION_TIMEOUT_MS", 1000.0)  # 0 = sin deadline
+        self.ADMISSION_RETRY_AFTER_S: float = self._get_float_env("ADMISSION_RETRY_AFTER_S", 1.0)
+
+        # Feature store en línea por cliente
+        self.FEATURE_STORE_ENABLED: bool = self._get_bool_env("FEATURE_STORE_ENABLED", False)
+        self.FEATURE_STORE_MAX_CLIENTS: int = self._get_int_env("FEATURE_STORE_MAX_CLIENTS", 100_000)
+        self.FEATURE_STORE_SNAPSHOT_PATH: Path = Path(
+            self._get_env("FEATURE_STORE_SNAPSHOT_PATH", str(self.MODEL_DIR / "feature_store.json"))
+        )
+        self.FEATURE_STORE_SNAPSHOT_INTERVAL_S: float = self._get_float_env("FEATURE_STORE_SNAPSHOT_INTERVAL_S", 60.0)
+        # Features por ventana (1h, 24h, 7d) a la fecha de cada request; se usan si el modelo las tiene
+        self.ROLLING_FEATURES_ENABLED: bool = self._get_bool_env("ROLLING_FEATURES_ENABLED", False)
+        self.ROLLING_FEATURES_MAX_CLIENTS: int = self._get_int_env("ROLLING_FEATURES_MAX_CLIENTS", 100_000)
+
+        # Audit log de decisiones (escritura diferida en lotes)
+        self.AUDIT_LOG_ENABLED: bool = self._get_bool_env("AUDIT_LOG_ENABLED", False)
+        # Base de la tabla auditoria_decisiones (vacío = DATABASE_URL)
+        self.AUDIT_LOG_DATABASE_URL: str = self._get_env("AUDIT_LOG_DATABASE_URL", "") or self.DATABASE_URL
+        # Si se define, se escribe a un archivo JSON Lines en lugar de la base
+        self.AUDIT_LOG_PATH: str = self._get_env("AUDIT_LOG_PATH", "")
+        self.AUDIT_LOG_QUEUE_SIZE: int = self._get_int_env("AUDIT_LOG_QUEUE_SIZE", 10_000)
+        self.AUDIT_LOG_FLUSH_SIZE: int = self._get_int_env("AUDIT_LOG_FLUSH_SIZE", 500)
+        self.AUDIT_LOG_FLUSH_INTERVAL_S: float = self._get_float_env("AUDIT_LOG_FLUSH_INTERVAL_S", 1.0)
+        self.AUDIT_LOG_ON_FULL: str = self._get_env("AUDIT_LOG_ON_FULL", "drop")  # "drop" | "block"
+        self.AUDIT_LOG_POOL_SIZE: int = self._get_int_env("AUDIT_LOG_POOL_SIZE", 2)
+
+        # Monitor de drift en línea (sketches contra la referencia de entrenamiento, ver /drift)
+        self.DRIFT_MONITOR_ENABLED: bool = self._get_bool_env("DRIFT_MONITOR_ENABLED", True)
+        self.DRIFT_PSI_THRESHOLD: float = self._get_float_env("DRIFT_PSI_THRESHOLD", 0.2)
+        self.DRIFT_MIN_SAMPLES: int = self._get_int_env("DRIFT_MIN_SAMPLES", 100)
 
     def _get_env(self, key: str, default=None, required: bool = False) -> str:
         value = os.getenv(key, default)
@@ -39,7 +98,32 @@ class Settings:
         except ValueError:
             return default
 
-# Instancia global
-settings = Settings()
-print(f"THRESHOLD configurado: {settings.THRESHOLD}")
-print(f"MODEL_PATH configurado: {settings.MODEL_PATH}")
\ No newline at end of file
+    def _get_int_env(self, key: str, default: int) -> int:
+        value_str = os.getenv(key)
+        if value_str is None:
+            return default
+        try:
+            return int(value_str)
+        except ValueError:
+            return default
+
+    def _get_bool_env(self, key: str, default: bool) -> bool:
+        value_str = os.getenv(key)
+        if value_str is None:
+            return default
+        return value_str.strip().lower() in ("1", "true", "yes", "si", "sí")
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Instancia única de Settings: el .env se lee una sola vez, en el primer uso."""
+    settings = Settings()
+    logger.info(f"THRESHOLD configurado: {settings.THRESHOLD}")
+    logger.info(f"MODEL_PATH configurado: {settings.MODEL_PATH}")
+    return settings
+
+
+def __getattr__(name: str):
+    # Compatibilidad con `from src.infra.config import settings` sin cargar el .env al importar
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
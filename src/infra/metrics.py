@@ -0,0 +1,240 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[str, ...]
+
+
+class _Metric:
+    TYPE = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.TYPE}"]
+
+
+class Counter(_Metric):
+    """Contador monótono, opcionalmente con etiquetas."""
+
+    TYPE = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{self._format_labels(key)} {value:g}" for key, value in items)
+        return lines
+
+
+class Gauge(_Metric):
+    """Valor instantáneo (p. ej. profundidad de una cola), opcionalmente con etiquetas."""
+
+    TYPE = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{self._format_labels(key)} {value:g}" for key, value in items)
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, str]) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class _NullTimer:
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Histogram(_Metric):
+    """
+    Histograma acumulativo con buckets fijos (segundos por defecto). Cada
+    observación cuesta un bisect y una suma bajo un lock, del orden de un
+    microsegundo.
+    """
+
+    TYPE = "histogram"
+    DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiqueta: [conteo por bucket (+Inf al final), suma, total]
+        self._series: Dict[LabelKey, List] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels: str):
+        """Context manager que observa la duración del bloque."""
+        if not self.registry.enabled:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def total(self, **labels: str) -> float:
+        series = self._series.get(self._key(labels))
+        return series[1] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', '+Inf'))} {n}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {total:.9g}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {n}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas en proceso con salida en formato de texto de
+    Prometheus. Con enabled=False las observaciones no hacen nada.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help_text, labelnames))
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro global y métricas de la aplicación
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "Duración de las requests HTTP", ("method", "path", "status")
+)
+PREDICT_STAGE_SECONDS = metrics.histogram(
+    "predict_stage_seconds", "Duración de cada etapa de la predicción", ("stage", "mode")
+)
+PREDICT_REQUESTS = metrics.counter("predict_requests_total", "Predicciones atendidas", ("mode",))
+PREDICT_ERRORS = metrics.counter("predict_errors_total", "Predicciones que terminaron en error", ("stage",))
+FRAUD_DECISIONS = metrics.counter("fraud_decisions_total", "Decisiones finales por resultado", ("prediction",))
+TRAIN_STAGE_SECONDS = metrics.histogram(
+    "train_stage_seconds", "Duración de cada etapa del entrenamiento", ("stage",)
+)
+PREDICTION_CACHE_EVENTS = metrics.counter(
+    "prediction_cache_events_total", "Eventos de la cache de predicciones (hit, miss, eviction, expired)", ("event",)
+)
+AUDIT_LOG_EVENTS = metrics.counter(
+    "audit_log_events_total", "Registros de auditoría (enqueued, written, dropped, blocked, failed)", ("event",)
+)
+AUDIT_LOG_QUEUE_DEPTH = metrics.gauge("audit_log_queue_depth", "Registros de auditoría pendientes de escritura")
+AUDIT_LOG_FLUSH_SECONDS = metrics.histogram("audit_log_flush_seconds", "Duración de cada escritura por lotes del audit log")
+ADMISSION_EVENTS = metrics.counter(
+    "admission_events_total", "Control de admisión de /predict (admitted, rejected, deadline_exceeded)", ("event",)
+)
+ADMISSION_IN_FLIGHT = metrics.gauge("admission_in_flight", "Requests de predicción admitidas en curso")
+INFERENCE_TASKS = metrics.gauge("inference_executor_tasks", "Tareas del executor de inferencia", ("state",))
+INFERENCE_QUEUE_WAIT_SECONDS = metrics.histogram(
+    "inference_queue_wait_seconds", "Espera en cola antes de empezar la inferencia"
+)
+DRIFT_PSI = metrics.gauge("drift_psi", "PSI del tráfico frente a la referencia de entrenamiento (al consultar /drift)", ("variable",))
+DRIFT_KS = metrics.gauge("drift_ks", "KS por bins del tráfico frente a la referencia de entrenamiento", ("variable",))
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Agrupa requests concurrentes en lotes pequeños antes de puntuarlos.
+
+    Los items que llegan dentro de una ventana (max_wait_ms) o hasta completar
+    max_batch_size se procesan con una sola llamada a process_batch, que corre
+    en un executor para no bloquear el event loop. Cada llamador recibe su
+    propio resultado. Solo hay un lote en vuelo a la vez: mientras se puntúa,
+    los nuevos requests se acumulan para el siguiente.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_wait_ms: float = 2.0,
+        max_batch_size: int = 64,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        Args:
+            process_batch (Callable): Función síncrona que recibe una lista de items
+                                      y devuelve una lista de resultados del mismo largo.
+            max_wait_ms (float): Tiempo máximo que espera el primer item del lote.
+            max_batch_size (int): Tamaño máximo de lote.
+            executor (Optional[Executor]): Executor donde corre process_batch
+                                           (por defecto el del event loop).
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size debe ser >= 1")
+        self.process_batch = process_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Estadísticas de llenado
+        self.batches = 0
+        self.items = 0
+        self.full_batches = 0
+        self.max_observed = 0
+        self.size_histogram: Dict[int, int] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Procesa lo que quede en cola y detiene el loop de batching."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, item: Any) -> Any:
+        if not self.running:
+            raise RuntimeError("MicroBatcher no iniciado; llamar start() primero")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self, first: Tuple[Any, asyncio.Future]) -> Tuple[List[Tuple[Any, asyncio.Future]], bool]:
+        loop = asyncio.get_running_loop()
+        batch = [first]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                entry = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch, stopping = await self._collect(first)
+            await self._dispatch(batch)
+
+        # Procesar lo que haya quedado encolado tras la señal de parada
+        pending = []
+        while not self._queue.empty():
+            entry = self._queue.get_nowait()
+            if entry is not None:
+                pending.append(entry)
+        for i in range(0, len(pending), self.max_batch_size):
+            await self._dispatch(pending[i:i + self.max_batch_size])
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        # Descartar llamadores que ya cancelaron
+        batch = [(item, fut) for item, fut in batch if not fut.done()]
+        if not batch:
+            return
+
+        self._record(len(batch))
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.process_batch, [item for item, _ in batch])
+        except Exception as exc:
+            logger.exception("Error procesando lote de %d items", len(batch))
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        if len(results) != len(batch):
+            # Un zip truncaría: los llamadores sin resultado quedarían esperando para siempre
+            exc = RuntimeError(f"process_batch devolvió {len(results)} resultados para {len(batch)} items")
+            logger.error("%s", exc)
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.items += size
+        self.max_observed = max(self.max_observed, size)
+        if size >= self.max_batch_size:
+            self.full_batches += 1
+        self.size_histogram[size] = self.size_histogram.get(size, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Reporte de llenado de los lotes procesados hasta ahora."""
+        mean_size = self.items / self.batches if self.batches else 0.0
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": mean_size,
+            "mean_fill_ratio": mean_size / self.max_batch_size,
+            "full_batches": self.full_batches,
+            "max_batch_size_observed": self.max_observed,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "size_histogram": dict(sorted(self.size_histogram.items())),
+        }
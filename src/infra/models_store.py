@@ -1,12 +1,31 @@
+import json
 import joblib
 import logging
+import os
+import numpy as np
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Any
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
 
 class ModelStore:
+    """
+    Registro versionado de modelos.
+
+    Cada save_model crea una carpeta versions/<versión>/ con model.pkl,
+    features.pkl, meta.json y, para bosques de árboles, flat/ con los arrays
+    del FlatForest en .npy (mapeables en memoria), y luego mueve el puntero CURRENT de forma
+    atómica. Si no hay puntero (instalaciones previas) se usan los archivos
+    model.pkl / features.pkl directamente en base_dir como versión "legacy".
+    """
+
+    CURRENT_FILE = "CURRENT"
+    VERSIONS_DIR = "versions"
+    LEGACY_VERSION = "legacy"
+    FLAT_DIR = "flat"
+    DRIFT_REFERENCE_FILE = "drift_reference.json"
 
     def __init__(self, base_dir: Optional[str] = None) -> None:
         """
@@ -19,21 +38,93 @@ class ModelStore:
         # Determinar carpeta base del proyecto
         project_root = Path(__file__).resolve().parents[2]
         self.base_dir = Path(base_dir) if base_dir else project_root / "models"
+        self.versions_dir: Path = self.base_dir / self.VERSIONS_DIR
+        self.current_path: Path = self.base_dir / self.CURRENT_FILE
 
-        # Paths de archivos
-        self.model_path: Path = self.base_dir / "model.pkl"
-        self.features_path: Path = self.base_dir / "features.pkl"
-
-        # Cache en memoria
+        # Cache en memoria (de la versión _cached_version)
         self._model: Optional[Any] = None
         self._features: Optional[List[str]] = None
+        self._cached_version: Optional[str] = None
 
         # Crear carpeta si no existe
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
-    def load_model(self) -> Any:
+    # --- Versiones ---
+    def list_versions(self) -> List[str]:
+        """Versiones guardadas, de la más antigua a la más reciente."""
+        if not self.versions_dir.exists():
+            return []
+        return sorted(p.name for p in self.versions_dir.iterdir() if (p / "model.pkl").exists())
+
+    def current_version(self) -> Optional[str]:
+        """
+        Versión activa según el puntero CURRENT, "legacy" si solo existe el
+        model.pkl plano, o None si no hay ningún modelo.
+        """
+        if self.current_path.exists():
+            return self.current_path.read_text(encoding="utf-8").strip()
+        if (self.base_dir / "model.pkl").exists():
+            return self.LEGACY_VERSION
+        return None
+
+    def version_dir(self, version: Optional[str] = None) -> Path:
+        version = version or self.current_version()
+        if version is None or version == self.LEGACY_VERSION:
+            return self.base_dir
+        return self.versions_dir / version
+
+    @property
+    def model_path(self) -> Path:
+        return self.version_dir() / "model.pkl"
+
+    @property
+    def features_path(self) -> Path:
+        return self.version_dir() / "features.pkl"
+
+    def set_current(self, version: str) -> None:
+        """Mueve el puntero CURRENT a una versión existente (escritura atómica)."""
+        if version not in self.list_versions():
+            raise ValueError(f"No existe la versión {version} en {self.versions_dir}")
+        tmp = self.current_path.with_suffix(".tmp")
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, self.current_path)
+        logger.info(f"Versión activa: {version}")
+
+    def rollback(self, to: Optional[str] = None) -> str:
+        """
+        Activa la versión indicada o, si no se indica, la inmediatamente
+        anterior a la activa.
+
+        Raises:
+            ValueError: Si no hay una versión anterior a la cual volver (incluido
+                        el modelo legacy, que es anterior a todas las versiones).
         """
-        Carga el modelo entrenado desde disco (singleton).
+        if to is None:
+            versions = self.list_versions()
+            current = self.current_version()
+            if current == self.LEGACY_VERSION:
+                # "legacy" se ordena después de los ids con fecha, pero es el más antiguo
+                raise ValueError(f"No hay una versión anterior a {current}")
+            older = [v for v in versions if current is None or v < current]
+            if not older:
+                raise ValueError(f"No hay una versión anterior a {current}")
+            to = older[-1]
+        self.set_current(to)
+        return to
+
+    def load_metadata(self, version: Optional[str] = None) -> Dict[str, Any]:
+        meta_path = self.version_dir(version) / "meta.json"
+        if not meta_path.exists():
+            return {"version": version or self.current_version()}
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+
+    # --- Carga ---
+    def load_model(self, version: Optional[str] = None) -> Any:
+        """
+        Carga el modelo entrenado desde disco (cacheado por versión).
+
+        Args:
+            version (Optional[str]): Versión a cargar; por defecto la activa.
 
         Returns:
             Any: El modelo cargado en memoria.
@@ -41,15 +132,19 @@ class ModelStore:
         Raises:
             FileNotFoundError: Si no existe el archivo model.pkl.
         """
-        if self._model is None:
-            if not self.model_path.exists():
-                raise FileNotFoundError(f"No se encontró modelo en {self.model_path}")
-            logger.info(f"Cargando modelo desde: {self.model_path}")
-            self._model = joblib.load(self.model_path)
+        version = version or self.current_version()
+        if self._model is None or self._cached_version != version:
+            model_path = self.version_dir(version) / "model.pkl"
+            if not model_path.exists():
+                raise FileNotFoundError(f"No se encontró modelo en {model_path}")
+            logger.info(f"Cargando modelo desde: {model_path}")
+            self._model = joblib.load(model_path)
+            self._features = None
+            self._cached_version = version
             logger.info("Modelo cargado exitosamente")
         return self._model
 
-    def load_features(self) -> List[str]:
+    def load_features(self, version: Optional[str] = None) -> List[str]:
         """
         Carga la lista de columnas usadas en el entrenamiento.
 
@@ -59,28 +154,151 @@ class ModelStore:
         Raises:
             FileNotFoundError: Si no existe el archivo features.pkl.
         """
-        if self._features is None:
-            if not self.features_path.exists():
-                raise FileNotFoundError(f"No se encontraron features en {self.features_path}")
-            logger.info(f"Cargando features desde: {self.features_path}")
-            self._features = joblib.load(self.features_path)
+        version = version or self.current_version()
+        if self._features is None or self._cached_version != version:
+            features_path = self.version_dir(version) / "features.pkl"
+            if not features_path.exists():
+                raise FileNotFoundError(f"No se encontraron features en {features_path}")
+            logger.info(f"Cargando features desde: {features_path}")
+            features = joblib.load(features_path)
+            if self._cached_version != version:
+                self._model = None
+                self._cached_version = version
+            self._features = features
         return self._features
 
-    def save_model(self, model: Any, features: List[str]) -> None:
+    # --- Formato plano mapeable en memoria ---
+    def has_flat_model(self, version: Optional[str] = None) -> bool:
+        return (self.version_dir(version) / self.FLAT_DIR / "meta.json").exists()
+
+    def save_flat_model(self, model: Any, version: Optional[str] = None) -> bool:
         """
-        Guarda el modelo y las columnas de features en disco.
+        Guarda el bosque aplanado (FlatForest) como archivos .npy sin comprimir
+        en <versión>/flat/. Así cada worker lo abre con mmap de solo lectura y
+        todos comparten una única copia en el page cache del sistema operativo.
+
+        Returns:
+            bool: False si el modelo no es un ensamble de árboles compatible.
+        """
+        from src.ml.flat_forest import FlatForest
+
+        try:
+            flat = FlatForest.from_sklearn(model)
+        except ValueError as exc:
+            logger.info(f"Formato plano no generado: {exc}")
+            return False
+
+        target = self.version_dir(version) / self.FLAT_DIR
+        tmp_dir = target.with_name(f".{self.FLAT_DIR}.tmp")
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        for name, array in flat.to_arrays().items():
+            np.save(tmp_dir / f"{name}.npy", array, allow_pickle=False)
+        (tmp_dir / "meta.json").write_text(
+            json.dumps({"max_depth": flat.max_depth, "n_estimators": flat.n_estimators}), encoding="utf-8"
+        )
+        os.replace(tmp_dir, target)
+        logger.info(f"Modelo plano guardado en {target}")
+        return True
+
+    def load_flat_model(self, version: Optional[str] = None, mmap: bool = True) -> Optional[Any]:
+        """
+        Abre el bosque aplanado de una versión. Con mmap=True los arrays son
+        memmaps de solo lectura (no se copian al heap del proceso).
+
+        Returns:
+            Optional[FlatForest]: None si la versión no tiene formato plano.
+        """
+        from src.ml.flat_forest import FlatForest
+
+        if not self.has_flat_model(version):
+            return None
+        source = self.version_dir(version) / self.FLAT_DIR
+        meta = json.loads((source / "meta.json").read_text(encoding="utf-8"))
+        arrays = {
+            name: np.load(source / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+            for name in FlatForest.ARRAY_FIELDS
+        }
+        return FlatForest.from_arrays(arrays, meta["max_depth"])
+
+    # --- Referencia de drift ---
+    def load_drift_reference(self, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Referencia de drift de la versión, o None si se entrenó sin ella."""
+        path = self.version_dir(version) / self.DRIFT_REFERENCE_FILE
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    # --- Guardado ---
+    def save_model(
+        self,
+        model: Any,
+        features: List[str],
+        metadata: Optional[Dict[str, Any]] = None,
+        drift_reference: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Guarda el modelo y las columnas de features como una versión nueva y
+        la activa.
 
         Args:
             model (Any): Modelo de ML a guardar.
             features (List[str]): Lista de features usadas en entrenamiento.
+            metadata (Optional[Dict[str, Any]]): Información extra para meta.json.
+            drift_reference (Optional[Dict[str, Any]]): Sketch de referencia del
+                monitor de drift (DriftReference.to_dict), se guarda en drift_reference.json.
+
+        Returns:
+            str: Identificador de la versión creada.
         """
-        self.base_dir.mkdir(parents=True, exist_ok=True)
-        joblib.dump(model, self.model_path)
-        joblib.dump(features, self.features_path)
-        logger.info(f"Modelo guardado en {self.model_path}")
-        logger.info(f"Features guardadas en {self.features_path}")
+        version = self._new_version_id()
+        target = self.versions_dir / version
+        tmp_dir = self.versions_dir / f".{version}.tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=False)
+
+        joblib.dump(model, tmp_dir / "model.pkl")
+        joblib.dump(features, tmp_dir / "features.pkl")
+        meta = {
+            "version": version,
+            "created_at": datetime.now().isoformat(),
+            "features": list(features),
+            "backend": self.infer_backend(model),
+        }
+        meta.update(metadata or {})
+        (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2, default=str), encoding="utf-8")
+        if drift_reference is not None:
+            (tmp_dir / self.DRIFT_REFERENCE_FILE).write_text(json.dumps(drift_reference), encoding="utf-8")
+        # La carpeta aparece completa o no aparece
+        os.replace(tmp_dir, target)
+        self.save_flat_model(model, version)
+
+        self.set_current(version)
+        logger.info(f"Modelo guardado en {target / 'model.pkl'}")
+        logger.info(f"Features guardadas en {target / 'features.pkl'}")
         self._model = model
         self._features = features
+        self._cached_version = version
+        return version
+
+    @staticmethod
+    def infer_backend(model: Any) -> str:
+        """Backend que produjo el modelo: "random_forest", "lightgbm" o el nombre de la clase."""
+        name = type(model).__name__
+        if name == "RandomForestClassifier":
+            return "random_forest"
+        if type(model).__module__.startswith("lightgbm"):
+            return "lightgbm"
+        return name
+
+    def load_backend(self, version: Optional[str] = None) -> Optional[str]:
+        """Backend registrado en meta.json (None en versiones anteriores a este campo)."""
+        return self.load_metadata(version).get("backend")
+
+    def _new_version_id(self) -> str:
+        version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        existing = set(self.list_versions())
+        while version in existing or (self.versions_dir / version).exists():
+            version = f"{version}_1"
+        return version
 
 
 def get_model_dir(base_dir: Optional[str] = None) -> Path:
@@ -1,21 +1,83 @@
+import io
+from contextlib import contextmanager
+from datetime import datetime
 from sqlalchemy import create_engine, text
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
 from src.domain.entities import EnviosCliente, Transaccion
-from src.infra.config import Settings
+from src.domain.envios_batch import EnviosBatch
+from src.infra.config import get_settings
 
 class EnviosRepository:
+    DEFAULT_CHUNK_SIZE = 10_000
+    ENVIOS_COLUMNS = [
+        "client_id", "transaction_id", "sent_at", "response_at",
+        "response_class", "amount", "status", "trx_timestamp"
+    ]
+
     def __init__(self, engine=None):
         if engine:
             self.engine = engine
         else:
-            settings = Settings()
+            settings = get_settings()
             if not settings.DATABASE_URL:
                 raise RuntimeError("DATABASE_URL no configurada")
             self.engine = create_engine(settings.DATABASE_URL)
 
-    def fetch_as_entities(self) -> List[EnviosCliente]:
-        query = text("""
-            SELECT e.client_id,
+    @staticmethod
+    def _where(
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Cláusula WHERE (sobre el alias e de envios_cliente) y sus parámetros."""
+        conditions, params = [], {}
+        if after_id is not None:
+            conditions.append("e.id > :after_id")
+            params["after_id"] = after_id
+        if max_id is not None:
+            conditions.append("e.id <= :max_id")
+            params["max_id"] = max_id
+        if sent_after is not None:
+            conditions.append("e.sent_at > :sent_after")
+            params["sent_after"] = sent_after
+        if sent_from is not None:
+            conditions.append("e.sent_at >= :sent_from")
+            params["sent_from"] = sent_from
+        if sent_to is not None:
+            conditions.append("e.sent_at < :sent_to")
+            params["sent_to"] = sent_to
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    @staticmethod
+    def _envios_query(
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+        keyset: bool = False,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        max_id: Optional[int] = None,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Query base envios_cliente LEFT JOIN transacciones. El rango opcional
+        [sent_from, sent_to) sobre sent_at aprovecha idx_envios_sent_at;
+        sent_after es un límite exclusivo (watermark del entrenamiento incremental).
+        Con keyset=True se agrega e.id AS envio_id y se pagina por la clave
+        primaria: ids mayores que after_id (y hasta max_id), en orden, a lo sumo limit filas.
+        """
+        where, params = EnviosRepository._where(sent_from, sent_to, sent_after, after_id, max_id)
+        key_column = "e.id AS envio_id," if keyset else ""
+        order_by = "ORDER BY e.id" if keyset else ""
+        if limit is not None:
+            order_by += " LIMIT :limit"
+            params["limit"] = limit
+
+        query = text(f"""
+            SELECT {key_column}
+                   e.client_id,
                    e.transaction_id,
                    e.sent_at,
                    e.response_at,
@@ -25,28 +87,392 @@ class EnviosRepository:
                    t.timestamp AS trx_timestamp
             FROM envios_cliente e
             LEFT JOIN transacciones t ON t.transaction_id = e.transaction_id
+            {where}
+            {order_by}
         """)
+        return query, params
+
+    def _iter_partitions(
+        self,
+        chunk_size: int,
+        sent_from: Optional[datetime],
+        sent_to: Optional[datetime],
+        sent_after: Optional[datetime] = None,
+    ) -> Iterator[Tuple[List[str], List[Any]]]:
+        """
+        Ejecuta la query con un cursor del lado del servidor (stream_results)
+        y entrega las filas en bloques de chunk_size, sin materializar el
+        resultado completo en memoria.
+        """
+        query, params = self._envios_query(sent_from, sent_to, sent_after)
         with self.engine.connect() as conn:
-            result = conn.execute(query)
-            rows = [dict(row) for row in result.mappings()]
+            conn = conn.execution_options(stream_results=True, yield_per=chunk_size)
+            result = conn.execute(query, params)
+            keys = list(result.keys())
+            for partition in result.partitions(chunk_size):
+                yield keys, partition
+
+    @staticmethod
+    def _row_to_entity(row: Any) -> EnviosCliente:
+        trans = Transaccion(
+            transaction_id=row.transaction_id,
+            client_id=row.client_id,
+            amount=row.amount or 0,
+            status=row.status or "approved",
+            timestamp=row.trx_timestamp
+        )
+        return EnviosCliente(
+            envio_id=row.transaction_id,
+            client_id=row.client_id,
+            sent_at=row.sent_at,
+            response_at=row.response_at,
+            response_class=row.response_class,
+            transaction=trans
+        )
 
+    def fetch_as_entities(
+        self,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+    ) -> List[EnviosCliente]:
         entidades = []
-        for row in rows:
-            trans = Transaccion(
-                transaction_id=row["transaction_id"],
-                client_id=row["client_id"],
-                amount=row["amount"] or 0,
-                status=row["status"] or "approved",
-                timestamp=row["trx_timestamp"]
+        for chunk in self.iter_entities(sent_from=sent_from, sent_to=sent_to):
+            entidades.extend(chunk)
+        return entidades
+
+    def iter_entities(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+    ) -> Iterator[List[EnviosCliente]]:
+        """
+        Versión en streaming de fetch_as_entities: entrega listas de a lo sumo
+        chunk_size entidades leídas con un cursor del lado del servidor.
+        """
+        for _, partition in self._iter_partitions(chunk_size, sent_from, sent_to):
+            yield [self._row_to_entity(row) for row in partition]
+
+    def iter_frames(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Variante columnar: cada bloque del cursor se vuelca directamente a un
+        DataFrame (sin dicts ni dataclasses por fila), con los mismos valores
+        por defecto que fetch_as_entities para amount y status.
+        """
+        for keys, partition in self._iter_partitions(chunk_size, sent_from, sent_to, sent_after):
+            yield self._partition_frame(keys, partition)
+
+    def iter_batches(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+    ) -> Iterator[EnviosBatch]:
+        """Como iter_entities pero cada bloque es un EnviosBatch (columnas tipadas, sin objetos por fila)."""
+        for frame in self.iter_frames(chunk_size, sent_from, sent_to, sent_after):
+            yield EnviosBatch.from_frame(frame)
+
+    def fetch_batch(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+    ) -> EnviosBatch:
+        """
+        Mismos envíos que fetch_as_entities en un único EnviosBatch. Solo un
+        bloque de chunk_size filas existe a la vez como DataFrame.
+        """
+        return EnviosBatch.concat(self.iter_batches(chunk_size, sent_from, sent_to, sent_after))
+
+    def iter_keyset_frames(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Como iter_frames pero paginando por envios_cliente.id: cada bloque es
+        una query corta (id > último id leído, ORDER BY id LIMIT chunk_size),
+        sin cursor ni transacción abiertos entre bloques, y trae la columna
+        envio_id. after_id retoma una lectura interrumpida (checkpoint) y
+        max_id deja fuera los envíos insertados después de una lectura previa.
+        """
+        while True:
+            query, params = self._envios_query(
+                sent_from, sent_to, keyset=True, after_id=after_id, limit=chunk_size, max_id=max_id
+            )
+            with self.engine.connect() as conn:
+                result = conn.execute(query, params)
+                keys, partition = list(result.keys()), result.fetchall()
+            if not partition:
+                return
+            frame = self._partition_frame(keys, partition)
+            yield frame
+            if len(frame) < chunk_size:
+                return
+            after_id = int(frame["envio_id"].iloc[-1])
+
+    @staticmethod
+    def _partition_frame(keys: List[str], partition: List[Any]) -> pd.DataFrame:
+        frame = pd.DataFrame.from_records(partition, columns=keys)
+        frame["amount"] = pd.to_numeric(frame["amount"]).fillna(0)
+        frame["status"] = frame["status"].fillna("").replace("", "approved")
+        return frame
+
+    def fetch_frame(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Concatena los bloques de iter_frames en un único DataFrame."""
+        frames = list(self.iter_frames(chunk_size, sent_from, sent_to, sent_after))
+        if not frames:
+            return pd.DataFrame(columns=self.ENVIOS_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+
+    def _delay_seconds(self) -> str:
+        """Expresión SQL de la demora de respuesta en segundos (NULL sin respuesta) según el motor."""
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            return "EXTRACT(EPOCH FROM (e.response_at - e.sent_at))"
+        if dialect == "sqlite":
+            # Fechas como texto: segundos enteros de '%s' más la fracción de '%f' (SS.SSS).
+            # julianday pierde precisión (días en coma flotante); SQLite resuelve hasta milisegundos.
+            return (
+                "((strftime('%s', e.response_at) - strftime('%s', e.sent_at))"
+                " + (strftime('%f', e.response_at) - strftime('%S', e.response_at))"
+                " - (strftime('%f', e.sent_at) - strftime('%S', e.sent_at)))"
+            )
+        raise NotImplementedError(f"Agregación en SQL no soportada para {dialect}")
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[Any]:
+        """
+        Conexión con una transacción de lectura: todas las queries ven la
+        misma foto de la base. REPEATABLE READ en PostgreSQL; en SQLite un
+        BEGIN explícito (pysqlite no lo emite antes de un SELECT).
+        """
+        with self.engine.connect() as conn:
+            dialect = self.engine.dialect.name
+            if dialect == "postgresql":
+                conn = conn.execution_options(isolation_level="REPEATABLE READ")
+            elif dialect == "sqlite":
+                conn.exec_driver_sql("BEGIN")
+            yield conn
+
+    def _read_client_aggregates(
+        self,
+        conn: Any,
+        sent_from: Optional[datetime],
+        sent_to: Optional[datetime],
+        sent_after: Optional[datetime],
+    ) -> pd.DataFrame:
+        where, params = self._where(sent_from, sent_to, sent_after)
+        query = text(f"""
+            SELECT e.client_id,
+                   COUNT(*) AS total_sent,
+                   COUNT(e.response_at) AS responded,
+                   COALESCE(SUM({self._delay_seconds()}), 0) AS delay_sum
+            FROM envios_cliente e
+            {where}
+            GROUP BY e.client_id
+        """)
+        result = conn.execute(query, params)
+        frame = pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()))
+        frame = frame.set_index("client_id")
+        # EXTRACT(EPOCH ...) devuelve NUMERIC en PostgreSQL (Decimal en Python)
+        frame["delay_sum"] = pd.to_numeric(frame["delay_sum"]).astype(float)
+        return frame.astype({"total_sent": "int64", "responded": "int64"})
+
+    def _send_projection_partitions(
+        self,
+        conn: Any,
+        chunk_size: int,
+        sent_from: Optional[datetime],
+        sent_to: Optional[datetime],
+        sent_after: Optional[datetime],
+    ) -> Iterator[pd.DataFrame]:
+        where, params = self._where(sent_from, sent_to, sent_after)
+        query = text(f"""
+            SELECT e.client_id,
+                   e.sent_at,
+                   COALESCE(NULLIF(t.status, ''), 'approved') AS status
+            FROM envios_cliente e
+            LEFT JOIN transacciones t ON t.transaction_id = e.transaction_id
+            {where}
+        """)
+        conn = conn.execution_options(stream_results=True, yield_per=chunk_size)
+        result = conn.execute(query, params)
+        keys = list(result.keys())
+        for partition in result.partitions(chunk_size):
+            yield pd.DataFrame.from_records(partition, columns=keys)
+
+    def fetch_client_aggregates(
+        self,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """
+        Agregados por cliente calculados en la base (GROUP BY client_id sobre
+        idx_envios_client_id): una fila por cliente con total_sent, responded
+        y delay_sum, indexada por client_id. Mismo formato que
+        FeatureEngineering.aggregate_clients sobre los envíos del rango.
+        Para combinarlos con la proyección por envío usar fetch_pushdown.
+        """
+        with self.engine.connect() as conn:
+            return self._read_client_aggregates(conn, sent_from, sent_to, sent_after)
+
+    def iter_send_projection(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Proyección por envío con solo lo que el modelo usa fila a fila:
+        client_id, sent_at (hora y día) y status ('approved' sin transacción,
+        como _partition_frame). Mismas filas que iter_frames, sin ORDER BY
+        (el orden es el del plan de la base); la respuesta y su demora ya van
+        en fetch_client_aggregates.
+        """
+        with self.engine.connect() as conn:
+            yield from self._send_projection_partitions(conn, chunk_size, sent_from, sent_to, sent_after)
+
+    def fetch_send_projection(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Concatena los bloques de iter_send_projection en un único DataFrame."""
+        return self._concat_projection(self.iter_send_projection(chunk_size, sent_from, sent_to, sent_after))
+
+    def fetch_pushdown(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        sent_after: Optional[datetime] = None,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        (proyección por envío, agregados por cliente) leídos en una misma
+        transacción: los envíos insertados o respondidos entre las dos
+        queries no desalinean filas y agregados
+        (FeatureEngineering.compute_features_from_projection).
+        """
+        with self._snapshot() as conn:
+            aggregates = self._read_client_aggregates(conn, sent_from, sent_to, sent_after)
+            sends = self._concat_projection(
+                self._send_projection_partitions(conn, chunk_size, sent_from, sent_to, sent_after)
             )
-            entidades.append(
-                EnviosCliente(
-                    envio_id=row["transaction_id"],
-                    client_id=row["client_id"],
-                    sent_at=row["sent_at"],
-                    response_at=row["response_at"],
-                    response_class=row["response_class"],
-                    transaction=trans
+        return sends, aggregates
+
+    @staticmethod
+    def _concat_projection(frames: Iterator[pd.DataFrame]) -> pd.DataFrame:
+        frames = list(frames)
+        if not frames:
+            return pd.DataFrame(columns=["client_id", "sent_at", "status"])
+        return pd.concat(frames, ignore_index=True)
+
+
+class PredictionsRepository:
+    """
+    Tabla predicciones (sql/schema.sql) con los resultados del scoring
+    masivo (scripts/score.py). En PostgreSQL cada bloque se escribe con COPY;
+    en otros motores (SQLite en pruebas) con un INSERT por lotes (executemany)
+    dentro de una sola transacción.
+    """
+
+    TABLE = "predicciones"
+    COLUMNS = [
+        "run_id", "model_version", "chunk_id", "envio_id", "transaction_id",
+        "client_id", "probability", "prediction", "scored_at",
+    ]
+    INSERT_BATCH_SIZE = 10_000
+
+    def __init__(self, engine=None):
+        if engine:
+            self.engine = engine
+        else:
+            settings = get_settings()
+            if not settings.DATABASE_URL:
+                raise RuntimeError("DATABASE_URL no configurada")
+            self.engine = create_engine(settings.DATABASE_URL)
+
+    def ensure_table(self) -> None:
+        """Crea la tabla si no existe (misma definición que sql/schema.sql)."""
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    run_id TEXT NOT NULL,
+                    model_version TEXT NOT NULL,
+                    chunk_id INTEGER NOT NULL,
+                    envio_id BIGINT NOT NULL,
+                    transaction_id TEXT,
+                    client_id TEXT NOT NULL,
+                    probability DOUBLE PRECISION NOT NULL,
+                    prediction TEXT NOT NULL,
+                    scored_at TIMESTAMP NOT NULL
+                )
+            """))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_predicciones_run ON {self.TABLE}(run_id, chunk_id)"
+            ))
+
+    def write(self, frame: pd.DataFrame) -> int:
+        """Inserta las filas de frame (columnas COLUMNS) en una transacción."""
+        if frame.empty:
+            return 0
+        frame = frame[self.COLUMNS]
+        if self.engine.dialect.name == "postgresql":
+            self._copy(frame)
+        else:
+            with self.engine.begin() as conn:
+                frame.to_sql(self.TABLE, conn, if_exists="append", index=False, chunksize=self.INSERT_BATCH_SIZE)
+        return len(frame)
+
+    def _copy(self, frame: pd.DataFrame) -> None:
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {self.TABLE} ({', '.join(self.COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
                 )
+            raw.commit()
+        finally:
+            raw.close()
+
+    def delete_from_chunk(self, run_id: str, chunk_id: int) -> int:
+        """Borra las filas de run_id con chunk_id >= chunk_id (bloques sin checkpoint)."""
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                text(f"DELETE FROM {self.TABLE} WHERE run_id = :run_id AND chunk_id >= :chunk_id"),
+                {"run_id": run_id, "chunk_id": chunk_id},
+            )
+            return result.rowcount
+
+    def fetch_run(self, run_id: str) -> pd.DataFrame:
+        with self.engine.connect() as conn:
+            result = conn.execute(
+                text(f"SELECT * FROM {self.TABLE} WHERE run_id = :run_id ORDER BY envio_id"), {"run_id": run_id}
             )
-        return entidades
\ No newline at end of file
+            return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScoringCheckpoint:
+    """
+    Avance de una corrida de scoring masivo.
+
+    Attributes:
+        run_id: Identificador de la corrida (columna run_id de predicciones).
+        model_version: Versión del ModelStore con la que se puntúa.
+        sent_from / sent_to: Rango de sent_at (ISO) de la corrida.
+        next_chunk: Primer bloque todavía no escrito.
+        last_id: Mayor envios_cliente.id ya escrito (la lectura sigue desde ahí).
+        max_id: Mayor envios_cliente.id de la primera pasada: la segunda no lee
+                más allá, así todo envío puntuado está en los agregados.
+        rows_written: Filas escritas en predicciones.
+        completed: La corrida terminó.
+    """
+    run_id: str
+    model_version: str
+    sent_from: Optional[str] = None
+    sent_to: Optional[str] = None
+    next_chunk: int = 0
+    last_id: Optional[int] = None
+    max_id: Optional[int] = None
+    rows_written: int = 0
+    completed: bool = False
+
+
+class ScoringCheckpointStore:
+    """
+    Persiste el checkpoint de cada corrida en disco local: avance en JSON y
+    agregados por cliente (primera pasada) en pickle, con escritura atómica.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None) -> None:
+        project_root = Path(__file__).resolve().parents[2]
+        self.base_dir = Path(base_dir) if base_dir else project_root / "models" / "scoring_checkpoints"
+
+    def _checkpoint_path(self, run_id: str) -> Path:
+        return self.base_dir / f"{run_id}.json"
+
+    def _aggregates_path(self, run_id: str) -> Path:
+        return self.base_dir / f"{run_id}.aggregates.pkl"
+
+    def load(self, run_id: str) -> Optional[ScoringCheckpoint]:
+        path = self._checkpoint_path(run_id)
+        if not path.exists():
+            return None
+        checkpoint = ScoringCheckpoint(**json.loads(path.read_text(encoding="utf-8")))
+        logger.info(f"Checkpoint cargado: run_id={run_id}, next_chunk={checkpoint.next_chunk}")
+        return checkpoint
+
+    def save(self, checkpoint: ScoringCheckpoint) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        path = self._checkpoint_path(checkpoint.run_id)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(asdict(checkpoint)), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load_aggregates(self, run_id: str) -> Optional[pd.DataFrame]:
+        path = self._aggregates_path(run_id)
+        return pd.read_pickle(path) if path.exists() else None
+
+    def save_aggregates(self, run_id: str, aggregates: pd.DataFrame) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        path = self._aggregates_path(run_id)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        aggregates.to_pickle(tmp)
+        os.replace(tmp, path)
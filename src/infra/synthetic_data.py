@@ -0,0 +1,213 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.domain.entities import EnviosCliente, Transaccion
+
+
+class SyntheticDataGenerator:
+    """
+    Generador reproducible de filas de transacciones y envios_cliente con las
+    columnas de sql/schema.sql, para benchmarks y pruebas de carga.
+
+    Todo se genera con operaciones vectorizadas de NumPy (millones de filas en
+    segundos). La proporción de fraude (status alert/declined) es configurable
+    y el comportamiento de respuesta depende de ella: las transacciones
+    fraudulentas se responden menos, más tarde y con más frecuencia de noche,
+    para que el modelo tenga señal que aprender.
+    """
+
+    STATUSES_FRAUD = np.array(["alert", "declined"], dtype=object)
+    CHANNELS_TRX = np.array(["WEB", "APP", "POS"], dtype=object)
+    CHANNELS_MSG = np.array(["whatsapp", "sms", "email"], dtype=object)
+    CARD_TYPES = np.array(["VISA", "MASTERCARD", "AMEX"], dtype=object)
+    CITIES = np.array(["Bogotá", "Medellín", "Cali", "Cartagena", "Barranquilla"], dtype=object)
+    RESPONSES = {
+        "confirm": "Sí, fui yo",
+        "deny": "No reconozco",
+        "other": "No recuerdo",
+    }
+
+    def __init__(
+        self,
+        fraud_ratio: float = 0.1,
+        n_clients: Optional[int] = None,
+        seed: int = 0,
+        start: str = "2025-01-01",
+        days: int = 180,
+    ) -> None:
+        """
+        Args:
+            fraud_ratio (float): Fracción de transacciones con status alert/declined.
+            n_clients (Optional[int]): Clientes distintos; por defecto ~1 cada 20 filas.
+            seed (int): Semilla; la misma semilla produce exactamente las mismas filas.
+            start (str): Fecha inicial de las transacciones.
+            days (int): Días cubiertos a partir de start.
+        """
+        if not 0.0 <= fraud_ratio <= 1.0:
+            raise ValueError("fraud_ratio debe estar entre 0 y 1")
+        self.fraud_ratio = fraud_ratio
+        self.n_clients = n_clients
+        self.seed = seed
+        self.start = np.datetime64(start, "s")
+        self.days = days
+
+    def generate(self, n_rows: int, start_id: int = 1) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Genera n_rows transacciones y un envío por transacción.
+
+        Args:
+            n_rows (int): Cantidad de filas de cada tabla.
+            start_id (int): Primer id / sufijo de transaction_id (para generar por bloques).
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: (transacciones, envios_cliente).
+        """
+        rng = np.random.default_rng([self.seed, start_id])
+        n_clients = self.n_clients or max(1, n_rows // 20)
+        ids = np.arange(start_id, start_id + n_rows, dtype=np.int64)
+        transaction_id = np.char.add("TXN", ids.astype(str)).astype(object)
+        client_id = rng.integers(1, n_clients + 1, n_rows).astype(str).astype(object)
+        is_fraud = rng.random(n_rows) < self.fraud_ratio
+
+        # Hora: los fraudes se concentran de noche
+        day = rng.integers(0, self.days, n_rows)
+        hour = np.where(is_fraud, rng.choice([0, 1, 2, 3, 22, 23, 12], n_rows), rng.integers(7, 22, n_rows))
+        seconds = day * 86400 + hour * 3600 + rng.integers(0, 3600, n_rows)
+        timestamp = self.start + seconds.astype("timedelta64[s]")
+
+        status = np.full(n_rows, "approved", dtype=object)
+        status[is_fraud] = rng.choice(self.STATUSES_FRAUD, int(is_fraud.sum()))
+        amount = np.round(np.where(is_fraud, rng.lognormal(12.5, 0.9, n_rows), rng.lognormal(11.8, 0.6, n_rows)), 2)
+        card_present = ~is_fraud & (rng.random(n_rows) < 0.6)
+        channel = rng.choice(self.CHANNELS_TRX, n_rows)
+
+        transacciones = pd.DataFrame({
+            "id": ids,
+            "client_id": client_id,
+            "transaction_id": transaction_id,
+            "amount": amount,
+            "currency": "COP",
+            "timestamp": timestamp,
+            "status": status,
+            "merchant_id": np.char.add("M", rng.integers(1, 5000, n_rows).astype(str)).astype(object),
+            "channel": channel,
+            "card_present": card_present,
+            "card_type": rng.choice(self.CARD_TYPES, n_rows),
+            "ip_address": self._ip_addresses(rng, n_rows),
+            "city": rng.choice(self.CITIES, n_rows),
+            "metadata": json.dumps({"device": "synthetic"}),
+        })
+
+        # Envío un minuto después; los fraudes se responden menos y más tarde
+        sent_at = timestamp + np.timedelta64(60, "s")
+        delivered_at = sent_at + rng.integers(5, 120, n_rows).astype("timedelta64[s]")
+        responds = rng.random(n_rows) < np.where(is_fraud, 0.2, 0.75)
+        delay = np.where(is_fraud, rng.exponential(600, n_rows), rng.exponential(90, n_rows)).astype(np.int64)
+        response_at = np.where(responds, delivered_at + delay.astype("timedelta64[s]"), np.datetime64("NaT"))
+        response_class = np.where(
+            responds, np.where(is_fraud, "deny", rng.choice(["confirm", "confirm", "other"], n_rows)), "no_answer"
+        ).astype(object)
+        response_text = pd.Series(response_class).map(self.RESPONSES).to_numpy(dtype=object)
+
+        envios = pd.DataFrame({
+            "id": ids,
+            "client_id": client_id,
+            "transaction_id": transaction_id,
+            "message_id": np.char.add("MSG", ids.astype(str)).astype(object),
+            "sent_at": sent_at,
+            "delivered_at": delivered_at,
+            "response_at": response_at,
+            "response_text": response_text,
+            "response_class": response_class,
+            "channel": rng.choice(self.CHANNELS_MSG, n_rows),
+            "attempt": 1,
+            "template_id": "TPL001",
+            "metadata": json.dumps({"lang": "es"}),
+        })
+        return transacciones, envios
+
+    @staticmethod
+    def _ip_addresses(rng: np.random.Generator, n_rows: int) -> np.ndarray:
+        octets = rng.integers(0, 256, (n_rows, 2)).astype(str)
+        return np.char.add(np.char.add("10.0.", octets[:, 0]), np.char.add(".", octets[:, 1])).astype(object)
+
+    def envios_frame(self, n_rows: int) -> pd.DataFrame:
+        """
+        Filas con el mismo formato que EnviosRepository.fetch_frame (envíos
+        unidos a su transacción), listas para compute_features_from_frame o
+        TrainModelUseCase.execute.
+        """
+        transacciones, envios = self.generate(n_rows)
+        return pd.DataFrame({
+            "client_id": envios["client_id"],
+            "transaction_id": envios["transaction_id"],
+            "sent_at": envios["sent_at"],
+            "response_at": envios["response_at"],
+            "response_class": envios["response_class"],
+            "amount": transacciones["amount"],
+            "status": transacciones["status"],
+            "trx_timestamp": transacciones["timestamp"],
+        })
+
+    @staticmethod
+    def to_entities(frame: pd.DataFrame) -> List[EnviosCliente]:
+        """Convierte un envios_frame en entidades de dominio (camino fila a fila)."""
+        envios = []
+        for row in frame.itertuples(index=False):
+            response_at = None if pd.isna(row.response_at) else row.response_at.to_pydatetime()
+            envios.append(EnviosCliente(
+                envio_id=row.transaction_id,
+                client_id=row.client_id,
+                sent_at=row.sent_at.to_pydatetime(),
+                response_at=response_at,
+                response_class=row.response_class,
+                transaction=Transaccion(
+                    row.transaction_id, row.client_id, float(row.amount), row.status,
+                    row.trx_timestamp.to_pydatetime(),
+                ),
+            ))
+        return envios
+
+    def payloads(self, n: int) -> List[Dict[str, Any]]:
+        """Payloads con la forma de PredictRequestDTO, derivados de filas sintéticas."""
+        frame = self.envios_frame(n)
+        rng = np.random.default_rng([self.seed, n])
+        return [
+            {
+                "client_id": row.client_id,
+                "amount": float(row.amount),
+                "tipo_transaccion": "compra",
+                "channel_code": "WEB",
+                "motor_monitoreo_map": "normal",
+                "alert_type": "compra_estandar",
+                "dia_semana": int(row.trx_timestamp.weekday()),
+                "client_mobilePhone": "3200000000",
+                "response_text": "Sí" if row.response_class == "confirm" else "",
+                "timestamp": row.trx_timestamp.isoformat(),
+                "total_sent": int(rng.integers(1, 30)),
+                "response_rate": round(float(rng.random()), 2),
+                "mean_delay": round(float(rng.exponential(90)), 1),
+            }
+            for row in frame.itertuples(index=False)
+        ]
+
+    def load_into(self, engine: Any, n_rows: int, chunk_size: int = 100_000, start_id: int = 1) -> int:
+        """
+        Inserta n_rows en las tablas transacciones y envios_cliente existentes
+        (creadas con sql/schema.sql), por bloques de chunk_size.
+
+        Returns:
+            int: Filas insertadas en cada tabla.
+        """
+        inserted = 0
+        while inserted < n_rows:
+            size = min(chunk_size, n_rows - inserted)
+            transacciones, envios = self.generate(size, start_id=start_id + inserted)
+            with engine.begin() as conn:
+                transacciones.to_sql("transacciones", conn, if_exists="append", index=False)
+                envios.to_sql("envios_cliente", conn, if_exists="append", index=False)
+            inserted += size
+        return inserted
@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _empty_aggregates() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"total_sent": pd.Series(dtype="int64"), "responded": pd.Series(dtype="int64"),
+         "delay_sum": pd.Series(dtype=float)},
+        index=pd.Index([], name="client_id"),
+    )
+
+
+def _empty_rows() -> pd.DataFrame:
+    return pd.DataFrame(columns=["client_id", "hour", "weekday", "responded", "delay", "status"])
+
+
+@dataclass
+class TrainingState:
+    """
+    Estado del entrenamiento incremental. Solo guarda envíos consolidados:
+    los más recientes que lookback (ver TrainModelUseCase.execute_incremental)
+    todavía pueden recibir respuesta y se releen en la corrida siguiente.
+
+    Attributes:
+        watermark: Mayor sent_at consolidado (None = nada leído).
+        aggregates: Sumas por cliente de todo lo consolidado (ver FeatureEngineering.aggregate_clients).
+        rows: Proyección compacta por envío (ver FeatureEngineering.project_rows),
+              acotada a los más recientes si se usa max_rows.
+    """
+    watermark: Optional[pd.Timestamp] = None
+    aggregates: pd.DataFrame = field(default_factory=_empty_aggregates)
+    rows: pd.DataFrame = field(default_factory=_empty_rows)
+
+
+class TrainingStateStore:
+    """
+    Persiste el TrainingState en disco local, en un solo pickle (watermark,
+    agregados y proyección por envío) escrito de forma atómica: un corte a
+    mitad de camino deja el estado anterior completo, nunca agregados nuevos
+    con filas o watermark viejos.
+    """
+
+    STATE_FILE = "state.pkl"
+
+    def __init__(self, base_dir: Optional[str] = None) -> None:
+        project_root = Path(__file__).resolve().parents[2]
+        self.base_dir = Path(base_dir) if base_dir else project_root / "models" / "training_state"
+        self.state_path = self.base_dir / self.STATE_FILE
+        # Formato anterior (tres archivos): solo lectura
+        self.watermark_path = self.base_dir / "watermark.json"
+        self.aggregates_path = self.base_dir / "aggregates.pkl"
+        self.rows_path = self.base_dir / "rows.pkl"
+
+    def exists(self) -> bool:
+        return self.state_path.exists() or self.watermark_path.exists()
+
+    def load(self) -> TrainingState:
+        """Carga el estado guardado, o un estado vacío si no existe."""
+        if self.state_path.exists():
+            data = pd.read_pickle(self.state_path)
+            state = TrainingState(watermark=data["watermark"], aggregates=data["aggregates"], rows=data["rows"])
+        elif self.watermark_path.exists():
+            meta = json.loads(self.watermark_path.read_text(encoding="utf-8"))
+            state = TrainingState(
+                watermark=pd.Timestamp(meta["watermark"]) if meta.get("watermark") else None,
+                aggregates=pd.read_pickle(self.aggregates_path),
+                rows=pd.read_pickle(self.rows_path),
+            )
+        else:
+            return TrainingState()
+        logger.info(f"Estado incremental cargado: watermark={state.watermark}, filas={len(state.rows)}")
+        return state
+
+    def save(self, state: TrainingState) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        rows = state.rows.copy()
+        # Columnas repetitivas como categóricas para reducir el tamaño en disco
+        for col in ("client_id", "status"):
+            rows[col] = rows[col].astype("category")
+        for col in ("hour", "weekday", "responded"):
+            rows[col] = rows[col].astype("int8")
+
+        tmp = self.state_path.with_suffix(".pkl.tmp")
+        pd.to_pickle({"watermark": state.watermark, "aggregates": state.aggregates, "rows": rows}, tmp)
+        os.replace(tmp, self.state_path)
+        for legacy in (self.watermark_path, self.aggregates_path, self.rows_path):
+            legacy.unlink(missing_ok=True)
+        logger.info(f"Estado incremental guardado en {self.state_path} (watermark={state.watermark})")
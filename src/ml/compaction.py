@@ -0,0 +1,197 @@
+import pickle
+import time
+import warnings
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import roc_auc_score
+
+from src.ml.flat_forest import FlatForest
+
+
+@dataclass
+class CompactionConfig:
+    """
+    Parámetros de la compactación del bosque.
+
+    Attributes:
+        n_trees: Árboles del modelo compacto (None = todos; con "distill", tamaño del alumno).
+        selection: "contribution" (selección greedy de los árboles que mejor reproducen
+            el ensamble completo), "importance" (árboles ordenados por su cercanía individual
+            al ensamble) o "distill" (bosque chico entrenado con las probabilidades del grande).
+        max_depth: Profundidad máxima de los árboles (None = sin límite).
+        float32: Guardar umbrales y probabilidades en float32.
+        reference_rows: Filas de entrenamiento usadas para elegir árboles o destilar.
+    """
+    n_trees: Optional[int] = 50
+    selection: str = "contribution"
+    max_depth: Optional[int] = None
+    float32: bool = True
+    reference_rows: int = 20_000
+
+    SELECTIONS = ("contribution", "importance", "distill")
+
+
+class ForestCompactor:
+    """
+    Compacta un RandomForestClassifier entrenado en un FlatForest más chico y
+    rápido de recorrer, y mide cuánto se aparta del modelo original.
+    """
+
+    def __init__(self, config: CompactionConfig, threshold: float = 0.7, random_state: int = 42) -> None:
+        """
+        Args:
+            config (CompactionConfig): Qué técnicas aplicar.
+            threshold (float): Umbral de decisión para medir la concordancia.
+            random_state (int): Semilla del muestreo y de la destilación.
+        """
+        if config.selection not in CompactionConfig.SELECTIONS:
+            raise ValueError(f"Selección desconocida: {config.selection}. Opciones: {CompactionConfig.SELECTIONS}")
+        if config.n_trees is not None and config.n_trees < 1:
+            raise ValueError("n_trees debe ser positivo")
+        self.config = config
+        self.threshold = threshold
+        self.random_state = random_state
+
+    def compact(
+        self, model: Any, X_train: np.ndarray, X_eval: np.ndarray, y_eval: Optional[np.ndarray] = None
+    ) -> Tuple[FlatForest, Dict[str, Any]]:
+        """
+        Aplica la compactación y arma el reporte de fidelidad, tamaño y latencia.
+
+        Args:
+            model (Any): RandomForestClassifier entrenado (modelo original).
+            X_train (np.ndarray): Features de entrenamiento (referencia para elegir árboles o destilar).
+            X_eval (np.ndarray): Features del holdout donde se compara contra el original.
+            y_eval (Optional[np.ndarray]): Etiquetas del holdout, para reportar el ROC AUC de ambos.
+
+        Returns:
+            Tuple[FlatForest, Dict[str, Any]]: Modelo compacto y reporte.
+
+        Raises:
+            ValueError: Si el modelo no es un bosque de árboles compatible.
+        """
+        X_train = np.asarray(X_train, dtype=np.float64)
+        X_eval = np.asarray(X_eval, dtype=np.float64)
+        full = FlatForest.from_sklearn(model)
+        reference = self._reference_rows(X_train)
+
+        if self.config.selection == "distill":
+            compact = self._distill(full, reference)
+        else:
+            compact = full
+            if self.config.n_trees is not None and self.config.n_trees < full.n_estimators:
+                compact = compact.select_trees(self._rank_trees(full, reference))
+            if self.config.max_depth is not None and self.config.max_depth < compact.max_depth:
+                compact = compact.limit_depth(self.config.max_depth)
+        if self.config.float32:
+            compact = compact.astype_float32()
+
+        with warnings.catch_warnings():
+            # El modelo se entrenó con un DataFrame; acá se le pasan arrays
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            report = self._report(model, full, compact, X_eval, y_eval)
+        return compact, report
+
+    def _report(
+        self, model: Any, full: FlatForest, compact: FlatForest, X_eval: np.ndarray, y_eval: Optional[np.ndarray]
+    ) -> Dict[str, Any]:
+        report = {
+            "config": {k: getattr(self.config, k) for k in ("n_trees", "selection", "max_depth", "float32")},
+            "fidelity": self.fidelity(model.predict_proba(X_eval)[:, 1], compact.predict_proba(X_eval)[:, 1], y_eval),
+            "size": {
+                "original_trees": full.n_estimators,
+                "compact_trees": compact.n_estimators,
+                "original_nodes": full.node_count,
+                "compact_nodes": compact.node_count,
+                "original_max_depth": full.max_depth,
+                "compact_max_depth": compact.max_depth,
+                "original_pickle_mb": len(pickle.dumps(model, protocol=5)) / 2**20,
+                "original_flat_mb": full.nbytes / 2**20,
+                "compact_mb": compact.nbytes / 2**20,
+            },
+            "latency": {
+                "original": self._latency(model.predict_proba, X_eval),
+                "original_flat": self._latency(full.predict_proba, X_eval),
+                "compact": self._latency(compact.predict_proba, X_eval),
+            },
+        }
+        report["size"]["reduction"] = report["size"]["original_pickle_mb"] / max(report["size"]["compact_mb"], 1e-9)
+        return report
+
+    def fidelity(
+        self, original: np.ndarray, compact: np.ndarray, y_true: Optional[np.ndarray] = None
+    ) -> Dict[str, float]:
+        """Diferencia de probabilidades y concordancia de decisiones con el umbral configurado."""
+        diff = np.abs(np.asarray(original, dtype=np.float64) - np.asarray(compact, dtype=np.float64))
+        report = {
+            "threshold": self.threshold,
+            "max_abs_diff": float(diff.max()) if diff.size else 0.0,
+            "mean_abs_diff": float(diff.mean()) if diff.size else 0.0,
+            "p99_abs_diff": float(np.percentile(diff, 99)) if diff.size else 0.0,
+            "decision_agreement": float(np.mean((original >= self.threshold) == (compact >= self.threshold))),
+        }
+        if y_true is not None and len(np.unique(y_true)) > 1:
+            report["original_roc_auc"] = float(roc_auc_score(y_true, original))
+            report["compact_roc_auc"] = float(roc_auc_score(y_true, compact))
+        return report
+
+    def _reference_rows(self, X: np.ndarray) -> np.ndarray:
+        if len(X) <= self.config.reference_rows:
+            return X
+        rng = np.random.default_rng(self.random_state)
+        return X[rng.choice(len(X), self.config.reference_rows, replace=False)]
+
+    def _rank_trees(self, forest: FlatForest, X: np.ndarray) -> np.ndarray:
+        """Índices de los n_trees árboles elegidos según config.selection."""
+        per_tree = forest.tree_proba(X)  # (filas, árboles)
+        target = per_tree.mean(axis=1)
+        n_trees = self.config.n_trees
+
+        if self.config.selection == "importance":
+            errors = ((per_tree - target[:, None]) ** 2).mean(axis=0)
+            return np.argsort(errors, kind="stable")[:n_trees]
+
+        # Selección greedy hacia adelante: en cada paso se agrega el árbol que
+        # más acerca el promedio del subconjunto al del ensamble completo
+        chosen = []
+        running = np.zeros(len(X))
+        available = np.ones(per_tree.shape[1], dtype=bool)
+        for k in range(1, n_trees + 1):
+            errors = (((running[:, None] + per_tree) / k - target[:, None]) ** 2).mean(axis=0)
+            errors[~available] = np.inf
+            best = int(np.argmin(errors))
+            chosen.append(best)
+            available[best] = False
+            running += per_tree[:, best]
+        return np.asarray(chosen)
+
+    def _distill(self, teacher: FlatForest, X: np.ndarray) -> FlatForest:
+        """Bosque de regresión chico que aprende la probabilidad de fraude del modelo original."""
+        student = RandomForestRegressor(
+            n_estimators=self.config.n_trees or 30,
+            max_depth=self.config.max_depth,
+            min_samples_leaf=2,
+            random_state=self.random_state,
+            n_jobs=-1,
+        )
+        student.fit(X, teacher.predict_proba(X)[:, 1])
+        return FlatForest.from_sklearn(student)
+
+    @staticmethod
+    def _latency(predict_proba: Any, X: np.ndarray, samples: int = 200) -> Dict[str, float]:
+        """p50 de una fila (ms) y tiempo de todo X (ms)."""
+        rows = [X[i:i + 1] for i in range(min(samples, len(X)))]
+        for row in rows[:10]:
+            predict_proba(row)
+        single = []
+        for row in rows:
+            started = time.perf_counter()
+            predict_proba(row)
+            single.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        predict_proba(X)
+        batch = time.perf_counter() - started
+        return {"single_p50_ms": float(np.median(single) * 1000) if single else 0.0, "batch_ms": batch * 1000}
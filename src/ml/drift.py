@@ -0,0 +1,229 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.domain.services import DriftMonitor
+from src.infra.metrics import DRIFT_KS, DRIFT_PSI
+
+PROBABILITY = "probability"
+
+# Bordes de la probabilidad en los puntos medios de la grilla de 0.01: la
+# probabilidad servida está redondeada a 2 decimales y el redondeo nunca
+# cambia el bin de un valor.
+PROBABILITY_EDGES = np.round(np.arange(0.025, 1.0, 0.05), 3)
+
+# Proporción mínima por bin en PSI (evita log(0) con bins vacíos)
+_EPSILON = 1e-4
+
+
+@dataclass
+class HistogramSketch:
+    """
+    Histograma de bins fijos de varias variables a la vez: edges[j] son los
+    bordes interiores de la variable j (rellenos con +inf hasta el máximo de
+    bordes) y counts[j, k] los valores en el bin k. Un valor igual a un
+    borde cae en el bin de la derecha. La memoria es fija: no depende de
+    cuántos valores se registran.
+    """
+
+    names: List[str]
+    edges: np.ndarray   # (n_variables, max_edges) float64, +inf de relleno
+    counts: np.ndarray  # (n_variables, max_edges + 1) int64
+
+    @classmethod
+    def empty(cls, names: Sequence[str], edges: Sequence[Sequence[float]]) -> "HistogramSketch":
+        width = max((len(e) for e in edges), default=0)
+        padded = np.full((len(names), width), np.inf)
+        for j, values in enumerate(edges):
+            padded[j, :len(values)] = values
+        return cls(list(names), padded, np.zeros((len(names), width + 1), dtype=np.int64))
+
+    @classmethod
+    def from_values(cls, names: Sequence[str], X: np.ndarray, n_bins: int = 10) -> "HistogramSketch":
+        """
+        Sketch de referencia: bordes en los cuantiles de cada columna de X
+        (las variables discretas quedan con menos bins) y sus conteos.
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(len(X), len(names))
+        quantiles = np.linspace(0.0, 1.0, n_bins + 1)[1:-1]
+        edges = [np.unique(np.quantile(X[:, j], quantiles)) if len(X) else [] for j in range(len(names))]
+        sketch = cls.empty(names, edges)
+        sketch.update(X)
+        return sketch
+
+    @property
+    def total(self) -> int:
+        return int(self.counts[0].sum()) if len(self.counts) else 0
+
+    def update(self, X: np.ndarray) -> None:
+        """Suma las filas de X (n, n_variables): tres operaciones de NumPy sin importar cuántas variables haya."""
+        X = np.nan_to_num(np.asarray(X, dtype=np.float64), nan=0.0)
+        if X.ndim == 1:
+            X = X.reshape(-1, len(self.names))
+        if not len(X):
+            return
+        bins = (X[:, :, None] >= self.edges[None, :, :]).sum(axis=2)
+        flat = bins + np.arange(len(self.names)) * self.counts.shape[1]
+        self.counts += np.bincount(flat.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+    def reset(self) -> None:
+        self.counts[:] = 0
+
+    def compare(self, reference: "HistogramSketch") -> Dict[str, Dict[str, float]]:
+        """
+        PSI y KS de cada variable contra la referencia (mismos bordes). El KS
+        se calcula sobre las distribuciones acumuladas por bin, así que es
+        una cota inferior del KS exacto.
+        """
+        out = {}
+        for j, name in enumerate(self.names):
+            live, ref = self.counts[j].astype(np.float64), reference.counts[j].astype(np.float64)
+            if live.sum() == 0 or ref.sum() == 0:
+                out[name] = {"psi": 0.0, "ks": 0.0}
+                continue
+            p, q = live / live.sum(), ref / ref.sum()
+            p_s, q_s = np.maximum(p, _EPSILON), np.maximum(q, _EPSILON)
+            out[name] = {
+                "psi": float(np.sum((p_s - q_s) * np.log(p_s / q_s))),
+                "ks": float(np.max(np.abs(np.cumsum(p) - np.cumsum(q)))),
+            }
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "names": self.names,
+            "edges": [row[np.isfinite(row)].tolist() for row in self.edges],
+            "counts": self.counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HistogramSketch":
+        sketch = cls.empty(data["names"], data["edges"])
+        sketch.counts[:] = np.asarray(data["counts"], dtype=np.int64)
+        return sketch
+
+
+@dataclass
+class DriftReference:
+    """
+    Distribución de entrenamiento de una versión del modelo: features de
+    entrenamiento (bordes por cuantiles) y probabilidad de fraude sobre el
+    holdout (en entrenamiento los bosques dan probabilidades sobreajustadas).
+    Se guarda junto al modelo (ModelStore.save_model, drift_reference=).
+    """
+
+    features: HistogramSketch
+    probability: HistogramSketch
+
+    @classmethod
+    def build(
+        cls, feature_columns: Sequence[str], X_train: np.ndarray, probabilities: np.ndarray, n_bins: int = 10
+    ) -> "DriftReference":
+        # Mismo redondeo que la probabilidad servida por FraudPredictor
+        rounded = np.array([round(p, 2) for p in np.asarray(probabilities, dtype=float).tolist()])
+        probability = HistogramSketch.empty([PROBABILITY], [PROBABILITY_EDGES])
+        probability.update(rounded.reshape(-1, 1))
+        return cls(HistogramSketch.from_values(feature_columns, X_train, n_bins), probability)
+
+    def live_sketches(self) -> "DriftReference":
+        """Sketches vacíos con los mismos bordes, para acumular el tráfico en línea."""
+        return DriftReference(
+            HistogramSketch(self.features.names, self.features.edges, np.zeros_like(self.features.counts)),
+            HistogramSketch(self.probability.names, self.probability.edges, np.zeros_like(self.probability.counts)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"features": self.features.to_dict(), "probability": self.probability.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DriftReference":
+        return cls(HistogramSketch.from_dict(data["features"]), HistogramSketch.from_dict(data["probability"]))
+
+
+class StreamingDriftMonitor(DriftMonitor):
+    """
+    Monitor de drift en línea: acumula en sketches de bins fijos (los de la
+    referencia de la versión activa) la matriz de entrada del modelo y la
+    probabilidad de cada predicción, y reporta PSI/KS contra la referencia.
+    Memoria constante; cada registro son unas pocas operaciones de NumPy
+    bajo un lock.
+
+    Al cambiar de versión (use_version) se carga su referencia y se
+    reinician los conteos. Sin referencia (modelos anteriores a este
+    monitor) no se registra nada.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Optional[str]], Optional[Dict[str, Any]]],
+        psi_threshold: float = 0.2,
+        min_samples: int = 100,
+    ) -> None:
+        """
+        Args:
+            loader: Versión -> referencia serializada (ModelStore.load_drift_reference).
+            psi_threshold (float): PSI desde el que una variable se marca con drift.
+            min_samples (int): Predicciones mínimas antes de marcar drift.
+        """
+        self.loader = loader
+        self.psi_threshold = psi_threshold
+        self.min_samples = min_samples
+        self.version: Optional[str] = None
+        self.reference: Optional[DriftReference] = None
+        self._live: Optional[DriftReference] = None
+        self._lock = threading.Lock()
+
+    def use_version(self, version: Optional[str]) -> None:
+        data = self.loader(version)
+        reference = DriftReference.from_dict(data) if data is not None else None
+        with self._lock:
+            self.version = version
+            self.reference = reference
+            self._live = reference.live_sketches() if reference is not None else None
+
+    def reset(self) -> None:
+        with self._lock:
+            if self._live is not None:
+                self._live.features.reset()
+                self._live.probability.reset()
+
+    def record(self, inputs: Optional[Any], probabilities: Sequence[float], version: Optional[str] = None) -> None:
+        live = self._live
+        if live is None:
+            return
+        probabilities = np.asarray(probabilities, dtype=np.float64).reshape(-1, 1)
+        with self._lock:
+            if live is not self._live or (version is not None and version != self.version):
+                return  # predicción de otra versión (hot swap en el medio)
+            live.probability.update(probabilities)
+            if inputs is not None and np.shape(inputs)[-1] == len(live.features.names):
+                live.features.update(inputs)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._live is None:
+                return {"enabled": True, "model_version": self.version, "reference": False}
+            # Conteos, referencia y versión de un mismo momento (use_version cambia los tres)
+            live = DriftReference.from_dict(self._live.to_dict())
+            reference, version = self.reference, self.version
+        features = live.features.compare(reference.features)
+        probability = live.probability.compare(reference.probability)[PROBABILITY]
+        samples = live.probability.total
+        enough = samples >= self.min_samples
+        for name, distances in (*features.items(), (PROBABILITY, probability)):
+            distances["drift"] = enough and distances["psi"] >= self.psi_threshold
+            DRIFT_PSI.set(distances["psi"], variable=name)
+            DRIFT_KS.set(distances["ks"], variable=name)
+        return {
+            "enabled": True,
+            "model_version": version,
+            "reference": True,
+            "samples": samples,
+            "reference_samples": reference.probability.total,
+            "psi_threshold": self.psi_threshold,
+            "drift": any(d["drift"] for d in (*features.values(), probability)),
+            "probability": probability,
+            "features": features,
+        }
@@ -0,0 +1,212 @@
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+
+class FlatForest:
+    """
+    Ensamble de árboles aplanado en arrays contiguos de NumPy.
+
+    Todos los árboles de un RandomForestClassifier entrenado se concatenan en
+    un único conjunto de arrays (feature, threshold, hijos, probabilidades de
+    hoja) y se recorren en paralelo para una o muchas filas, sin el despacho
+    genérico de sklearn. Las hojas apuntan a sí mismas, así que basta con
+    iterar max_depth veces.
+    """
+
+    # Arrays que definen el ensamble (ver to_arrays / from_arrays)
+    ARRAY_FIELDS = ("feature", "threshold", "children_left", "children_right", "leaf_proba", "roots", "classes_")
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children_left: np.ndarray,
+        children_right: np.ndarray,
+        leaf_proba: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        classes: np.ndarray,
+    ) -> None:
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_estimators = len(roots)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays que definen el ensamble, listos para guardarse como .npy."""
+        return {name: np.ascontiguousarray(getattr(self, name)) for name in self.ARRAY_FIELDS}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], max_depth: int) -> "FlatForest":
+        """
+        Reconstruye el ensamble sin copiar los arrays: acepta memmaps de solo
+        lectura (np.load(..., mmap_mode="r")).
+        """
+        return cls(
+            arrays["feature"], arrays["threshold"], arrays["children_left"], arrays["children_right"],
+            arrays["leaf_proba"], arrays["roots"], max_depth, arrays["classes_"],
+        )
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "FlatForest":
+        """
+        Construye el ensamble a partir de un RandomForestClassifier (o cualquier
+        ensamble sklearn de DecisionTreeClassifier con una sola salida). También
+        acepta un ensamble de regresores con salida en [0, 1] (modelo destilado,
+        ver src/ml/compaction.py): el valor de la hoja es la probabilidad de la
+        clase 1. Si el modelo ya es un FlatForest se devuelve tal cual.
+
+        Raises:
+            ValueError: Si el modelo no es un ensamble de árboles compatible.
+        """
+        if isinstance(model, cls):
+            return model
+        estimators = getattr(model, "estimators_", None)
+        if not estimators or not all(hasattr(e, "tree_") for e in estimators):
+            raise ValueError(f"{type(model).__name__} no es un ensamble de árboles soportado")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Solo se soportan modelos con una única salida")
+
+        regression = not hasattr(model, "classes_")
+        classes = np.array([0, 1]) if regression else np.asarray(model.classes_)
+        n_classes = len(classes)
+        sizes = [e.tree_.node_count for e in estimators]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+        total = int(sum(sizes))
+
+        feature = np.zeros(total, dtype=np.int32)
+        threshold = np.zeros(total, dtype=np.float64)
+        left = np.empty(total, dtype=np.int32)
+        right = np.empty(total, dtype=np.int32)
+        leaf_proba = np.zeros((total, n_classes), dtype=np.float64)
+
+        for offset, est in zip(offsets, estimators):
+            tree = est.tree_
+            n = tree.node_count
+            sl = slice(offset, offset + n)
+            idx = np.arange(offset, offset + n, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            feature[sl] = np.where(is_leaf, 0, tree.feature)
+            threshold[sl] = tree.threshold
+            left[sl] = np.where(is_leaf, idx, tree.children_left + offset)
+            right[sl] = np.where(is_leaf, idx, tree.children_right + offset)
+
+            if regression:
+                positive = np.clip(tree.value[:, 0, 0], 0.0, 1.0)
+                leaf_proba[sl] = np.column_stack([1.0 - positive, positive])
+                continue
+            # Misma normalización que DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            leaf_proba[sl] = value / normalizer
+
+        max_depth = max(e.tree_.max_depth for e in estimators)
+        return cls(feature, threshold, left, right, leaf_proba, offsets, max_depth, classes)
+
+    # --- Compactación (ver src/ml/compaction.py) ---
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arrays del ensamble."""
+        return sum(array.nbytes for array in self.to_arrays().values())
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    def node_depths(self) -> np.ndarray:
+        """Profundidad de cada nodo; -1 si no es alcanzable desde ninguna raíz."""
+        depth = np.full(self.node_count, -1, dtype=np.int32)
+        frontier = np.asarray(self.roots)
+        level = 0
+        while frontier.size:
+            depth[frontier] = level
+            children = np.concatenate([self.children_left[frontier], self.children_right[frontier]])
+            parents = np.concatenate([frontier, frontier])
+            frontier = np.unique(children[children != parents])
+            level += 1
+        return depth
+
+    def _rebuild(
+        self, keep: np.ndarray, roots: np.ndarray, left: np.ndarray, right: np.ndarray
+    ) -> "FlatForest":
+        """Nuevo ensamble con los nodos de keep, reindexando hijos y raíces."""
+        new_index = (np.cumsum(keep) - 1).astype(np.int32)
+        forest = FlatForest(
+            np.ascontiguousarray(self.feature[keep]),
+            np.ascontiguousarray(self.threshold[keep]),
+            new_index[left[keep]],
+            new_index[right[keep]],
+            np.ascontiguousarray(self.leaf_proba[keep]),
+            new_index[roots],
+            self.max_depth,
+            np.array(self.classes_),
+        )
+        forest.max_depth = int(forest.node_depths().max())
+        return forest
+
+    def select_trees(self, indices: Sequence[int]) -> "FlatForest":
+        """Subconjunto de árboles (índices dentro de roots)."""
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        if indices.size == 0:
+            raise ValueError("Hay que conservar al menos un árbol")
+        tree_of_node = np.searchsorted(self.roots, np.arange(self.node_count), side="right") - 1
+        keep = np.isin(tree_of_node, indices)
+        return self._rebuild(keep, np.asarray(self.roots)[indices], self.children_left, self.children_right)
+
+    def limit_depth(self, max_depth: int) -> "FlatForest":
+        """
+        Poda todos los árboles a max_depth: los nodos de esa profundidad pasan
+        a ser hojas con la distribución de clases del nodo (leaf_proba se
+        calcula para todos los nodos, no solo para las hojas).
+        """
+        if max_depth < 1:
+            raise ValueError("max_depth debe ser al menos 1")
+        depth = self.node_depths()
+        idx = np.arange(self.node_count, dtype=np.int32)
+        cut = depth == max_depth
+        left = np.where(cut, idx, self.children_left)
+        right = np.where(cut, idx, self.children_right)
+        keep = (depth >= 0) & (depth <= max_depth)
+        return self._rebuild(keep, self.roots, left, right)
+
+    def astype_float32(self) -> "FlatForest":
+        """
+        Umbrales y probabilidades en float32. Como apply() compara valores
+        float32, cada umbral se redondea hacia abajo al float32 más cercano y
+        las decisiones de split no cambian; solo las probabilidades pierden
+        precisión (~1e-7).
+        """
+        threshold = np.asarray(self.threshold, dtype=np.float64)
+        threshold32 = threshold.astype(np.float32)
+        above = threshold32.astype(np.float64) > threshold
+        threshold32[above] = np.nextafter(threshold32[above], np.float32(-np.inf))
+        return FlatForest(
+            np.array(self.feature), threshold32, np.array(self.children_left), np.array(self.children_right),
+            np.asarray(self.leaf_proba, dtype=np.float32), np.array(self.roots), self.max_depth, np.array(self.classes_),
+        )
+
+    def tree_proba(self, X: np.ndarray, column: int = -1) -> np.ndarray:
+        """Probabilidad de la clase `column` según cada árbol: (n_filas, n_árboles)."""
+        return self.leaf_proba[self.apply(X), column]
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Devuelve el índice de hoja (global) de cada fila en cada árbol: (n_filas, n_árboles)."""
+        # sklearn evalúa los árboles sobre float32
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        nodes = np.broadcast_to(self.roots, (X32.shape[0], self.n_estimators)).copy()
+        for _ in range(self.max_depth):
+            values = np.take_along_axis(X32, self.feature[nodes], axis=1)
+            nodes = np.where(values <= self.threshold[nodes], self.children_left[nodes], self.children_right[nodes])
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        return self.leaf_proba[leaves].sum(axis=1, dtype=np.float64) / self.n_estimators
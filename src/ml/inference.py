@@ -1,42 +1,268 @@
 import os
+import logging
+import time
 import joblib
+import numpy as np
 import pandas as pd
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
-from typing import Dict, Any
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from src.domain.services import PredictorService
 from src.features.feature_engineering import FeatureEngineering
+from src.features.feature_encoder import FeatureEncoder
+from src.features.online_store import ClientFeatureStore
+from src.features.rolling import RollingFeatureStore
+from src.infra.metrics import PREDICT_STAGE_SECONDS
+from src.infra.models_store import ModelStore
+from src.ml.flat_forest import FlatForest
+from src.ml.prediction_cache import PredictionCache
 
+logger = logging.getLogger(__name__)
 
 class FraudPredictor(PredictorService):
-    def __init__(self, model_dir: str = None):
+    LABEL_MAP = {0: "no_fraude", 1: "fraude"}
+
+    ENGINES = ("sklearn", "flat")
+
+    def __init__(
+        self,
+        model_dir: str = None,
+        fast_features: bool = True,
+        engine: str = "sklearn",
+        feature_store: Optional[ClientFeatureStore] = None,
+        version: Optional[str] = None,
+        mmap: bool = True,
+        cache: Optional[PredictionCache] = None,
+        rolling_store: Optional[RollingFeatureStore] = None,
+    ):
         base_dir = model_dir or os.path.abspath(os.path.join(os.path.dirname(__file__), "../../models"))
-        self.model_path = os.path.join(base_dir, "model.pkl")
-        self.features_path = os.path.join(base_dir, "features.pkl")
+        # Versión a cargar: la indicada o la activa del registro (ModelStore)
+        store = ModelStore(str(base_dir))
+        self.version = version or store.current_version()
+        self.model_path = os.fspath(store.version_dir(self.version) / "model.pkl")
+        self.features_path = os.fspath(store.version_dir(self.version) / "features.pkl")
+        self.loaded_at = time.time()
 
-        self.model = joblib.load(self.model_path)
+        # El modelo sklearn se carga de forma perezosa: con el motor "flat" y
+        # los arrays en formato .npy no hace falta deserializar el pickle.
+        self._model = None
         if os.path.exists(self.features_path):
             self.feature_columns = joblib.load(self.features_path)
         else:
             self.feature_columns = FeatureEngineering.COLUMNS
 
-    def predict(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        df = FeatureEngineering.compute_features_from_payload(features)
+        # Camino rápido sin pandas; fast_features=False conserva el camino DataFrame original
+        self.fast_features = fast_features
+        self.encoder = FeatureEncoder(self.feature_columns)
+
+        # Motor de inferencia: "flat" recorre el bosque aplanado; si el modelo
+        # no es compatible se usa el predict_proba de sklearn.
+        if engine not in self.ENGINES:
+            raise ValueError(f"Motor de inferencia desconocido: {engine}. Opciones: {self.ENGINES}")
+        self.flat_model = None
+        if engine == "flat" and mmap:
+            # Memmap de solo lectura: los workers comparten las páginas del page cache
+            self.flat_model = store.load_flat_model(self.version, mmap=True)
+        if engine == "flat" and self.flat_model is None:
+            try:
+                self.flat_model = FlatForest.from_sklearn(self.model)
+            except ValueError as exc:
+                logger.warning(f"Motor 'flat' no disponible, se usa sklearn: {exc}")
+        self.engine = "flat" if self.flat_model is not None else "sklearn"
+        self.mmap = isinstance(getattr(self.flat_model, "threshold", None), np.memmap)
+        if self.flat_model is None:
+            self._model = joblib.load(self.model_path)
+
+        # Backend que produjo el artefacto (meta.json; en versiones antiguas se infiere).
+        # Con LightGBM se llama directo al Booster: el wrapper de sklearn valida
+        # la entrada en cada llamada y cuesta ~20x más por fila.
+        self.backend = store.load_backend(self.version)
+        if self.backend is None:
+            # Solo los bosques de sklearn tienen formato plano: no hace falta cargar el pickle
+            self.backend = "random_forest" if self.flat_model is not None else ModelStore.infer_backend(self.model)
+        self._booster = getattr(self.model, "booster_", None) if self.backend == "lightgbm" else None
+
+        # Agregados por cliente en línea: si el cliente es conocido, reemplazan
+        # total_sent / response_rate / mean_delay enviados en el payload
+        self.feature_store = feature_store
+
+        # Features por ventana a la fecha del payload (sent_1h, ...): solo si el
+        # modelo se entrenó con ellas (TrainModelUseCase(point_in_time=True))
+        self.rolling_store = None
+        if rolling_store is not None and set(rolling_store.columns) & set(self.feature_columns):
+            self.rolling_store = rolling_store
+
+        # Cache de probabilidades compartida entre versiones: la clave incluye
+        # un token de esta instancia, así nunca se mezclan resultados de dos modelos
+        self.cache = cache
+        self._cache_token = (self.version, self.loaded_at, id(self))
+        self._quantizer = cache.quantizer(self.feature_columns) if cache is not None else None
+
+    @property
+    def model(self) -> Any:
+        if self._model is None:
+            self._model = joblib.load(self.model_path)
+        return self._model
+
+    @model.setter
+    def model(self, value: Any) -> None:
+        self._model = value
+
+    WARMUP_PAYLOAD = {
+        "client_id": "warmup",
+        "timestamp": "2025-01-01T12:00:00",
+        "total_sent": 1,
+        "response_rate": 1.0,
+        "mean_delay": 0.0,
+    }
+
+    def warmup(self) -> None:
+        """
+        Ejecuta una predicción de prueba (individual y por lote) para que las
+        primeras requests reales no paguen la inicialización perezosa.
+        """
+        payload = dict(self.WARMUP_PAYLOAD)
+        self.predict(payload)
+        self.predict_batch([payload, payload])
+
+    def _to_matrix(self, df: pd.DataFrame) -> np.ndarray:
         X = df.reindex(columns=self.feature_columns).fillna(0)
         X = X.apply(pd.to_numeric, errors="coerce").fillna(0.0).astype(float)
-        X_arr = X.values
+        return X.values
+
+    def _predict_proba(self, X_arr: np.ndarray) -> np.ndarray:
+        if self.flat_model is not None:
+            return self.flat_model.predict_proba(X_arr)
+        if self._booster is not None:
+            # Objetivo binario: el Booster devuelve solo la probabilidad de la clase positiva
+            proba = self._booster.predict(X_arr)
+            return np.column_stack([1.0 - proba, proba])
+        return self.model.predict_proba(X_arr)
 
-        if hasattr(self.model, "predict_proba"):
-            proba = self.model.predict_proba(X_arr)[0]
-            proba_fraude = float(proba[1]) if len(proba) > 1 else float(proba[0])
-            pred_label = int(proba_fraude >= 0.5)  # predicción inicial, luego se ajusta en usecase
+    @staticmethod
+    def _fraud_column(proba: np.ndarray) -> np.ndarray:
+        return proba[:, 1] if proba.shape[1] > 1 else proba[:, 0]
+
+    def _fraud_probability(self, X_arr: np.ndarray) -> np.ndarray:
+        """Probabilidad de fraude por fila; con cache solo se evalúan las filas que faltan."""
+        if self.cache is None:
+            return self._fraud_column(self._predict_proba(X_arr))
+
+        X_arr = PredictionCache.quantize(X_arr, self._quantizer)
+        keys = [(self._cache_token, row.tobytes()) for row in X_arr]
+        values = self.cache.get_many(keys)
+        # Filas faltantes agrupadas por clave: los vectores repetidos del lote se evalúan una vez
+        missing: Dict[Any, List[int]] = {}
+        for i, value in enumerate(values):
+            if value is None:
+                missing.setdefault(keys[i], []).append(i)
+        if missing:
+            rows = [indices[0] for indices in missing.values()]
+            computed = self._fraud_column(self._predict_proba(X_arr[rows]))
+            self.cache.put_many(list(missing), computed)
+            for indices, value in zip(missing.values(), computed):
+                for i in indices:
+                    values[i] = value
+        return np.asarray(values, dtype=np.float64)
+
+    def predict_proba_matrix(self, X_arr: np.ndarray) -> np.ndarray:
+        """
+        Probabilidad de fraude por fila de una matriz ya armada con las
+        columnas feature_columns (scoring masivo, sin payloads).
+        """
+        with PREDICT_STAGE_SECONDS.time(stage="model", mode="bulk"):
+            return self._fraud_probability(np.asarray(X_arr, dtype=np.float64))
+
+    def _build_results(self, X_arr: np.ndarray, mode: str = "single") -> List[Dict[str, Any]]:
+        """
+        Evalúa el modelo una sola vez sobre la matriz completa y arma
+        un resultado por fila.
+        """
+        if self.flat_model is not None or hasattr(self.model, "predict_proba"):
+            with PREDICT_STAGE_SECONDS.time(stage="model", mode=mode):
+                proba_fraude = self._fraud_probability(X_arr)
+            pred_labels = (proba_fraude >= 0.5).astype(int)  # predicción inicial, luego se ajusta en usecase
         else:
-            pred_label = int(self.model.predict(X_arr)[0])
+            pred_labels = np.asarray(self.model.predict(X_arr)).astype(int)
             proba_fraude = None
 
-        label_map = {0: "no_fraude", 1: "fraude"}
+        results = []
+        for i, pred_label in enumerate(pred_labels):
+            results.append({
+                "prediction": self.LABEL_MAP.get(int(pred_label), "desconocido"),
+                "probability": round(float(proba_fraude[i]), 2) if proba_fraude is not None else 0.0,
+            })
+        return results
+
+    def _enrich(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        if self.feature_store is not None:
+            features = self.feature_store.enrich(features)
+        if self.rolling_store is not None:
+            features = self.rolling_store.enrich(features)
+        return features
+
+    def predict(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        return self.score(features)[1]
+
+    def predict_batch(self, features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.score_batch(features)[1]
+
+    def predict_columns(self, columns: Mapping[str, Any]) -> np.ndarray:
+        """
+        Probabilidad de fraude por fila de un lote columnar (nombre -> array),
+        redondeada igual que en predict_batch. Las features se arman con
+        operaciones sobre columnas completas (FeatureEncoder.encode_columns).
+        """
+        return self.score_columns(columns)[1]
+
+    def score(self, features: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], np.ndarray]:
+        """
+        predict() con el payload enriquecido y la matriz de entrada. Con
+        fast_features la matriz es el buffer del FeatureEncoder del hilo:
+        vale hasta la siguiente predicción en ese hilo.
+        """
+        features = self._enrich(features)
+        if self.fast_features:
+            with PREDICT_STAGE_SECONDS.time(stage="features", mode="single"):
+                X_arr = self.encoder.encode(features)
+        else:
+            with PREDICT_STAGE_SECONDS.time(stage="features", mode="single"):
+                df = FeatureEngineering.compute_features_from_payload(features)
+            with PREDICT_STAGE_SECONDS.time(stage="coercion", mode="single"):
+                X_arr = self._to_matrix(df)
+        return features, self._build_results(X_arr)[0], X_arr
+
+    def score_batch(
+        self, features: List[Dict[str, Any]], mode: str = "batch"
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[np.ndarray]]:
+        if not features:
+            return features, [], None
+        features = [self._enrich(f) for f in features]
+        if self.fast_features:
+            with PREDICT_STAGE_SECONDS.time(stage="features", mode=mode):
+                X_arr = self.encoder.encode_batch(features)
+        else:
+            with PREDICT_STAGE_SECONDS.time(stage="features", mode=mode):
+                df = FeatureEngineering.compute_features_from_payloads(features)
+            with PREDICT_STAGE_SECONDS.time(stage="coercion", mode=mode):
+                X_arr = self._to_matrix(df)
+        return features, self._build_results(X_arr, mode=mode), X_arr
 
-        return {
-            "prediction": label_map.get(pred_label, "desconocido"),
-            "probability": round(proba_fraude, 2) if proba_fraude is not None else 0.0,
-        }
+    def score_columns(
+        self, columns: Mapping[str, Any]
+    ) -> Tuple[Mapping[str, Any], np.ndarray, Optional[np.ndarray]]:
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        if n_rows == 0:
+            return columns, np.empty(0, dtype=np.float64), None
+        if self.feature_store is not None:
+            columns = self.feature_store.enrich_columns(dict(columns))
+        if self.rolling_store is not None:
+            columns = self.rolling_store.enrich_columns(dict(columns))
+        with PREDICT_STAGE_SECONDS.time(stage="features", mode="columnar"):
+            X_arr = self.encoder.encode_columns(columns, n_rows)
+        if self.flat_model is None and not hasattr(self.model, "predict_proba"):
+            return columns, np.zeros(n_rows, dtype=np.float64), X_arr
+        with PREDICT_STAGE_SECONDS.time(stage="model", mode="columnar"):
+            proba = self._fraud_probability(X_arr)
+        # round() de Python y no np.round: este último no siempre coincide en los empates
+        return columns, np.fromiter((round(p, 2) for p in proba.tolist()), dtype=np.float64, count=n_rows), X_arr
@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from src.infra.models_store import ModelStore
+
+if TYPE_CHECKING:
+    from src.ml.inference import FraudPredictor
+
+logger = logging.getLogger(__name__)
+
+
+class PredictorManager:
+    """
+    Mantiene el FraudPredictor activo y lo reemplaza en caliente.
+
+    Un hilo en segundo plano consulta el puntero CURRENT del ModelStore; si
+    cambió, carga la nueva versión, la calienta con una predicción de prueba
+    y recién entonces cambia la referencia (una sola asignación, atómica bajo
+    el GIL). Las requests en curso terminan con el predictor anterior y
+    ninguna espera a la carga.
+    """
+
+    def __init__(
+        self,
+        model_store: ModelStore,
+        factory: Callable[[Optional[str]], "FraudPredictor"],
+        poll_interval_s: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            model_store (ModelStore): Registro de versiones a observar.
+            factory (Callable): Crea un FraudPredictor para una versión dada.
+            poll_interval_s (float): Cada cuántos segundos revisar CURRENT.
+        """
+        self.model_store = model_store
+        self.factory = factory
+        self.poll_interval_s = poll_interval_s
+        self._listeners: List[Callable[["FraudPredictor"], None]] = []
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._predictor: Optional["FraudPredictor"] = None
+        self.last_error: Optional[str] = None
+        self.last_load_seconds: Optional[float] = None
+
+    @property
+    def predictor(self) -> Optional["FraudPredictor"]:
+        return self._predictor
+
+    def on_swap(self, listener: Callable[["FraudPredictor"], None]) -> None:
+        """Registra un callback que recibe cada predictor nuevo (p. ej. para el usecase)."""
+        self._listeners.append(listener)
+        if self._predictor is not None:
+            listener(self._predictor)
+
+    def load(self, version: Optional[str] = None) -> "FraudPredictor":
+        """Carga, calienta y activa una versión (por defecto la de CURRENT)."""
+        with self._swap_lock:
+            version = version or self.model_store.current_version()
+            started = time.perf_counter()
+            predictor = self.factory(version)
+            predictor.warmup()
+            self.last_load_seconds = time.perf_counter() - started
+            self._predictor = predictor
+            for listener in self._listeners:
+                listener(predictor)
+            logger.info(f"Modelo activo: versión {predictor.version}")
+            return predictor
+
+    def check_for_update(self) -> bool:
+        """Recarga si CURRENT apunta a otra versión. Devuelve True si hubo cambio."""
+        current = self.model_store.current_version()
+        active = self._predictor.version if self._predictor is not None else None
+        if current is None or current == active:
+            return False
+        try:
+            self.load(current)
+            self.last_error = None
+            return True
+        except Exception as exc:
+            # Se conserva el predictor anterior si la versión nueva no carga
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            logger.exception(f"No se pudo cargar la versión {current}; se mantiene {active}")
+            return False
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="model-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval_s + 1)
+            self._thread = None
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval_s):
+            self.check_for_update()
+
+    def status(self) -> Dict[str, Any]:
+        predictor = self._predictor
+        return {
+            "version": predictor.version if predictor else None,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(predictor.loaded_at)) if predictor else None,
+            "load_seconds": self.last_load_seconds,
+            "backend": predictor.backend if predictor else None,
+            "engine": predictor.engine if predictor else None,
+            "mmap": predictor.mmap if predictor else None,
+            "current_pointer": self.model_store.current_version(),
+            "available_versions": self.model_store.list_versions(),
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.infra.metrics import PREDICTION_CACHE_EVENTS
+
+
+def parse_quantization(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Convierte "response_rate=0.01,mean_delay=5" en {"response_rate": 0.01, "mean_delay": 5.0}.
+
+    Raises:
+        ValueError: Si algún paso no es un número positivo.
+    """
+    steps: Dict[str, float] = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        step = float(value)
+        if step <= 0:
+            raise ValueError(f"El paso de cuantización de {name.strip()} debe ser positivo")
+        steps[name.strip()] = step
+    return steps
+
+
+class PredictionCache:
+    """
+    Cache LRU/TTL acotada de probabilidades de fraude, con la fila de
+    features codificada como clave.
+
+    Las features del modelo tienen baja cardinalidad (hora, día, conteos,
+    flags) y el tráfico repite los mismos vectores. Las features continuas
+    pueden cuantizarse (p. ej. response_rate a 0.01): la cuantización se
+    aplica a la entrada del modelo, no solo a la clave, así que el valor en
+    cache es exactamente lo que el modelo devuelve para ese vector.
+
+    Con bypass=True no se lee ni se escribe la cache (se sigue cuantizando),
+    para verificar que los resultados coinciden con y sin cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 50_000,
+        ttl_s: Optional[float] = None,
+        quantization: Optional[Dict[str, float]] = None,
+        bypass: bool = False,
+    ) -> None:
+        """
+        Args:
+            max_size (int): Máximo de entradas; se desaloja la menos usada.
+            ttl_s (Optional[float]): Vigencia de cada entrada en segundos (None = sin vencimiento).
+            quantization (Optional[Dict[str, float]]): Paso de redondeo por nombre de feature.
+            bypass (bool): Ignorar la cache (verificación).
+        """
+        if max_size <= 0:
+            raise ValueError("max_size debe ser positivo")
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self.quantization = dict(quantization or {})
+        self.bypass = bypass
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def quantizer(self, feature_columns: Sequence[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Índices y pasos de las columnas a cuantizar, o None si no hay ninguna."""
+        pairs = [(i, self.quantization[c]) for i, c in enumerate(feature_columns) if c in self.quantization]
+        if not pairs:
+            return None
+        idx, steps = zip(*pairs)
+        return np.array(idx), np.array(steps, dtype=np.float64)
+
+    @staticmethod
+    def quantize(X: np.ndarray, quantizer: Optional[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        if quantizer is None:
+            return X
+        idx, steps = quantizer
+        X = np.array(X, dtype=np.float64, copy=True)
+        X[:, idx] = np.round(X[:, idx] / steps) * steps
+        return X
+
+    def get_many(self, keys: List[Hashable]) -> List[Optional[float]]:
+        """Valor de cada clave, o None si no está o venció."""
+        if self.bypass:
+            return [None] * len(keys)
+        now = time.monotonic()
+        values: List[Optional[float]] = []
+        hits = misses = expired = 0
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl_s is not None and now - entry[1] > self.ttl_s:
+                    del self._entries[key]
+                    entry = None
+                    expired += 1
+                if entry is None:
+                    misses += 1
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    hits += 1
+                    values.append(entry[0])
+            self.hits += hits
+            self.misses += misses
+            self.expirations += expired
+        PREDICTION_CACHE_EVENTS.inc(hits, event="hit")
+        PREDICTION_CACHE_EVENTS.inc(misses, event="miss")
+        if expired:
+            PREDICTION_CACHE_EVENTS.inc(expired, event="expired")
+        return values
+
+    def put_many(self, keys: List[Hashable], values: Sequence[float]) -> None:
+        if self.bypass:
+            return
+        now = time.monotonic()
+        evicted = 0
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = (float(value), now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            PREDICTION_CACHE_EVENTS.inc(evicted, event="eviction")
+
+    def clear(self) -> None:
+        """Vacía la cache (se llama al reemplazar el modelo)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_s": self.ttl_s,
+            "quantization": self.quantization,
+            "bypass": self.bypass,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,73 @@
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sqlalchemy import create_engine
+
+from src.infra.models_store import ModelStore
+from src.ml.inference import FraudPredictor
+from src.ml.model_manager import PredictorManager
+from src.tests.helpers import FEATURE_COLUMNS, make_training_matrix
+
+SCHEMA_SQL = Path(__file__).resolve().parents[2] / "sql" / "schema.sql"
+
+
+@pytest.fixture(scope="session")
+def model_dir(tmp_path_factory):
+    """Directorio con un modelo pequeño entrenado, con el mismo formato que ModelStore."""
+    X, y = make_training_matrix()
+    clf = RandomForestClassifier(n_estimators=15, random_state=42, class_weight="balanced_subsample")
+    clf.fit(X, y)
+    base_dir = tmp_path_factory.mktemp("models")
+    ModelStore(str(base_dir)).save_model(clf, FEATURE_COLUMNS)
+    return base_dir
+
+
+@pytest.fixture
+def payloads():
+    """Payloads variados con la forma de PredictRequestDTO."""
+    rng = np.random.default_rng(7)
+    out = []
+    for i in range(50):
+        out.append({
+            "client_id": str(200 + i % 9),
+            "amount": float(rng.integers(1000, 500000)),
+            "tipo_transaccion": "compra",
+            "channel_code": "WEB",
+            "motor_monitoreo_map": "normal",
+            "alert_type": "compra_estandar",
+            "dia_semana": int(i % 7),
+            "client_mobilePhone": "3202222222",
+            "response_text": "Sí",
+            "timestamp": f"2025-08-{1 + i % 28:02d}T{i % 24:02d}:15:00",
+            "total_sent": int(rng.integers(1, 15)),
+            "response_rate": round(float(rng.random()), 2),
+            "mean_delay": round(float(rng.exponential(90)), 1),
+        })
+    return out
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """Base SQLite local con sql/schema.sql (tablas, índices y datos de ejemplo)."""
+    db_path = tmp_path / "envios.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
+    return create_engine(f"sqlite:///{db_path}")
+
+
+@pytest.fixture
+def api(model_dir, monkeypatch):
+    """Módulo src.entrypoints.api apuntando al modelo de prueba, sin modelo cargado."""
+    from src.entrypoints import api as api_module
+
+    manager = PredictorManager(
+        ModelStore(str(model_dir)), lambda version: FraudPredictor(str(model_dir), version=version), poll_interval_s=60
+    )
+    monkeypatch.setattr(api_module, "model_manager", manager)
+    monkeypatch.setattr(api_module, "drift_monitor", None)
+    monkeypatch.setattr(api_module, "usecase", None)
+    monkeypatch.setattr(api_module, "startup_state", {"ready": False, "error": None})
+    return api_module
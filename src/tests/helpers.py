@@ -0,0 +1,51 @@
+"""Helpers de datos sintéticos compartidos por los tests (importables como módulo normal)."""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.domain.entities import EnviosCliente, Transaccion
+
+FEATURE_COLUMNS = [
+    "hour", "weekday", "total_sent_agg",
+    "response_rate", "mean_delay",
+    "unusual_response_rate", "unusual_mean_delay"
+]
+
+
+def make_training_matrix(n_rows: int = 400, seed: int = 0):
+    """Matriz sintética con las mismas columnas que usa TrainModelUseCase."""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(0, 24, n_rows),
+        rng.integers(0, 7, n_rows),
+        rng.integers(1, 20, n_rows),
+        rng.random(n_rows).round(2),
+        rng.exponential(90, n_rows).round(1),
+        rng.integers(0, 2, n_rows),
+        rng.integers(0, 2, n_rows),
+    ]).astype(float)
+    y = ((X[:, 3] < 0.4) ^ (rng.random(n_rows) < 0.1)).astype(int)
+    return X, y
+
+
+def random_envios(n, n_clients, seed=0):
+    """Historial sintético de envíos (60% con respuesta) con transacción asociada."""
+    rng = np.random.default_rng(seed)
+    base = datetime(2025, 8, 1)
+    envios = []
+    for i in range(n):
+        sent_at = base + timedelta(seconds=int(rng.integers(0, 60 * 86400)))
+        response_at = (
+            sent_at + timedelta(seconds=float(rng.exponential(200)))
+            if rng.random() < 0.6 else None
+        )
+        status = str(rng.choice(["approved", "alert", "declined"]))
+        client_id = str(rng.integers(0, n_clients))
+        envios.append(EnviosCliente(
+            envio_id=f"TXN{i}",
+            client_id=client_id,
+            sent_at=sent_at,
+            response_at=response_at,
+            transaction=Transaccion(f"TXN{i}", client_id, 0.0, status, sent_at),
+        ))
+    return envios
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.infra.admission import AdmissionController, InferenceExecutor, Overloaded
+from src.infra.metrics import INFERENCE_QUEUE_WAIT_SECONDS
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_call_runs_on_dedicated_executor():
+    controller = AdmissionController(InferenceExecutor(2), max_in_flight=4, timeout_s=None)
+    waits_before = INFERENCE_QUEUE_WAIT_SECONDS.count()
+
+    name = run(controller.call(lambda: threading.current_thread().name))
+    assert name.startswith("inference")
+    assert INFERENCE_QUEUE_WAIT_SECONDS.count() == waits_before + 1
+    stats = controller.stats()
+    assert stats["admitted"] == 1 and stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_full_queue_is_rejected_immediately():
+    release = threading.Event()
+    controller = AdmissionController(InferenceExecutor(1), max_in_flight=2, timeout_s=None)
+
+    async def scenario():
+        busy = [asyncio.create_task(controller.call(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        with pytest.raises(Overloaded) as exc:
+            await controller.call(release.wait)
+        rejected_in = time.perf_counter() - started
+        release.set()
+        await asyncio.gather(*busy)
+        return exc.value, rejected_in
+
+    exc, rejected_in = run(scenario())
+    assert exc.status_code == 429 and exc.reason == "queue_full"
+    assert exc.headers == {"Retry-After": "1"}
+    assert rejected_in < 0.01
+    assert controller.stats()["rejected"] == 1 and controller.stats()["in_flight"] == 0
+
+
+def test_deadline_returns_503_and_drops_queued_work():
+    executor = InferenceExecutor(1)
+    controller = AdmissionController(executor, max_in_flight=4, timeout_s=0.05)
+    ran = []
+
+    async def scenario():
+        slow = asyncio.create_task(controller.call(time.sleep, 0.15))
+        await asyncio.sleep(0.01)
+        # Espera detrás de la tarea lenta y vence en cola: no llega a ejecutarse
+        queued = asyncio.create_task(controller.call(ran.append, 1))
+        return await asyncio.gather(slow, queued, return_exceptions=True)
+
+    results = run(scenario())
+    assert all(isinstance(r, Overloaded) and r.status_code == 503 for r in results)
+    time.sleep(0.2)
+    assert ran == []
+    assert executor.queued == 0 and executor.running == 0
+    assert controller.stats()["timed_out"] == 2
+
+
+def test_predict_returns_429_when_saturated(api, payloads, monkeypatch):
+    controller = AdmissionController(InferenceExecutor(1), max_in_flight=1, timeout_s=1.0)
+    monkeypatch.setattr(api, "admission", controller)
+    monkeypatch.setattr(api, "batcher", None)
+    api.load_model()
+    client = TestClient(api.app)
+
+    assert "prediction" in client.post("/predict", json=payloads[0]).json()
+    assert len(client.post("/predict/batch", json=payloads[:3]).json()) == 3
+
+    controller.in_flight = 1  # cupo ocupado por otra request
+    response = client.post("/predict", json=payloads[0])
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["reason"] == "queue_full"
+    assert client.get("/predict/admission").json()["rejected"] == 1
@@ -0,0 +1,95 @@
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from src.features.feature_engineering import FeatureEngineering
+from src.infra.models_store import ModelStore
+from src.infra.repository_postgres import EnviosRepository
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.usecases.train_model import TrainModelUseCase
+
+
+@pytest.fixture
+def repo(sqlite_engine):
+    # Solo datos sintéticos: las fechas de schema.sql tienen offsets ('-03') que julianday no interpreta
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("DELETE FROM envios_cliente"))
+        conn.execute(text("DELETE FROM transacciones"))
+    SyntheticDataGenerator(fraud_ratio=0.2, seed=11, n_clients=120).load_into(sqlite_engine, 1_500)
+    return EnviosRepository(sqlite_engine)
+
+
+def test_sql_aggregates_match_python(repo):
+    frame = repo.fetch_frame()
+    rows = FeatureEngineering.project_rows(frame["client_id"], frame["sent_at"], frame["response_at"], frame["status"])
+    expected = FeatureEngineering.aggregate_clients(rows).sort_index()
+    aggregates = repo.fetch_client_aggregates().sort_index()
+
+    assert len(aggregates) == frame["client_id"].nunique()
+    pd.testing.assert_frame_equal(aggregates[["total_sent", "responded"]], expected[["total_sent", "responded"]])
+    pd.testing.assert_series_equal(aggregates["delay_sum"], expected["delay_sum"], rtol=1e-9)
+
+
+def sorted_rows(frame):
+    """Sin ORDER BY el orden de las filas es el de la base: se comparan ordenadas."""
+    return frame.sort_values(list(frame.columns)).reset_index(drop=True)
+
+
+def test_send_projection_keeps_rows(repo):
+    frame = repo.fetch_frame()
+    sends = repo.fetch_send_projection(chunk_size=200)
+    assert list(sends.columns) == ["client_id", "sent_at", "status"]
+    pd.testing.assert_frame_equal(sorted_rows(sends), sorted_rows(frame[["client_id", "sent_at", "status"]]))
+
+
+@pytest.mark.parametrize("window", [{}, {"sent_from": datetime(2025, 2, 1), "sent_to": datetime(2025, 3, 15)}])
+def test_pushdown_features_match_python_path(repo, window):
+    expected = FeatureEngineering.compute_features_from_frame(repo.fetch_frame(**window))
+    features = FeatureEngineering.compute_features_from_projection(
+        repo.fetch_send_projection(**window), repo.fetch_client_aggregates(**window)
+    )
+    assert 0 < len(features) and len(features) == len(expected)
+    pd.testing.assert_frame_equal(sorted_rows(features), sorted_rows(expected), rtol=1e-9)
+
+
+def test_empty_range(repo):
+    window = {"sent_from": datetime(2030, 1, 1)}
+    aggregates = repo.fetch_client_aggregates(**window)
+    assert aggregates.empty
+    features = FeatureEngineering.compute_features_from_projection(repo.fetch_send_projection(**window), aggregates)
+    assert list(features.columns) == FeatureEngineering.COLUMNS and features.empty
+
+
+def test_train_from_pushdown_features(repo, tmp_path):
+    features = FeatureEngineering.compute_features_from_projection(
+        repo.fetch_send_projection(), repo.fetch_client_aggregates()
+    )
+    metrics = TrainModelUseCase(ModelStore(str(tmp_path)), n_estimators=10, test_size=0.3).execute_features(features)
+    assert 0.0 <= metrics["roc_auc"] <= 1.0
+
+
+def test_pushdown_reads_one_snapshot(repo, sqlite_engine, monkeypatch):
+    # WAL: un escritor puede confirmar mientras la lectura sigue abierta
+    db_path = sqlite_engine.url.database
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+    read_aggregates = EnviosRepository._read_client_aggregates
+
+    def insert_between_queries(self, *args):
+        aggregates = read_aggregates(self, *args)
+        with sqlite3.connect(db_path) as writer:
+            writer.execute(
+                "INSERT INTO envios_cliente (client_id, sent_at) VALUES ('cliente_nuevo', '2025-03-01 10:00:00')"
+            )
+        return aggregates
+
+    monkeypatch.setattr(EnviosRepository, "_read_client_aggregates", insert_between_queries)
+    sends, aggregates = repo.fetch_pushdown(chunk_size=100)
+    assert "cliente_nuevo" not in set(sends["client_id"]) and "cliente_nuevo" not in aggregates.index
+    assert len(sends) == aggregates["total_sent"].sum()
+    FeatureEngineering.compute_features_from_projection(sends, aggregates)
+    # La inserción sí ocurrió: una lectura posterior la ve
+    assert "cliente_nuevo" in set(repo.fetch_send_projection()["client_id"])
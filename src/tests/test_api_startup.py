@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.infra.config import get_settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_settings_are_loaded_once():
+    assert get_settings() is get_settings()
+
+
+def test_importing_api_defers_heavy_modules():
+    code = (
+        "import sys, src.entrypoints.api; "
+        "print(','.join(m for m in ('pandas', 'sklearn', 'scipy') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1:] in ([], [""])
+
+
+def test_importing_api_does_not_touch_model_dir(tmp_path):
+    model_dir = tmp_path / "models"
+    code = "import src.entrypoints.api as api; print(api.model_manager, api.drift_monitor)"
+    env = {**os.environ, "MODEL_PATH": str(model_dir / "model.pkl")}
+    out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "None None"
+    assert not model_dir.exists()
+
+
+def test_reload_registers_swap_listener_once(api):
+    api.load_model()
+    api.load_model()
+    assert api.model_manager._listeners.count(api._on_swap) == 1
+    new_predictor = api.model_manager.load()
+    assert api.usecase.predictor is new_predictor
+
+
+def test_readyz_is_503_until_model_loaded(api, payloads):
+    client = TestClient(api.app)  # sin lifespan: el modelo no se carga
+    assert client.get("/healthz").json() == {"status": "ok"}
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "loading"
+    assert client.post("/predict/batch", json=payloads[:2]).status_code == 503
+
+    api.load_model()
+    ready = client.get("/readyz")
+    assert ready.status_code == 200
+    assert ready.json()["version"] == api.model_manager.predictor.version
+    assert len(client.post("/predict/batch", json=payloads[:2]).json()) == 2
+
+
+def test_lifespan_loads_model_in_background(api, payloads):
+    with TestClient(api.app) as client:
+        deadline = time.monotonic() + 10
+        while client.get("/readyz").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.get("/readyz").json()["status"] == "ready"
+        assert "prediction" in client.post("/predict", json=payloads[0]).json()
+
+
+def test_readyz_reports_load_error(api, monkeypatch):
+    def broken_factory(version):
+        raise FileNotFoundError("sin modelo")
+
+    monkeypatch.setattr(api.model_manager, "factory", broken_factory)
+    with pytest.raises(FileNotFoundError):
+        api.load_model()
+    response = TestClient(api.app).get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "error"
+    assert "sin modelo" in response.json()["error"]
@@ -0,0 +1,152 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from src.domain.services import DecisionAuditLog
+from src.infra.audit_log import JsonlAuditWriter, SqlAuditWriter, WriteBehindAuditLog
+from src.ml.inference import FraudPredictor
+from src.usecases.predict_response import PredictResponseUseCase
+
+
+class ListWriter:
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+
+    def write(self, entries):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("base caída")
+        self.batches.append(list(entries))
+
+
+class ListAuditLog(DecisionAuditLog):
+    def __init__(self):
+        self.entries = []
+
+    def record(self, entries):
+        self.entries.extend(entries)
+
+
+def make_entry(i):
+    return {
+        "decision_id": f"d{i}",
+        "logged_at": time.time(),
+        "client_id": str(i % 3),
+        "request_timestamp": "2025-08-01T10:00:00",
+        "model_version": "v1",
+        "probability": 0.5,
+        "threshold": 0.7,
+        "prediction": "no_fraude",
+        "unusual_response_rate": False,
+        "unusual_mean_delay": i % 2 == 0,
+        "payload": {"client_id": str(i % 3), "amount": 100.0 * i},
+    }
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_sql_writer_stop_flushes_everything(sqlite_engine):
+    audit = WriteBehindAuditLog(SqlAuditWriter(engine=sqlite_engine), flush_size=4, flush_interval_s=10.0)
+    audit.start()
+    audit.record([make_entry(i) for i in range(10)])
+    audit.stop()
+
+    rows = pd.read_sql("SELECT * FROM auditoria_decisiones ORDER BY decision_id", sqlite_engine)
+    assert len(rows) == 10 and rows["decision_id"].is_unique
+    assert json.loads(rows.loc[rows["decision_id"] == "d3", "payload"].iloc[0])["amount"] == 300.0
+    assert audit.stats()["written"] == 10 and not audit.running
+
+
+def test_flush_by_size_and_by_interval():
+    writer = ListWriter()
+    audit = WriteBehindAuditLog(writer, flush_size=3, flush_interval_s=0.2)
+    audit.start()
+    try:
+        audit.record([make_entry(i) for i in range(6)])
+        assert wait_for(lambda: audit.written == 6)
+        assert [len(b) for b in writer.batches] == [3, 3]
+
+        # Un lote incompleto sale al vencer el intervalo, sin esperar a stop()
+        audit.record([make_entry(6)])
+        assert wait_for(lambda: audit.written == 7)
+        assert len(writer.batches[-1]) == 1
+    finally:
+        audit.stop()
+
+
+def test_full_queue_drops_and_counts():
+    writer = ListWriter()
+    audit = WriteBehindAuditLog(writer, max_queue=2, flush_size=10)
+    # Sin hilo de escritura la cola no se vacía
+    audit.record([make_entry(i) for i in range(5)])
+    assert audit.stats()["dropped"] == 3 and audit.stats()["queue_depth"] == 2
+
+    audit.start()
+    audit.stop()
+    assert sum(len(b) for b in writer.batches) == 2
+
+
+def test_block_mode_waits_before_dropping():
+    audit = WriteBehindAuditLog(ListWriter(), max_queue=1, on_full="block", block_timeout_s=0.02)
+    started = time.perf_counter()
+    audit.record([make_entry(0), make_entry(1)])
+    assert time.perf_counter() - started >= 0.02
+    assert audit.enqueued == 1 and audit.dropped == 1
+
+
+def test_failed_batches_are_retried():
+    writer = ListWriter(fail_times=1)
+    audit = WriteBehindAuditLog(writer, flush_size=5, flush_interval_s=0.05, max_retries=1)
+    audit.start()
+    audit.record([make_entry(i) for i in range(5)])
+    audit.stop()
+    assert audit.written == 5 and audit.failed == 0
+
+    failing = WriteBehindAuditLog(ListWriter(fail_times=10), flush_interval_s=0.05, max_retries=0)
+    failing.start()
+    failing.record([make_entry(0)])
+    failing.stop()
+    assert failing.failed == 1 and failing.written == 0
+
+
+def test_jsonl_writer(tmp_path):
+    path = tmp_path / "audit" / "decisiones.jsonl"
+    audit = WriteBehindAuditLog(JsonlAuditWriter(str(path)), flush_size=2)
+    audit.start()
+    audit.record([make_entry(i) for i in range(3)])
+    audit.stop()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["decision_id"] for line in lines] == ["d0", "d1", "d2"]
+
+
+def test_invalid_on_full():
+    with pytest.raises(ValueError):
+        WriteBehindAuditLog(ListWriter(), on_full="wait")
+
+
+def test_usecase_records_every_decision(model_dir, payloads):
+    audit = ListAuditLog()
+    usecase = PredictResponseUseCase(FraudPredictor(str(model_dir)), threshold=0.7, audit=audit)
+
+    single = usecase.execute(dict(payloads[0]))
+    batch = usecase.execute_batch([dict(p) for p in payloads[1:6]])
+
+    assert len(audit.entries) == 6
+    assert len({e["decision_id"] for e in audit.entries}) == 6
+    for entry, payload, result in zip(audit.entries, payloads, [single] + batch):
+        assert entry["client_id"] == payload["client_id"]
+        assert entry["probability"] == result["probability"]
+        assert entry["prediction"] == result["prediction"]
+        assert entry["threshold"] == 0.7
+        assert entry["unusual_mean_delay"] == result["behavior_flags"]["unusual_mean_delay"]
+        assert entry["model_version"] == usecase.predictor.version
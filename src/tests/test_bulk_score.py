@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sqlalchemy import text
+
+from src.features.feature_engineering import FeatureEngineering
+from src.features.rolling import window_columns
+from src.infra.models_store import ModelStore
+from src.infra.repository_postgres import EnviosRepository, PredictionsRepository
+from src.infra.scoring_checkpoint import ScoringCheckpointStore
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.ml.inference import FraudPredictor
+from src.usecases.bulk_score import BulkScoringUseCase
+from src.usecases.predict_response import PredictResponseUseCase
+from src.tests.helpers import FEATURE_COLUMNS, make_training_matrix
+
+
+@pytest.fixture
+def scoring_db(sqlite_engine):
+    # Solo datos sintéticos: las fechas de schema.sql tienen otro formato de texto en SQLite
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("DELETE FROM envios_cliente"))
+        conn.execute(text("DELETE FROM transacciones"))
+    SyntheticDataGenerator(fraud_ratio=0.2, seed=5, n_clients=150).load_into(sqlite_engine, 1_200)
+    return sqlite_engine
+
+
+def make_usecase(engine, model_dir, checkpoint_dir, workers=0, chunk_size=250):
+    return BulkScoringUseCase(
+        EnviosRepository(engine),
+        PredictionsRepository(engine),
+        ModelStore(str(model_dir)),
+        ScoringCheckpointStore(str(checkpoint_dir)),
+        threshold=0.7,
+        workers=workers,
+        chunk_size=chunk_size,
+    )
+
+
+def test_chunked_features_match_full_history():
+    frame = SyntheticDataGenerator(seed=9, n_clients=40).envios_frame(900)
+    expected = FeatureEngineering.compute_features_from_frame(frame)
+
+    rows = FeatureEngineering.project_rows(frame["client_id"], frame["sent_at"], frame["response_at"], frame["status"])
+    aggregates = FeatureEngineering.aggregate_clients(rows)
+    reference = FeatureEngineering.flag_reference(aggregates)
+    chunks = [
+        FeatureEngineering.features_from_aggregates(rows.iloc[start:start + 200], aggregates, reference)
+        for start in range(0, len(rows), 200)
+    ]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected, check_dtype=False)
+
+
+def test_keyset_frames_cover_every_row_once(scoring_db):
+    repo = EnviosRepository(scoring_db)
+    frames = list(repo.iter_keyset_frames(chunk_size=500))
+    assert [len(f) for f in frames] == [500, 500, 200]
+    ids = pd.concat(frames)["envio_id"]
+    assert ids.is_monotonic_increasing and ids.is_unique and len(ids) == 1_200
+    resumed = list(repo.iter_keyset_frames(chunk_size=500, after_id=int(frames[0]["envio_id"].iloc[-1])))
+    assert sum(len(f) for f in resumed) == 700
+
+
+def test_bulk_scoring_matches_predictor(scoring_db, model_dir, tmp_path):
+    summary = make_usecase(scoring_db, model_dir, tmp_path / "ck").execute(run_id="full")
+    assert summary["rows"] == 1_200 and summary["chunks"] == 5
+    assert summary["checkpoint"]["completed"]
+
+    scored = PredictionsRepository(scoring_db).fetch_run("full")
+    assert len(scored) == 1_200 and scored["envio_id"].is_unique
+
+    # Mismo resultado que puntuar todo el historial de una vez con FraudPredictor
+    frame = EnviosRepository(scoring_db).fetch_frame()
+    features = FeatureEngineering.compute_features_from_frame(frame)
+    predictor = FraudPredictor(str(model_dir), engine="flat")
+    probability = predictor.predict_proba_matrix(features[predictor.feature_columns].to_numpy(dtype=float))
+    np.testing.assert_allclose(scored["probability"].to_numpy(), probability)
+    expected = PredictResponseUseCase.decide(probability, features["response_rate"], features["mean_delay"], 0.7)
+    assert (scored["prediction"].to_numpy() == np.where(expected, "fraude", "no_fraude")).all()
+
+
+def test_interrupted_run_resumes_without_duplicates(scoring_db, model_dir, tmp_path):
+    first = make_usecase(scoring_db, model_dir, tmp_path / "ck").execute(run_id="r1", max_chunks=2)
+    assert first["rows"] == 500 and not first["checkpoint"]["completed"]
+
+    # Filas escritas sin checkpoint (el job murió después del INSERT): se descartan al retomar
+    orphan = PredictionsRepository(scoring_db).fetch_run("r1").head(10).assign(chunk_id=2)
+    PredictionsRepository(scoring_db).write(orphan)
+
+    resumed = make_usecase(scoring_db, model_dir, tmp_path / "ck").execute(run_id="r1")
+    assert resumed["deleted_rows"] == 10
+    assert resumed["rows"] == 700 and resumed["checkpoint"]["completed"]
+    scored = PredictionsRepository(scoring_db).fetch_run("r1")
+    assert len(scored) == 1_200 and scored["envio_id"].is_unique
+
+    # Una corrida completa no vuelve a escribir
+    assert make_usecase(scoring_db, model_dir, tmp_path / "ck").execute(run_id="r1")["rows"] == 0
+
+
+def test_sends_inserted_after_aggregation_are_not_scored(scoring_db, model_dir, tmp_path):
+    usecase = make_usecase(scoring_db, model_dir, tmp_path / "ck")
+    aggregate = usecase._aggregate
+
+    def aggregate_then_insert(sent_from, sent_to):
+        result = aggregate(sent_from, sent_to)
+        # Envío de un cliente nuevo entre la primera y la segunda pasada
+        with scoring_db.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO envios_cliente (client_id, sent_at) "
+                "SELECT 'cliente-nuevo', sent_at FROM envios_cliente ORDER BY id LIMIT 1"
+            ))
+        return result
+
+    usecase._aggregate = aggregate_then_insert
+    summary = usecase.execute(run_id="late")
+    assert summary["rows"] == 1_200 and summary["checkpoint"]["completed"]
+    assert summary["checkpoint"]["max_id"] == summary["checkpoint"]["last_id"]
+    assert "cliente-nuevo" not in set(PredictionsRepository(scoring_db).fetch_run("late")["client_id"])
+
+
+def test_process_pool_gives_same_scores(scoring_db, model_dir, tmp_path):
+    make_usecase(scoring_db, model_dir, tmp_path / "ck", workers=0).execute(run_id="inline")
+    make_usecase(scoring_db, model_dir, tmp_path / "ck", workers=2).execute(run_id="pool")
+    predictions = PredictionsRepository(scoring_db)
+    inline, pool = predictions.fetch_run("inline"), predictions.fetch_run("pool")
+    np.testing.assert_array_equal(inline["probability"], pool["probability"])
+    assert (inline["prediction"] == pool["prediction"]).all()
+
+
+def test_point_in_time_model_is_rejected(scoring_db, tmp_path):
+    X, y = make_training_matrix()
+    columns = FEATURE_COLUMNS + window_columns()
+    X = np.hstack([X, np.zeros((len(X), len(window_columns())))])
+    ModelStore(str(tmp_path / "models")).save_model(LogisticRegression(max_iter=500).fit(X, y), columns)
+    with pytest.raises(ValueError, match="features de ventana"):
+        make_usecase(scoring_db, tmp_path / "models", tmp_path / "ck").execute(run_id="pit")
+    assert not (tmp_path / "ck").exists()
+
+
+def test_checkpoint_of_other_model_is_rejected(scoring_db, model_dir, tmp_path):
+    usecase = make_usecase(scoring_db, model_dir, tmp_path / "ck")
+    usecase.execute(run_id="r2", max_chunks=1)
+    usecase.version = "otra-version"
+    with pytest.raises(ValueError):
+        usecase.execute(run_id="r2")
@@ -0,0 +1,113 @@
+import io
+import sys
+from datetime import datetime
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.features.feature_encoder import FeatureEncoder
+from src.features.online_store import ClientFeatureStore
+from src.infra import columnar
+from src.ml.inference import FraudPredictor
+from src.usecases.predict_response import PredictResponseUseCase
+
+
+def to_columns(payloads):
+    return {name: np.array([p[name] for p in payloads]) for name in payloads[0]}
+
+
+def test_encode_columns_matches_encode_batch(payloads):
+    encoder = FeatureEncoder()
+    columns = columnar.validate(to_columns(payloads))
+    np.testing.assert_array_equal(encoder.encode_columns(columns, len(payloads)), encoder.encode_batch(payloads))
+
+
+def test_enrich_columns_matches_enrich(payloads):
+    store = ClientFeatureStore()
+    for i in range(30):
+        store.record_send("201")
+        store.record_send("205")
+        if i % 3:
+            store.record_response("201", 40.0 + i)
+    enriched = store.enrich_columns(to_columns(payloads))
+    for i, payload in enumerate(payloads):
+        expected = store.enrich(payload)
+        for name in ("total_sent", "response_rate", "mean_delay"):
+            assert enriched[name][i] == pytest.approx(expected[name])
+
+
+def test_execute_columns_matches_execute_batch(model_dir, payloads):
+    usecase = PredictResponseUseCase(FraudPredictor(str(model_dir)), threshold=0.5)
+    output = usecase.execute_columns(columnar.validate(to_columns(payloads)))
+    assert PredictResponseUseCase.rows_from_columns(output) == usecase.execute_batch([dict(p) for p in payloads])
+
+
+def test_npz_endpoint_matches_json_batch(api, payloads):
+    api.load_model()
+    client = TestClient(api.app)
+    body = columnar.encode(to_columns(payloads), columnar.NPZ_CONTENT_TYPE)
+    response = client.post("/predict/columnar", content=body, headers={"Content-Type": columnar.NPZ_CONTENT_TYPE})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == columnar.NPZ_CONTENT_TYPE
+
+    with np.load(io.BytesIO(response.content), allow_pickle=False) as archive:
+        output = {name: archive[name] for name in archive.files}
+    expected = client.post("/predict/batch", json=payloads).json()
+    assert PredictResponseUseCase.rows_from_columns(output) == expected
+
+
+def test_columnar_endpoint_rejects_bad_bodies(api, payloads):
+    api.load_model()
+    client = TestClient(api.app)
+    npz = {"Content-Type": columnar.NPZ_CONTENT_TYPE}
+
+    incomplete = to_columns(payloads)
+    del incomplete["mean_delay"]
+    response = client.post("/predict/columnar", content=columnar.encode(incomplete, columnar.NPZ_CONTENT_TYPE), headers=npz)
+    assert response.status_code == 422 and "mean_delay" in response.json()["detail"]
+
+    assert client.post("/predict/columnar", content=b"no es npz", headers=npz).status_code == 422
+    assert client.post("/predict/columnar", content=b"{}", headers={"Content-Type": "application/json"}).status_code == 415
+
+
+def test_arrow_roundtrip(model_dir, payloads):
+    body = columnar.encode(to_columns(payloads), columnar.ARROW_CONTENT_TYPE)
+    columns = columnar.decode(body, columnar.ARROW_CONTENT_TYPE)
+    usecase = PredictResponseUseCase(FraudPredictor(str(model_dir)), threshold=0.7)
+    output = columnar.decode_response(
+        columnar.encode(usecase.execute_columns(columns), columnar.ARROW_CONTENT_TYPE), columnar.ARROW_CONTENT_TYPE
+    )
+    assert PredictResponseUseCase.rows_from_columns(output) == PredictResponseUseCase.rows_from_columns(
+        usecase.execute_columns(columnar.validate(to_columns(payloads)))
+    )
+
+
+def test_arrow_without_pyarrow_is_unsupported(monkeypatch):
+    for name in ("pyarrow", "pyarrow.compute", "pyarrow.ipc"):
+        monkeypatch.setitem(sys.modules, name, None)
+    with pytest.raises(columnar.UnsupportedFormatError):
+        columnar.decode(b"", columnar.ARROW_CONTENT_TYPE)
+
+
+def test_timestamp_offsets_keep_local_hours(model_dir, payloads):
+    """Un offset ISO se interpreta igual que en /predict/batch (hora local, no UTC)."""
+    offsets = ["+02:00", "-0300", "Z", ""]
+    local = [dict(p, timestamp=f"2025-08-0{1 + i % 7}T{i % 24:02d}:30:00{offsets[i % 4]}") for i, p in enumerate(payloads)]
+    usecase = PredictResponseUseCase(FraudPredictor(str(model_dir)), threshold=0.5)
+    columns = columnar.validate(to_columns(local))
+    assert columns["timestamp"][1] == np.datetime64("2025-08-02T01:30:00")
+    expected = usecase.execute_batch([dict(p) for p in local])
+    assert PredictResponseUseCase.rows_from_columns(usecase.execute_columns(columns)) == expected
+
+    # Arrow con una columna timestamp con zona: hora local de esa zona
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    naive = pa.array([datetime.fromisoformat(p["timestamp"]).replace(tzinfo=None) for p in local], pa.timestamp("us"))
+    table = pa.table({**to_columns(local), "timestamp": pc.assume_timezone(naive, "America/Sao_Paulo")})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    decoded = columnar.decode(sink.getvalue().to_pybytes(), columnar.ARROW_CONTENT_TYPE)
+    np.testing.assert_array_equal(decoded["timestamp"], columns["timestamp"])
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.infra.models_store import ModelStore
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.ml.compaction import CompactionConfig, ForestCompactor
+from src.ml.flat_forest import FlatForest
+from src.ml.inference import FraudPredictor
+from src.usecases.train_model import TrainModelUseCase
+from src.tests.helpers import make_training_matrix
+
+
+@pytest.fixture(scope="module")
+def forest():
+    X, y = make_training_matrix(seed=3)
+    model = RandomForestClassifier(n_estimators=20, random_state=0, class_weight="balanced_subsample").fit(X, y)
+    return model, X, y
+
+
+def test_float32_keeps_every_split(forest):
+    model, X, _ = forest
+    flat = FlatForest.from_sklearn(model)
+    compact = flat.astype_float32()
+    assert compact.threshold.dtype == np.float32 and compact.leaf_proba.dtype == np.float32
+    np.testing.assert_array_equal(compact.apply(X), flat.apply(X))
+    np.testing.assert_allclose(compact.predict_proba(X), model.predict_proba(X), atol=1e-6)
+    assert compact.nbytes < flat.nbytes
+
+
+def test_select_trees_and_limit_depth(forest):
+    model, X, _ = forest
+    flat = FlatForest.from_sklearn(model)
+
+    subset = flat.select_trees([2, 5, 11])
+    expected = np.mean([model.estimators_[i].predict_proba(X) for i in (2, 5, 11)], axis=0)
+    np.testing.assert_allclose(subset.predict_proba(X), expected)
+    assert subset.node_count == sum(model.estimators_[i].tree_.node_count for i in (2, 5, 11))
+
+    # Podar a profundidad d equivale a recorrer solo d niveles del bosque original
+    pruned = flat.limit_depth(3)
+    truncated = FlatForest.from_arrays(flat.to_arrays(), max_depth=3)
+    assert pruned.max_depth == 3 and pruned.node_count < flat.node_count
+    np.testing.assert_allclose(pruned.predict_proba(X), truncated.predict_proba(X))
+
+
+@pytest.mark.parametrize("selection", CompactionConfig.SELECTIONS)
+def test_compactor_report(forest, selection):
+    model, X, y = forest
+    config = CompactionConfig(n_trees=5, selection=selection, max_depth=6)
+    compact, report = ForestCompactor(config, threshold=0.7).compact(model, X, X, y)
+
+    assert compact.n_estimators == 5 and compact.max_depth <= 6
+    assert report["size"]["compact_nodes"] < report["size"]["original_nodes"]
+    fidelity = report["fidelity"]
+    assert 0.0 <= fidelity["decision_agreement"] <= 1.0
+    assert fidelity["max_abs_diff"] >= fidelity["mean_abs_diff"] >= 0.0
+    assert {"original", "original_flat", "compact"} <= set(report["latency"])
+
+
+def test_training_persists_compacted_version(tmp_path, payloads):
+    frame = SyntheticDataGenerator(fraud_ratio=0.3, seed=11).envios_frame(3_000)
+    store = ModelStore(str(tmp_path))
+    config = CompactionConfig(n_trees=5, max_depth=8)
+    metrics = TrainModelUseCase(store, n_estimators=15, compaction=config, threshold=0.6).execute(frame)
+
+    compaction = metrics["compaction"]
+    assert compaction["base_version"] == metrics["version"]
+    assert store.current_version() == compaction["version"]
+    assert compaction["fidelity"]["threshold"] == 0.6
+    assert "compact" in metrics["stage_seconds"]
+
+    meta = store.load_metadata()
+    assert meta["compacted_from"] == metrics["version"] and meta["backend"] == "random_forest"
+    assert meta["compacted"] is True
+    assert isinstance(store.load_model(), FlatForest)
+    assert store.has_flat_model(compaction["version"])
+
+    mmap = FraudPredictor(str(tmp_path), engine="flat")
+    assert mmap.mmap and mmap.flat_model.threshold.dtype == np.float32
+    assert mmap.predict_batch(payloads) == FraudPredictor(str(tmp_path)).predict_batch(payloads)
+
+    trainer = TrainModelUseCase(store, n_estimators=5)
+    with pytest.raises(ValueError, match="compactado"):
+        trainer.execute_warm_start(frame, n_new_trees=2, compare_full_refit=False)
+    # El bosque completo sigue admitiendo warm start
+    store.set_current(metrics["version"])
+    assert trainer.execute_warm_start(frame, n_new_trees=2, compare_full_refit=False)["warm_start"]["version"]
+
+
+def test_compaction_requires_random_forest(tmp_path):
+    with pytest.raises(ValueError):
+        TrainModelUseCase(ModelStore(str(tmp_path)), backend="lightgbm", compaction=CompactionConfig())
+    with pytest.raises(ValueError):
+        ForestCompactor(CompactionConfig(selection="random"))
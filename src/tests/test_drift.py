@@ -0,0 +1,167 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.domain.services import PredictorService
+from src.infra.models_store import ModelStore
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.ml.drift import PROBABILITY_EDGES, DriftReference, HistogramSketch, StreamingDriftMonitor
+from src.ml.inference import FraudPredictor
+from src.usecases.predict_response import PredictResponseUseCase
+from src.usecases.train_model import TrainModelUseCase
+
+
+@pytest.fixture(scope="module")
+def trained_dir(tmp_path_factory):
+    """Modelo entrenado con TrainModelUseCase (guarda drift_reference.json)."""
+    base_dir = tmp_path_factory.mktemp("drift_models")
+    frame = SyntheticDataGenerator(seed=5, n_clients=80, fraud_ratio=0.2).envios_frame(2_000)
+    TrainModelUseCase(ModelStore(str(base_dir)), n_estimators=10, test_size=0.3).execute(frame)
+    return base_dir
+
+
+def make_payloads(n, seed=0, shift=0.0):
+    """Payloads con la distribución aproximada del entrenamiento; shift desplaza response_rate."""
+    rng = np.random.default_rng(seed)
+    return [{
+        "client_id": str(i),
+        "timestamp": f"2025-08-0{1 + i % 7}T{i % 24:02d}:00:00",
+        "total_sent": int(rng.integers(1, 20)),
+        "response_rate": float(np.clip(rng.random() + shift, 0.0, 1.0)),
+        "mean_delay": float(rng.exponential(90)),
+    } for i in range(n)]
+
+
+def test_sketch_counts_match_digitize():
+    X = np.random.default_rng(0).normal(size=(500, 3))
+    sketch = HistogramSketch.from_values(["a", "b", "c"], X, n_bins=8)
+    assert sketch.total == 500
+    for j in range(3):
+        edges = sketch.edges[j][np.isfinite(sketch.edges[j])]
+        expected = np.bincount(np.digitize(X[:, j], edges), minlength=sketch.counts.shape[1])
+        np.testing.assert_array_equal(sketch.counts[j], expected)
+
+
+def test_psi_and_ks():
+    rng = np.random.default_rng(1)
+    reference = HistogramSketch.from_values(["x"], rng.normal(size=(5_000, 1)))
+    same = HistogramSketch(reference.names, reference.edges, np.zeros_like(reference.counts))
+    same.update(rng.normal(size=(5_000, 1)))
+    shifted = HistogramSketch(reference.names, reference.edges, np.zeros_like(reference.counts))
+    shifted.update(rng.normal(loc=1.0, size=(5_000, 1)))
+
+    assert same.compare(reference)["x"]["psi"] < 0.02
+    assert shifted.compare(reference)["x"]["psi"] > 0.5
+    assert shifted.compare(reference)["x"]["ks"] > 0.3
+    shifted.reset()
+    assert shifted.compare(reference)["x"] == {"psi": 0.0, "ks": 0.0}
+
+
+def test_reference_roundtrip_and_probability_bins():
+    X = np.random.default_rng(2).integers(0, 5, size=(300, 2)).astype(float)
+    probabilities = np.random.default_rng(3).random(300)
+    reference = DriftReference.build(["a", "b"], X, probabilities)
+    restored = DriftReference.from_dict(reference.to_dict())
+    np.testing.assert_array_equal(restored.features.counts, reference.features.counts)
+    np.testing.assert_array_equal(restored.features.edges, reference.features.edges)
+    # Variables discretas: un borde por valor distinto, menos que los 9 de 10 cuantiles
+    assert np.isfinite(restored.features.edges).sum(axis=1).max() == 5
+    assert restored.probability.total == 300
+    assert len(PROBABILITY_EDGES) == 20 and restored.probability.counts.shape == (1, 21)
+
+
+def test_training_saves_reference(trained_dir):
+    store = ModelStore(str(trained_dir))
+    data = store.load_drift_reference()
+    assert data["features"]["names"] == store.load_features()
+    assert DriftReference.from_dict(data).features.total > 0
+
+
+def test_monitor_detects_shift(trained_dir):
+    monitor = StreamingDriftMonitor(ModelStore(str(trained_dir)).load_drift_reference, min_samples=200)
+    predictor = FraudPredictor(str(trained_dir))
+    monitor.use_version(predictor.version)
+    usecase = PredictResponseUseCase(predictor, threshold=0.5, drift=monitor)
+
+    usecase.execute_batch(make_payloads(100))
+    report = monitor.report()
+    assert report["samples"] == 100 and report["model_version"] == predictor.version
+    assert not report["drift"]  # menos de min_samples
+
+    monitor.reset()
+    usecase.execute_batch(make_payloads(1_000, seed=1, shift=0.8))
+    report = monitor.report()
+    assert report["samples"] == 1_000
+    assert report["features"]["response_rate"]["drift"] and report["drift"]
+    assert not report["features"]["weekday"]["drift"]
+
+
+def test_all_paths_record_with_constant_memory(trained_dir):
+    monitor = StreamingDriftMonitor(ModelStore(str(trained_dir)).load_drift_reference)
+    predictor = FraudPredictor(str(trained_dir))
+    monitor.use_version(predictor.version)
+    usecase = PredictResponseUseCase(predictor, threshold=0.5, drift=monitor)
+    payloads = make_payloads(50)
+
+    nbytes = monitor._live.features.counts.nbytes + monitor._live.probability.counts.nbytes
+    usecase.execute(dict(payloads[0]))
+    usecase.execute_batch([dict(p) for p in payloads])
+    columns = {name: np.array([p[name] for p in payloads]) for name in payloads[0]}
+    usecase.execute_columns(columns)
+
+    assert monitor._live.probability.total == monitor._live.features.total == 101
+    assert monitor._live.features.counts.nbytes + monitor._live.probability.counts.nbytes == nbytes
+
+
+class SwapDuringInference(PredictorService):
+    """Predictor de la versión v1 que dispara un hot swap a v2 mientras hace la inferencia."""
+
+    version = "v1"
+
+    def __init__(self, inner, on_swap):
+        self.inner, self.on_swap = inner, on_swap
+
+    def predict(self, payload):
+        return self.inner.predict(payload)
+
+    def score_batch(self, payloads, mode="batch"):
+        scored = self.inner.score_batch(payloads, mode)
+        self.on_swap()
+        return scored
+
+
+def test_hot_swap_does_not_mix_versions(trained_dir):
+    data = ModelStore(str(trained_dir)).load_drift_reference()
+    monitor = StreamingDriftMonitor(lambda version: data)
+    monitor.use_version("v1")
+    usecase = PredictResponseUseCase(None, threshold=0.5, drift=monitor)
+    usecase.predictor = SwapDuringInference(FraudPredictor(str(trained_dir)), lambda: monitor.use_version("v2"))
+
+    usecase.execute_batch(make_payloads(30))
+    report = monitor.report()
+    assert report["model_version"] == "v2" and report["samples"] == 0
+
+
+def test_model_without_reference(model_dir):
+    monitor = StreamingDriftMonitor(ModelStore(str(model_dir)).load_drift_reference)
+    monitor.use_version(None)
+    monitor.record(np.zeros((1, 7)), [0.5])
+    assert monitor.report()["reference"] is False
+
+
+def test_drift_endpoint(api, trained_dir, payloads, monkeypatch):
+    monitor = StreamingDriftMonitor(ModelStore(str(trained_dir)).load_drift_reference, min_samples=1)
+    monkeypatch.setattr(api, "drift_monitor", monitor)
+    api.usecase = PredictResponseUseCase(FraudPredictor(str(trained_dir)), threshold=0.5, drift=monitor)
+    monitor.use_version(api.usecase.predictor.version)
+    client = TestClient(api.app)
+
+    assert client.post("/predict/batch", json=payloads[:20]).status_code == 200
+    report = client.get("/drift").json()
+    assert report["samples"] == 20 and set(report["features"]) == set(monitor.reference.features.names)
+    assert 'drift_psi{variable="probability"}' in client.get("/metrics").text
+    assert client.post("/drift/reset").json()["samples"] == 0
+
+    monkeypatch.setattr(api, "drift_monitor", None)
+    assert client.get("/drift").json() == {"enabled": False}
+    assert client.post("/drift/reset").status_code == 404
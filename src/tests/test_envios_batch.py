@@ -0,0 +1,131 @@
+import sys
+from datetime import timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tests.helpers import random_envios
+from src.domain.envios_batch import EnviosBatch
+from src.features.feature_engineering import FeatureEngineering
+from src.infra.models_store import ModelStore
+from src.infra.repository_postgres import EnviosRepository
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.usecases.train_model import TrainModelUseCase
+
+
+def test_row_views_match_entities():
+    generator = SyntheticDataGenerator(seed=3, n_clients=30)
+    frame = generator.envios_frame(400)
+    batch = EnviosBatch.from_frame(frame)
+    entities = generator.to_entities(frame)
+
+    assert len(batch) == 400
+    assert list(batch) == entities
+    assert batch[-1] == entities[-1]
+    assert batch.to_entities()[10:20] == list(batch[10:20])
+    with pytest.raises(IndexError):
+        batch[400]
+
+
+def test_columns_are_typed_and_categorical():
+    batch = EnviosBatch.from_entities(random_envios(300, n_clients=20))
+    assert batch.client_codes.dtype == np.int32 and len(batch.client_categories) <= 20
+    assert batch.status_codes.dtype == np.int16
+    assert set(batch.status_categories) <= {"approved", "alert", "declined"}
+    assert batch.sent_at.dtype == np.dtype("datetime64[us]")
+    assert np.isnat(batch.response_at).any()
+    assert batch.amount.dtype == np.float64
+    # Sin objetos de Python por fila
+    assert all(getattr(batch, name).dtype != object for name in EnviosBatch.ROW_COLUMNS)
+
+
+def test_features_match_entity_path():
+    envios = random_envios(500, n_clients=40)
+    pd.testing.assert_frame_equal(
+        FeatureEngineering.compute_features(EnviosBatch.from_entities(envios)),
+        FeatureEngineering.compute_features(envios),
+    )
+
+
+@pytest.mark.parametrize("tz", [ZoneInfo("Europe/Madrid"), timezone(timedelta(hours=-5))])
+def test_timezone_aware_dates_keep_local_hours(tz):
+    envios = random_envios(200, n_clients=15)
+    for envio in envios:
+        envio.sent_at = envio.sent_at.replace(tzinfo=tz)
+        envio.transaction.timestamp = envio.sent_at
+        if envio.response_at is not None:
+            envio.response_at = envio.response_at.replace(tzinfo=tz)
+    batch = EnviosBatch.from_entities(envios)
+    assert list(batch) == envios
+    pd.testing.assert_frame_equal(
+        FeatureEngineering.compute_features(batch), FeatureEngineering.compute_features(envios)
+    )
+
+
+def test_mixed_naive_and_aware_dates_are_rejected():
+    envios = random_envios(50, n_clients=5)
+    responded = next(e for e in envios if e.response_at is not None)
+    responded.response_at = responded.response_at.replace(tzinfo=timezone.utc)
+    with pytest.raises(ValueError, match="con y sin zona"):
+        EnviosBatch.from_entities(envios)
+
+    naive = EnviosBatch.from_entities(random_envios(20, n_clients=5))
+    aware_envios = random_envios(20, n_clients=5, seed=1)
+    for envio in aware_envios:
+        envio.sent_at = envio.sent_at.replace(tzinfo=timezone.utc)
+        envio.transaction.timestamp = envio.sent_at
+        envio.response_at = None
+    aware = EnviosBatch.from_entities(aware_envios)
+    assert str(aware.tz) == "UTC"
+    with pytest.raises(ValueError):
+        EnviosBatch.concat([naive, aware])
+    assert len(EnviosBatch.concat([EnviosBatch.empty(), aware])) == 20
+
+
+def test_concat_merges_categories():
+    envios = random_envios(300, n_clients=25)
+    parts = [EnviosBatch.from_entities(envios[:50]), EnviosBatch.from_entities(envios[50:])]
+    merged = EnviosBatch.concat(parts)
+    assert list(merged) == envios
+    assert len(merged.client_categories) == len(set(e.client_id for e in envios))
+    assert len(EnviosBatch.concat([])) == 0
+
+
+def test_envio_without_transaction():
+    envios = random_envios(20, n_clients=5)
+    envios[3].transaction = None
+    batch = EnviosBatch.from_entities(envios)
+    assert batch[3].transaction is None and batch.status[3] is None
+    pd.testing.assert_frame_equal(
+        FeatureEngineering.compute_features(batch), FeatureEngineering.compute_features(envios)
+    )
+
+
+def test_repository_batch_matches_entities(sqlite_engine):
+    repo = EnviosRepository(sqlite_engine)
+    batch = repo.fetch_batch(chunk_size=7)
+    entities = repo.fetch_as_entities()
+    assert len(batch) == len(entities) == 30
+    assert list(batch.client_id) == [e.client_id for e in entities]
+    assert list(batch.status) == [e.transaction.status for e in entities]
+    pd.testing.assert_frame_equal(
+        FeatureEngineering.compute_features(batch), FeatureEngineering.compute_features(entities)
+    )
+
+
+def test_train_accepts_batch(sqlite_engine, tmp_path):
+    batch = EnviosRepository(sqlite_engine).fetch_batch(chunk_size=8)
+    metrics = TrainModelUseCase(ModelStore(str(tmp_path)), n_estimators=10, test_size=0.3).execute(batch)
+    assert 0.0 <= metrics["roc_auc"] <= 1.0
+
+
+def test_batch_uses_less_memory_than_entities():
+    generator = SyntheticDataGenerator(seed=1, n_clients=200)
+    frame = generator.envios_frame(2_000)
+    batch = EnviosBatch.from_frame(frame)
+    # Lo mínimo de la lista: un EnviosCliente y un Transaccion por fila, cada uno con su __dict__
+    entity = generator.to_entities(frame.head(1))[0]
+    per_row = sum(sys.getsizeof(o) + sys.getsizeof(o.__dict__) for o in (entity, entity.transaction))
+    assert batch.nbytes < per_row * len(batch)
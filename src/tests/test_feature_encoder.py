@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.feature_encoder import FeatureEncoder
+from src.features.feature_engineering import FeatureEngineering
+from src.ml.inference import FraudPredictor
+
+MODEL_COLUMNS = [
+    "hour", "weekday", "total_sent_agg",
+    "response_rate", "mean_delay",
+    "unusual_response_rate", "unusual_mean_delay"
+]
+
+
+def pandas_path(payload, columns):
+    """Camino original de FraudPredictor.predict (referencia)."""
+    df = FeatureEngineering.compute_features_from_payload(payload)
+    X = df.reindex(columns=columns).fillna(0)
+    X = X.apply(pd.to_numeric, errors="coerce").fillna(0.0).astype(float)
+    return X.values
+
+
+EDGE_PAYLOADS = [
+    {"timestamp": "2025-01-01T15:00:00", "total_sent": 5, "response_rate": 0.7, "mean_delay": 60},
+    {"timestamp": "2025-08-25T10:00:00-05:00", "total_sent": 1, "response_rate": 0.1, "mean_delay": 1000},
+    {"timestamp": "2025-08-25 23:59:59", "total_sent": "3", "response_rate": 0.25, "mean_delay": 120.0},
+    {"timestamp": "Aug 25 2025 07:30", "total_sent": 2, "response_rate": 0.0, "mean_delay": 0},
+    {"sent_at": datetime(2025, 3, 9, 4, 5), "total_sent": 1, "response_rate": 1.0, "mean_delay": 120.5},
+    {"timestamp": "2025-08-25T10:00:00", "response_rate": float("nan"), "mean_delay": float("nan")},
+    {"timestamp": "2025-08-25T10:00:00", "response_rate": True, "mean_delay": 0, "status": "alert"},
+    {"timestamp": "2025-08-25T10:00:00"},
+]
+
+
+@pytest.mark.parametrize("payload", EDGE_PAYLOADS)
+@pytest.mark.parametrize("columns", [MODEL_COLUMNS, FeatureEngineering.COLUMNS, MODEL_COLUMNS + ["desconocida"]])
+def test_encode_matches_pandas_path(payload, columns):
+    encoder = FeatureEncoder(columns)
+    np.testing.assert_array_equal(encoder.encode(payload), pandas_path(payload, columns))
+
+
+def test_encode_batch_matches_pandas_path(payloads):
+    encoder = FeatureEncoder(MODEL_COLUMNS)
+    expected = np.vstack([pandas_path(p, MODEL_COLUMNS) for p in payloads])
+    np.testing.assert_array_equal(encoder.encode_batch(payloads), expected)
+
+
+def test_encode_reuses_row_buffer():
+    encoder = FeatureEncoder(MODEL_COLUMNS)
+    first = encoder.encode(EDGE_PAYLOADS[0])
+    second = encoder.encode(EDGE_PAYLOADS[1])
+    assert first is second
+    assert first.dtype == np.float64 and first.shape == (1, len(MODEL_COLUMNS))
+
+
+def test_predictor_fast_path_matches_pandas_path(model_dir, payloads):
+    fast = FraudPredictor(str(model_dir))
+    slow = FraudPredictor(str(model_dir), fast_features=False)
+    assert [fast.predict(p) for p in payloads] == [slow.predict(p) for p in payloads]
+    assert fast.predict_batch(payloads) == slow.predict_batch(payloads)
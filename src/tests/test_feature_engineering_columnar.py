@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.feature_engineering import FeatureEngineering
+from src.tests.helpers import random_envios
+
+
+def as_columns(envios):
+    return (
+        [e.client_id for e in envios],
+        [e.sent_at for e in envios],
+        [e.response_at for e in envios],
+        [e.transaction.status for e in envios],
+    )
+
+
+@pytest.mark.parametrize("n, n_clients", [(1, 1), (50, 3), (2000, 150)])
+def test_columnar_matches_row_by_row(n, n_clients):
+    envios = random_envios(n, n_clients, seed=n)
+    expected = FeatureEngineering.compute_features(envios)
+    out = FeatureEngineering.compute_features_columnar(*as_columns(envios))
+    pd.testing.assert_frame_equal(out, expected)
+
+
+def test_columnar_accepts_numpy_and_text_columns():
+    envios = random_envios(300, 20, seed=1)
+    client_id, sent_at, response_at, status = as_columns(envios)
+    expected = FeatureEngineering.compute_features(envios)
+
+    out = FeatureEngineering.compute_features_columnar(
+        np.array(client_id, dtype=object),
+        np.array(sent_at, dtype="datetime64[us]"),
+        np.array([np.datetime64(r, "us") if r else np.datetime64("NaT") for r in response_at]),
+        np.array(status, dtype=object),
+    )
+    pd.testing.assert_frame_equal(out, expected)
+
+    frame = pd.DataFrame({
+        "client_id": client_id,
+        "sent_at": [s.isoformat(sep=" ") for s in sent_at],
+        "response_at": [r.isoformat(sep=" ") if r else None for r in response_at],
+        "status": status,
+    }, index=np.arange(1000, 1300))
+    pd.testing.assert_frame_equal(FeatureEngineering.compute_features_from_frame(frame), expected)
+
+
+def test_columnar_empty_input():
+    out = FeatureEngineering.compute_features_columnar([], [], [], [])
+    assert out.empty
+    assert list(out.columns) == FeatureEngineering.COLUMNS
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.ml.flat_forest import FlatForest
+from src.ml.inference import FraudPredictor
+from src.infra.models_store import ModelStore
+from src.tests.helpers import FEATURE_COLUMNS, make_training_matrix
+
+
+def test_flat_forest_matches_sklearn_probabilities():
+    X, y = make_training_matrix(seed=1)
+    clf = RandomForestClassifier(n_estimators=30, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(clf)
+
+    X_new, _ = make_training_matrix(n_rows=500, seed=2)
+    np.testing.assert_allclose(flat.predict_proba(X_new), clf.predict_proba(X_new), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(flat.predict_proba(X_new[:1]), clf.predict_proba(X_new[:1]), rtol=0, atol=1e-12)
+
+
+def test_flat_forest_leaves_match_sklearn_apply():
+    X, y = make_training_matrix(seed=3)
+    clf = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(clf)
+    local_leaves = flat.apply(X) - flat.roots
+    np.testing.assert_array_equal(local_leaves, clf.apply(X))
+
+
+def test_flat_forest_rejects_non_tree_models():
+    X, y = make_training_matrix()
+    with pytest.raises(ValueError):
+        FlatForest.from_sklearn(LogisticRegression(max_iter=1000).fit(X, y))
+
+
+def test_predictor_flat_engine_matches_sklearn(model_dir, payloads):
+    sk = FraudPredictor(str(model_dir), engine="sklearn")
+    flat = FraudPredictor(str(model_dir), engine="flat")
+    assert flat.engine == "flat"
+    X = sk.encoder.encode_batch(payloads)
+    np.testing.assert_allclose(flat._predict_proba(X), sk._predict_proba(X), rtol=0, atol=1e-12)
+    assert flat.predict_batch(payloads) == sk.predict_batch(payloads)
+
+
+def test_predictor_flat_engine_falls_back_to_sklearn(tmp_path, payloads):
+    X, y = make_training_matrix()
+    ModelStore(str(tmp_path)).save_model(LogisticRegression(max_iter=1000).fit(X, y), FEATURE_COLUMNS)
+
+    predictor = FraudPredictor(str(tmp_path), engine="flat")
+    assert predictor.engine == "sklearn"
+    assert predictor.predict_batch(payloads) == FraudPredictor(str(tmp_path)).predict_batch(payloads)
+
+
+def test_predictor_rejects_unknown_engine(model_dir):
+    with pytest.raises(ValueError):
+        FraudPredictor(str(model_dir), engine="desconocido")
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pandas as pd
+
+from src.features.feature_engineering import FeatureEngineering
+from src.infra.models_store import ModelStore
+from src.infra.repository_postgres import EnviosRepository
+from src.infra.training_state import TrainingState, TrainingStateStore
+from src.usecases.train_model import TrainModelUseCase
+from src.tests.helpers import random_envios
+
+
+def as_frame(envios):
+    return pd.DataFrame({
+        "client_id": [e.client_id for e in envios],
+        "sent_at": [e.sent_at for e in envios],
+        "response_at": [e.response_at for e in envios],
+        "status": [e.transaction.status for e in envios],
+    })
+
+
+def test_incremental_merge_matches_full_recompute():
+    envios = sorted(random_envios(1200, 60, seed=11), key=lambda e: e.sent_at)
+    state = TrainingState()
+    for start in range(0, len(envios), 250):
+        state = TrainModelUseCase.merge_new_envios(state, as_frame(envios[start:start + 250]))
+
+    incremental = FeatureEngineering.features_from_aggregates(state.rows, state.aggregates)
+    full = FeatureEngineering.compute_features(envios)
+    pd.testing.assert_frame_equal(incremental, full, check_exact=False, rtol=1e-12)
+    assert state.watermark == pd.Timestamp(envios[-1].sent_at)
+
+
+def test_state_roundtrip(tmp_path):
+    envios = random_envios(300, 15, seed=3)
+    state = TrainModelUseCase.merge_new_envios(TrainingState(), as_frame(envios))
+    store = TrainingStateStore(str(tmp_path / "state"))
+    assert not store.exists()
+    store.save(state)
+
+    loaded = store.load()
+    assert loaded.watermark == state.watermark
+    pd.testing.assert_frame_equal(loaded.aggregates, state.aggregates)
+    pd.testing.assert_frame_equal(
+        FeatureEngineering.features_from_aggregates(loaded.rows, loaded.aggregates),
+        FeatureEngineering.features_from_aggregates(state.rows, state.aggregates),
+    )
+
+
+def next_run_features(state_store, envios_frame, max_rows=None):
+    """Matriz con la que entrenaría la próxima corrida: estado consolidado + envíos posteriores al watermark."""
+    stored = state_store.load()
+    sent_at = pd.to_datetime(envios_frame["sent_at"])
+    tail = envios_frame if stored.watermark is None else envios_frame[(sent_at > stored.watermark).to_numpy()]
+    return TrainModelUseCase._incremental_features(TrainModelUseCase.merge_new_envios(stored, tail), max_rows)
+
+
+def test_execute_incremental_reads_only_past_watermark(sqlite_engine, tmp_path):
+    repo = EnviosRepository(sqlite_engine)
+    state_store = TrainingStateStore(str(tmp_path / "state"))
+    trainer = TrainModelUseCase(ModelStore(str(tmp_path / "models")), n_estimators=10, test_size=0.3)
+
+    first = repo.fetch_frame(sent_to=datetime(2025, 9, 1))
+    m1 = trainer.execute_incremental(first, state_store)
+    assert m1["incremental"]["total_rows"] == len(first)
+
+    watermark = state_store.load().watermark
+    second = repo.fetch_frame(sent_after=watermark.to_pydatetime())
+    assert len(second) < 30
+    m2 = trainer.execute_incremental(second, state_store)
+    assert m2["incremental"]["new_rows"] == len(second)
+    assert m2["incremental"]["total_rows"] == 30
+
+    # Reconstrucción completa: misma matriz que el camino incremental
+    rebuilt = TrainModelUseCase.merge_new_envios(TrainingState(), repo.fetch_frame())
+    pd.testing.assert_frame_equal(
+        next_run_features(state_store, repo.fetch_frame()),
+        FeatureEngineering.features_from_aggregates(rebuilt.rows, rebuilt.aggregates),
+        check_exact=False, rtol=1e-12,
+    )
+    m3 = trainer.execute_incremental(repo.fetch_frame(), state_store, full_rebuild=True)
+    assert m3["incremental"]["total_rows"] == 30
+
+
+def test_late_responses_and_inserts_match_full_rebuild(tmp_path):
+    envios = sorted(random_envios(1500, 40, seed=21), key=lambda e: e.sent_at)
+    full = as_frame(envios)
+    cut = envios[1000].sent_at
+    # Primera lectura en `cut`: las respuestas de las últimas 6 horas todavía no
+    # se cargaron y algunos envíos recientes tampoco
+    first = full[full["sent_at"] <= cut].copy()
+    pending = (first["response_at"].notna() & (first["sent_at"] > cut - pd.Timedelta(hours=6))).to_numpy()
+    assert pending.sum() >= 3
+    first.loc[pending, "response_at"] = None
+    late_inserts = first.index[(first["sent_at"] > cut - pd.Timedelta(hours=10)).to_numpy()][:3]
+    assert len(late_inserts) == 3
+    first = first.drop(late_inserts)
+
+    state_store = TrainingStateStore(str(tmp_path / "state"))
+    trainer = TrainModelUseCase(ModelStore(str(tmp_path / "models")), n_estimators=5, test_size=0.3)
+    trainer.execute_incremental(first, state_store, lookback=pd.Timedelta(hours=12))
+    watermark = state_store.load().watermark
+    assert watermark <= pd.Timestamp(cut) - pd.Timedelta(hours=12)
+
+    # La segunda corrida relee desde el watermark consolidado, con las respuestas ya cargadas
+    trainer.execute_incremental(full[full["sent_at"] > watermark], state_store, lookback=pd.Timedelta(hours=12))
+    expected = FeatureEngineering.compute_features(envios)
+    pd.testing.assert_frame_equal(next_run_features(state_store, full), expected, check_exact=False, rtol=1e-12)
+
+
+def test_state_is_a_single_atomic_file(tmp_path):
+    store = TrainingStateStore(str(tmp_path / "state"))
+    store.save(TrainModelUseCase.merge_new_envios(TrainingState(), as_frame(random_envios(50, 5))))
+    assert [p.name for p in (tmp_path / "state").iterdir()] == [TrainingStateStore.STATE_FILE]
+
+
+def test_max_rows_bounds_training_matrix(tmp_path):
+    envios = sorted(random_envios(600, 20, seed=8), key=lambda e: e.sent_at)
+    state_store = TrainingStateStore(str(tmp_path / "state"))
+    trainer = TrainModelUseCase(ModelStore(str(tmp_path / "models")), n_estimators=5, test_size=0.3)
+    metrics = trainer.execute_incremental(as_frame(envios), state_store, max_rows=200)
+    assert metrics["incremental"]["total_rows"] == 200
+    stored = state_store.load()
+    assert len(stored.rows) <= 200 and stored.aggregates["total_sent"].sum() == metrics["incremental"]["settled_rows"]
+    # Las filas que quedan tienen las mismas features que en la matriz completa
+    pd.testing.assert_frame_equal(
+        next_run_features(state_store, as_frame(envios), max_rows=200),
+        FeatureEngineering.compute_features(envios).iloc[-200:].reset_index(drop=True),
+        check_exact=False, rtol=1e-12,
+    )
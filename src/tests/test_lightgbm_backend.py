@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.infra.models_store import ModelStore
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.ml.inference import FraudPredictor
+from src.ml.model_manager import PredictorManager
+from src.usecases.train_model import TrainModelUseCase
+
+pytest.importorskip("lightgbm")
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return SyntheticDataGenerator(fraud_ratio=0.3, seed=7).envios_frame(3_000)
+
+
+def test_lightgbm_training_records_backend(tmp_path, frame):
+    store = ModelStore(str(tmp_path))
+    metrics = TrainModelUseCase(store, n_estimators=20, backend="lightgbm").execute(frame)
+
+    assert metrics["backend"] == "lightgbm"
+    assert 0.0 <= metrics["roc_auc"] <= 1.0
+    assert store.load_backend(metrics["version"]) == "lightgbm"
+    # No es un bosque de sklearn: no se exportan arrays planos
+    assert not store.has_flat_model(metrics["version"])
+
+
+def test_lightgbm_predictor_uses_booster(tmp_path, frame, payloads):
+    store = ModelStore(str(tmp_path))
+    TrainModelUseCase(store, n_estimators=20, backend="lightgbm").execute(frame)
+
+    predictor = FraudPredictor(str(tmp_path))
+    assert predictor.backend == "lightgbm"
+    assert predictor._booster is not None
+
+    X = predictor.encoder.encode_batch(payloads[:50])
+    np.testing.assert_allclose(predictor._predict_proba(X), predictor.model.predict_proba(X))
+    assert predictor.predict_batch(payloads[:50]) == [predictor.predict(p) for p in payloads[:50]]
+
+    # El motor "flat" no aplica y se usa el Booster
+    flat = FraudPredictor(str(tmp_path), engine="flat")
+    assert flat.engine == "sklearn" and flat.backend == "lightgbm"
+    assert flat.predict_batch(payloads[:20]) == predictor.predict_batch(payloads[:20])
+
+
+def test_backends_share_split_and_status(tmp_path, frame):
+    store = ModelStore(str(tmp_path))
+    forest = TrainModelUseCase(store, n_estimators=10).execute(frame)
+    boosted = TrainModelUseCase(store, n_estimators=20, backend="lightgbm").execute(frame)
+    support = lambda m: m["classification_report"]["macro avg"]["support"]  # noqa: E731
+    assert support(forest) == support(boosted)
+
+    manager = PredictorManager(store, lambda version: FraudPredictor(str(tmp_path), version=version))
+    manager.load()
+    assert manager.status()["backend"] == "lightgbm"
+    assert FraudPredictor(str(tmp_path), version=forest["version"], engine="flat").backend == "random_forest"
+
+
+def test_warm_start_rejects_lightgbm(tmp_path, frame):
+    store = ModelStore(str(tmp_path))
+    trainer = TrainModelUseCase(store, n_estimators=10, backend="lightgbm")
+    trainer.execute(frame)
+    with pytest.raises(ValueError):
+        trainer.execute_warm_start(frame)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        TrainModelUseCase(ModelStore(), backend="xgboost")
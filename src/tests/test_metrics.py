@@ -0,0 +1,107 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from src.infra.metrics import (
+    FRAUD_DECISIONS, PREDICT_ERRORS, PREDICT_REQUESTS, PREDICT_STAGE_SECONDS, TRAIN_STAGE_SECONDS, MetricsRegistry,
+)
+from src.infra.models_store import ModelStore
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.usecases.train_model import TrainModelUseCase
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo", ("kind",))
+    histogram = registry.histogram("demo_seconds", "Demo", ("stage",), buckets=(0.1, 1.0))
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    histogram.observe(0.05, stage="x")
+    histogram.observe(0.5, stage="x")
+    histogram.observe(5.0, stage="x")
+
+    text = registry.render()
+    assert "# TYPE demo_total counter" in text
+    assert 'demo_total{kind="a"} 3' in text
+    assert 'demo_seconds_bucket{stage="x",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="x",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="x",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="x"} 3' in text
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    histogram = registry.histogram("off_seconds", "Off", ("stage",))
+    with histogram.time(stage="x"):
+        pass
+    counter = registry.counter("off_total", "Off")
+    counter.inc()
+    assert histogram.count(stage="x") == 0
+    assert counter.value() == 0
+
+
+def test_observation_overhead_is_small():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("fast_seconds", "Fast", ("stage", "mode"))
+    n = 20_000
+    started = time.perf_counter()
+    for _ in range(n):
+        with histogram.time(stage="model", mode="single"):
+            pass
+    per_call_us = (time.perf_counter() - started) / n * 1e6
+    assert histogram.count(stage="model", mode="single") == n
+    assert per_call_us < 20
+
+
+def test_predict_records_each_stage(api, payloads):
+    api.load_model()
+    client = TestClient(api.app)
+    before = {
+        stage: PREDICT_STAGE_SECONDS.count(stage=stage, mode="single")
+        for stage in ("validation", "features", "model", "flags", "decision")
+    }
+    decisions_before = FRAUD_DECISIONS.value(prediction="fraude") + FRAUD_DECISIONS.value(prediction="no_fraude")
+
+    assert client.post("/predict", json=payloads[0]).status_code == 200
+
+    for stage, count in before.items():
+        assert PREDICT_STAGE_SECONDS.count(stage=stage, mode="single") == count + 1, stage
+    decisions = FRAUD_DECISIONS.value(prediction="fraude") + FRAUD_DECISIONS.value(prediction="no_fraude")
+    assert decisions == decisions_before + 1
+
+    text = client.get("/metrics").text
+    assert 'predict_stage_seconds_count{stage="model",mode="single"}' in text
+    assert 'http_request_duration_seconds_count{method="POST",path="/predict",status="200"}' in text
+
+
+def test_micro_batched_predict_is_not_counted_as_batch(api, payloads):
+    before = {mode: PREDICT_REQUESTS.value(mode=mode) for mode in ("single", "micro_batch", "batch")}
+    with TestClient(api.app) as client:
+        assert api.batcher is not None and api.batcher.running
+        deadline = time.monotonic() + 10
+        while client.get("/readyz").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.post("/predict", json=payloads[0]).status_code == 200
+    assert PREDICT_REQUESTS.value(mode="micro_batch") == before["micro_batch"] + 1
+    assert PREDICT_REQUESTS.value(mode="batch") == before["batch"]
+    assert PREDICT_STAGE_SECONDS.count(stage="model", mode="micro_batch") > 0
+
+
+def test_invalid_predict_counts_validation_error(api, payloads):
+    client = TestClient(api.app)
+    errors_before = PREDICT_ERRORS.value(stage="validation")
+    bad = {**payloads[0], "amount": "no-es-numero"}
+    response = client.post("/predict", json=bad)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][-1] == "amount"
+    assert client.post("/predict", content=b"{no json").status_code == 422
+    assert PREDICT_ERRORS.value(stage="validation") == errors_before + 2
+
+
+def test_training_reports_stage_seconds(tmp_path):
+    frame = SyntheticDataGenerator(fraud_ratio=0.3, seed=5).envios_frame(2_000)
+    fit_before = TRAIN_STAGE_SECONDS.count(stage="fit")
+    metrics = TrainModelUseCase(ModelStore(str(tmp_path)), n_estimators=5).execute(frame)
+    assert set(metrics["stage_seconds"]) == {"features", "split", "fit", "evaluate", "persist"}
+    assert all(seconds >= 0 for seconds in metrics["stage_seconds"].values())
+    assert TRAIN_STAGE_SECONDS.count(stage="fit") == fit_before + 1
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from src.infra.micro_batcher import MicroBatcher
+from src.usecases.predict_response import PredictResponseUseCase
+from src.ml.inference import FraudPredictor
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_each_caller_gets_its_own_result():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [x * 10 for x in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_wait_ms=20, max_batch_size=8)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        await batcher.stop()
+        return batcher, results
+
+    batcher, results = run(scenario())
+    assert results == [i * 10 for i in range(20)]
+    # 20 items con lotes de máximo 8 -> al menos 3 lotes, ninguno mayor a 8
+    assert all(len(c) <= 8 for c in calls)
+    assert len(calls) == 3
+    stats = batcher.stats()
+    assert stats["items"] == 20 and stats["batches"] == 3
+    assert stats["full_batches"] == 2
+    assert stats["size_histogram"] == {4: 1, 8: 2}
+    assert 0 < stats["mean_fill_ratio"] <= 1
+
+
+def test_window_flushes_partial_batch():
+    async def scenario():
+        batcher = MicroBatcher(lambda items: items, max_wait_ms=1, max_batch_size=64)
+        await batcher.start()
+        result = await asyncio.wait_for(batcher.submit("x"), timeout=1)
+        await batcher.stop()
+        return batcher, result
+
+    batcher, result = run(scenario())
+    assert result == "x"
+    assert batcher.stats()["size_histogram"] == {1: 1}
+
+
+def test_errors_propagate_to_every_caller_of_the_batch():
+    def process(items):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_wait_ms=5, max_batch_size=4)
+        await batcher.start()
+        out = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        await batcher.stop()
+        return out
+
+    assert all(isinstance(r, RuntimeError) for r in run(scenario()))
+
+
+def test_short_result_fails_every_caller():
+    async def scenario():
+        batcher = MicroBatcher(lambda items: items[:-1], max_wait_ms=5, max_batch_size=4)
+        await batcher.start()
+        out = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), timeout=1
+        )
+        await batcher.stop()
+        return out
+
+    out = run(scenario())
+    assert all(isinstance(r, RuntimeError) and "2 resultados para 3 items" in str(r) for r in out)
+
+
+def test_submit_requires_start():
+    batcher = MicroBatcher(lambda items: items)
+    with pytest.raises(RuntimeError):
+        run(batcher.submit(1))
+
+
+def test_batched_usecase_matches_single_calls(model_dir, payloads):
+    use_case = PredictResponseUseCase(FraudPredictor(str(model_dir)), threshold=0.7)
+
+    async def scenario():
+        batcher = MicroBatcher(use_case.execute_batch, max_wait_ms=5, max_batch_size=16)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(p) for p in payloads))
+        await batcher.stop()
+        return results
+
+    assert run(scenario()) == [use_case.execute(p) for p in payloads]
@@ -0,0 +1,61 @@
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from src.infra.models_store import ModelStore
+from src.ml.inference import FraudPredictor
+from src.tests.helpers import FEATURE_COLUMNS, make_training_matrix
+
+
+def test_save_model_writes_flat_arrays(model_dir):
+    store = ModelStore(str(model_dir))
+    assert store.has_flat_model()
+    flat = store.load_flat_model()
+    assert isinstance(flat.threshold, np.memmap)
+    assert not flat.threshold.flags.writeable
+
+    X, _ = make_training_matrix(n_rows=100, seed=3)
+    np.testing.assert_array_equal(flat.predict_proba(X), store.load_model().predict_proba(X))
+
+
+def test_mmap_predictor_matches_sklearn_without_unpickling(model_dir, payloads):
+    mmap_predictor = FraudPredictor(str(model_dir), engine="flat")
+    assert mmap_predictor.engine == "flat" and mmap_predictor.mmap
+    # El pickle de sklearn no se deserializa hasta que alguien lo pida
+    assert mmap_predictor._model is None
+
+    reference = FraudPredictor(str(model_dir), engine="sklearn")
+    assert not reference.mmap
+    assert mmap_predictor.predict_batch(payloads) == reference.predict_batch(payloads)
+    assert mmap_predictor._model is None
+
+
+def test_mmap_disabled_builds_flat_in_memory(model_dir, payloads):
+    predictor = FraudPredictor(str(model_dir), engine="flat", mmap=False)
+    assert predictor.engine == "flat"
+    assert not predictor.mmap
+    assert predictor.predict(payloads[0])["probability"] >= 0
+
+
+def test_non_tree_model_has_no_flat_artifact(tmp_path):
+    X, y = make_training_matrix(seed=1)
+    store = ModelStore(str(tmp_path))
+    store.save_model(LogisticRegression(max_iter=1000).fit(X, y), FEATURE_COLUMNS)
+    assert not store.has_flat_model()
+    assert store.load_flat_model() is None
+    assert FraudPredictor(str(tmp_path), engine="flat").engine == "sklearn"
+
+
+def test_legacy_model_without_flat_falls_back(tmp_path, payloads):
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = make_training_matrix(seed=2)
+    joblib.dump(RandomForestClassifier(n_estimators=3, random_state=0).fit(X, y), tmp_path / "model.pkl")
+    joblib.dump(FEATURE_COLUMNS, tmp_path / "features.pkl")
+    predictor = FraudPredictor(str(tmp_path), engine="flat")
+    assert predictor.engine == "flat" and not predictor.mmap
+
+    # Exportar el formato plano habilita el mmap en la siguiente carga
+    store = ModelStore(str(tmp_path))
+    assert store.save_flat_model(store.load_model())
+    assert FraudPredictor(str(tmp_path), engine="flat").mmap
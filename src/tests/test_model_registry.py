@@ -0,0 +1,124 @@
+import time
+
+import joblib
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.infra.models_store import ModelStore
+from src.ml.inference import FraudPredictor
+from src.ml.model_manager import PredictorManager
+from src.tests.helpers import FEATURE_COLUMNS, make_training_matrix
+
+
+def train(seed):
+    X, y = make_training_matrix(seed=seed)
+    return RandomForestClassifier(n_estimators=5, random_state=seed).fit(X, y)
+
+
+def test_save_creates_versions_and_moves_pointer(tmp_path):
+    store = ModelStore(str(tmp_path))
+    assert store.current_version() is None
+    v1 = store.save_model(train(1), FEATURE_COLUMNS, metadata={"roc_auc": 0.9})
+    v2 = store.save_model(train(2), FEATURE_COLUMNS)
+
+    assert store.list_versions() == [v1, v2]
+    assert store.current_version() == v2
+    assert store.load_metadata(v1)["roc_auc"] == 0.9
+    assert store.load_features() == FEATURE_COLUMNS
+    assert (tmp_path / "versions" / v2 / "model.pkl").exists()
+
+
+def test_rollback_to_previous_and_explicit_version(tmp_path):
+    store = ModelStore(str(tmp_path))
+    v1 = store.save_model(train(1), FEATURE_COLUMNS)
+    v2 = store.save_model(train(2), FEATURE_COLUMNS)
+    v3 = store.save_model(train(3), FEATURE_COLUMNS)
+
+    assert store.rollback() == v2
+    assert store.current_version() == v2
+    assert store.rollback(to=v3) == v3
+    store.set_current(v1)
+    with pytest.raises(ValueError):
+        store.rollback()
+    with pytest.raises(ValueError):
+        store.set_current("no-existe")
+
+
+def test_rollback_from_legacy_has_no_previous_version(tmp_path):
+    joblib.dump(train(1), tmp_path / "model.pkl")
+    joblib.dump(FEATURE_COLUMNS, tmp_path / "features.pkl")
+    store = ModelStore(str(tmp_path))
+    v1 = store.save_model(train(2), FEATURE_COLUMNS)
+    store.current_path.unlink()
+    assert store.current_version() == ModelStore.LEGACY_VERSION
+
+    with pytest.raises(ValueError):
+        store.rollback()
+    assert store.current_version() == ModelStore.LEGACY_VERSION
+    assert store.rollback(to=v1) == v1
+
+
+def test_legacy_flat_layout_is_still_loaded(tmp_path, payloads):
+    joblib.dump(train(1), tmp_path / "model.pkl")
+    joblib.dump(FEATURE_COLUMNS, tmp_path / "features.pkl")
+    store = ModelStore(str(tmp_path))
+    assert store.current_version() == ModelStore.LEGACY_VERSION
+    predictor = FraudPredictor(str(tmp_path))
+    assert predictor.version == ModelStore.LEGACY_VERSION
+    assert predictor.predict(payloads[0])["probability"] >= 0
+
+
+def test_manager_hot_swaps_without_blocking(tmp_path, payloads):
+    store = ModelStore(str(tmp_path))
+    v1 = store.save_model(train(1), FEATURE_COLUMNS)
+    manager = PredictorManager(store, lambda version: FraudPredictor(str(tmp_path), version=version))
+    seen = []
+    manager.on_swap(seen.append)
+    manager.load()
+    assert manager.predictor.version == v1
+
+    assert manager.check_for_update() is False
+    v2 = store.save_model(train(2), FEATURE_COLUMNS)
+    old = manager.predictor
+    assert manager.check_for_update() is True
+    assert manager.predictor.version == v2
+    assert [p.version for p in seen] == [v1, v2]
+    # El predictor anterior sigue siendo utilizable por requests en curso
+    assert old.predict(payloads[0])["probability"] >= 0
+
+    store.rollback()
+    manager.check_for_update()
+    status = manager.status()
+    assert status["version"] == v1 and status["current_pointer"] == v1
+    assert status["load_seconds"] is not None
+
+
+def test_manager_keeps_previous_predictor_on_broken_version(tmp_path):
+    store = ModelStore(str(tmp_path))
+    v1 = store.save_model(train(1), FEATURE_COLUMNS)
+    manager = PredictorManager(store, lambda version: FraudPredictor(str(tmp_path), version=version))
+    manager.load()
+    v2 = store.save_model(train(2), FEATURE_COLUMNS)
+    (tmp_path / "versions" / v2 / "model.pkl").write_bytes(b"corrupto")
+
+    assert manager.check_for_update() is False
+    assert manager.predictor.version == v1
+    assert manager.last_error is not None
+
+
+def test_manager_background_polling(tmp_path):
+    store = ModelStore(str(tmp_path))
+    store.save_model(train(1), FEATURE_COLUMNS)
+    manager = PredictorManager(
+        store, lambda version: FraudPredictor(str(tmp_path), version=version), poll_interval_s=0.01
+    )
+    manager.load()
+    manager.start()
+    try:
+        v2 = store.save_model(train(2), FEATURE_COLUMNS)
+        deadline = time.time() + 5
+        while manager.predictor.version != v2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert manager.predictor.version == v2
+    finally:
+        manager.stop()
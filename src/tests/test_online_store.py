@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.feature_engineering import FeatureEngineering
+from src.features.online_store import ClientFeatureStore
+from src.ml.inference import FraudPredictor
+from src.usecases.predict_response import PredictResponseUseCase
+from src.tests.helpers import random_envios
+
+
+def test_online_aggregates_match_compute_features():
+    envios = random_envios(1500, 40, seed=5)
+    store = ClientFeatureStore(max_clients=None)
+    store.record_envios(envios)
+
+    offline = FeatureEngineering.compute_features(envios)
+    offline["client_id"] = [e.client_id for e in envios]
+    offline = offline.drop_duplicates("client_id").set_index("client_id")
+
+    assert len(store) == len(offline)
+    for client_id, row in offline.iterrows():
+        state = store.lookup(client_id)
+        assert state.total_sent == row["total_sent_agg"]
+        assert state.response_rate == pytest.approx(row["response_rate"], rel=1e-12)
+        assert state.mean_delay == pytest.approx(row["mean_delay"], rel=1e-9)
+
+
+def test_events_update_in_order():
+    store = ClientFeatureStore()
+    store.record_send("c1")
+    store.record_send("c1")
+    store.record_response("c1", 30.0)
+    state = store.lookup("c1")
+    assert (state.total_sent, state.responded) == (2, 1)
+    assert state.response_rate == 0.5
+    assert state.mean_delay == 15.0
+    assert store.lookup("desconocido") is None
+
+
+def test_lru_eviction_bounds_memory():
+    store = ClientFeatureStore(max_clients=3)
+    for cid in ["a", "b", "c"]:
+        store.record_send(cid)
+    store.lookup("a")          # "a" pasa a ser el más reciente
+    store.record_send("d")     # desaloja "b"
+    assert len(store) == 3
+    assert "b" not in store and "a" in store
+    assert store.stats()["evictions"] == 1
+
+
+def test_snapshot_and_restore(tmp_path):
+    path = tmp_path / "store.json"
+    store = ClientFeatureStore(snapshot_path=str(path))
+    store.record_envios(random_envios(200, 10, seed=2))
+    store.snapshot()
+
+    restored = ClientFeatureStore(snapshot_path=str(path))
+    assert restored.restore()
+    assert len(restored) == len(store)
+    for cid in list(store._clients):
+        assert restored.lookup(cid) == store.lookup(cid)
+    assert not ClientFeatureStore(snapshot_path=str(tmp_path / "no_existe.json")).restore()
+
+
+def test_periodic_snapshot(tmp_path):
+    path = tmp_path / "store.json"
+    store = ClientFeatureStore(snapshot_path=str(path), snapshot_interval_s=0.0)
+    store.record_send("c1")
+    assert path.exists()
+
+
+def test_predictor_uses_store_aggregates(model_dir, payloads):
+    store = ClientFeatureStore()
+    payload = dict(payloads[0], total_sent=1, response_rate=1.0, mean_delay=0.0)
+    for _ in range(4):
+        store.record_send(payload["client_id"])
+    store.record_response(payload["client_id"], 900.0)
+
+    with_store = FraudPredictor(str(model_dir), feature_store=store)
+    plain = FraudPredictor(str(model_dir))
+    expected = plain.predict(dict(payload, total_sent=4, response_rate=0.25, mean_delay=225.0))
+    assert with_store.predict(payload) == expected
+    assert with_store.predict_batch([payload]) == [expected]
+    # Clientes desconocidos usan los valores del payload
+    other = dict(payload, client_id="sin_historial")
+    assert with_store.predict(other) == plain.predict(other)
+
+
+def test_usecase_flags_use_store_aggregates(model_dir, payloads):
+    # El cliente envía valores "limpios" pero el store sabe que responde poco y tarde
+    store = ClientFeatureStore()
+    payload = dict(payloads[0], response_rate=1.0, mean_delay=0.0)
+    for _ in range(8):
+        store.record_send(payload["client_id"])
+    store.record_response(payload["client_id"], 2_000.0)
+    audit = []
+    usecase = PredictResponseUseCase(
+        FraudPredictor(str(model_dir), feature_store=store), threshold=0.99, audit=SimpleNamespace(record=audit.extend)
+    )
+
+    result = usecase.execute(dict(payload))
+    assert result["behavior_flags"] == {"unusual_response_rate": True, "unusual_mean_delay": True}
+    assert result["prediction"] == "fraude"
+    assert usecase.execute_batch([dict(payload)]) == [result]
+    columns = {name: np.array([value]) for name, value in payload.items()}
+    assert PredictResponseUseCase.rows_from_columns(usecase.execute_columns(columns)) == [result]
+    assert {record["payload"]["response_rate"] for record in audit} == {0.125}
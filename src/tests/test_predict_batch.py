@@ -0,0 +1,35 @@
+import pytest
+from src.domain.services import PredictorService
+from src.ml.inference import FraudPredictor
+from src.usecases.predict_response import PredictResponseUseCase
+
+
+class FixedProbabilityPredictor(PredictorService):
+    """Devuelve una probabilidad derivada del payload, sin modelo."""
+
+    def predict(self, payload):
+        return {"prediction": "no_fraude", "probability": round(payload["amount"] / 500000, 2)}
+
+
+def test_predictor_batch_matches_single_calls(model_dir, payloads):
+    predictor = FraudPredictor(str(model_dir))
+    batch = predictor.predict_batch(payloads)
+    assert batch == [predictor.predict(p) for p in payloads]
+
+
+def test_predictor_batch_empty(model_dir):
+    assert FraudPredictor(str(model_dir)).predict_batch([]) == []
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.7])
+def test_usecase_batch_matches_single_calls(payloads, threshold):
+    use_case = PredictResponseUseCase(FixedProbabilityPredictor(), threshold=threshold)
+    batch = use_case.execute_batch(payloads)
+    assert batch == [use_case.execute(p) for p in payloads]
+    # Flags como bool nativo (serializable a JSON)
+    assert all(type(r["behavior_flags"]["unusual_mean_delay"]) is bool for r in batch)
+
+
+def test_usecase_batch_with_real_model(model_dir, payloads):
+    use_case = PredictResponseUseCase(FraudPredictor(str(model_dir)), threshold=0.7)
+    assert use_case.execute_batch(payloads) == [use_case.execute(p) for p in payloads]
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from src.infra.models_store import ModelStore
+from src.ml.inference import FraudPredictor
+from src.ml.model_manager import PredictorManager
+from src.ml.prediction_cache import PredictionCache, parse_quantization
+
+
+def test_cached_results_match_uncached(model_dir, payloads):
+    cache = PredictionCache(max_size=1_000)
+    cached = FraudPredictor(str(model_dir), cache=cache)
+    plain = FraudPredictor(str(model_dir))
+
+    repeated = payloads + payloads
+    assert cached.predict_batch(repeated) == plain.predict_batch(repeated)
+    assert [cached.predict(p) for p in payloads[:5]] == [plain.predict(p) for p in payloads[:5]]
+    stats = cache.stats()
+    assert stats["hits"] == 5
+    assert stats["misses"] == len(repeated)
+    # Los vectores repetidos del lote se evalúan y se guardan una sola vez
+    assert stats["size"] <= len(payloads)
+
+
+def test_quantization_matches_bypass(model_dir, payloads):
+    quantization = parse_quantization("response_rate=0.1, mean_delay=10")
+    cache = PredictionCache(quantization=quantization)
+    bypass = PredictionCache(quantization=quantization, bypass=True)
+    cached = FraudPredictor(str(model_dir), cache=cache)
+    reference = FraudPredictor(str(model_dir), cache=bypass)
+
+    # Payloads que solo difieren dentro del mismo paso comparten entrada
+    base = dict(payloads[0], response_rate=0.42, mean_delay=31.0)
+    near = dict(base, response_rate=0.41, mean_delay=29.0)
+    assert cached.predict(base) == reference.predict(base)
+    assert cached.predict(near) == reference.predict(near)
+    assert cache.hits == 1
+    assert cached.predict_batch(payloads) == reference.predict_batch(payloads)
+    assert len(bypass) == 0 and bypass.hits == 0
+
+
+def test_lru_bound_and_ttl(model_dir, payloads):
+    cache = PredictionCache(max_size=5)
+    predictor = FraudPredictor(str(model_dir), cache=cache)
+    predictor.predict_batch(payloads[:20])
+    assert len(cache) == 5
+    assert cache.evictions > 0
+
+    short = PredictionCache(ttl_s=0.01)
+    predictor = FraudPredictor(str(model_dir), cache=short)
+    predictor.predict(payloads[0])
+    time.sleep(0.02)
+    predictor.predict(payloads[0])
+    assert short.expirations == 1 and short.hits == 0
+
+
+def test_model_swap_never_serves_old_entries(model_dir, payloads):
+    cache = PredictionCache()
+    manager = PredictorManager(
+        ModelStore(str(model_dir)), lambda version: FraudPredictor(str(model_dir), version=version, cache=cache)
+    )
+    manager.on_swap(lambda predictor: cache.clear())
+    first = manager.load()
+    first.predict(payloads[0])
+    assert len(cache) > 0
+
+    second = manager.load()
+    assert len(cache) == 0
+    # Aunque el predictor anterior siga escribiendo, sus claves no se comparten
+    first.predict(payloads[1])
+    hits_before = cache.hits
+    second.predict(payloads[1])
+    assert cache.hits == hits_before
+
+
+def test_parse_quantization():
+    assert parse_quantization("") == {}
+    assert parse_quantization("mean_delay=5") == {"mean_delay": 5.0}
+    with pytest.raises(ValueError):
+        parse_quantization("mean_delay=0")
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pandas as pd
+
+from src.features.feature_engineering import FeatureEngineering
+from src.infra.models_store import ModelStore
+from src.infra.repository_postgres import EnviosRepository
+from src.usecases.train_model import TrainModelUseCase
+
+
+def test_fetch_as_entities_reads_all_rows(sqlite_engine):
+    entities = EnviosRepository(sqlite_engine).fetch_as_entities()
+    assert len(entities) == 30
+    first = entities[0]
+    assert first.client_id == "201"
+    assert first.transaction.status == "approved"
+    # Envíos sin transacción asociada quedan como "approved"
+    assert {e.transaction.status for e in entities if e.client_id == "208"} == {"approved"}
+
+
+def test_iter_entities_yields_bounded_chunks(sqlite_engine):
+    repo = EnviosRepository(sqlite_engine)
+    chunks = list(repo.iter_entities(chunk_size=7))
+    assert [len(c) for c in chunks] == [7, 7, 7, 7, 2]
+    flat = [e for chunk in chunks for e in chunk]
+    assert flat == repo.fetch_as_entities()
+
+
+def test_sent_at_range_filter(sqlite_engine):
+    repo = EnviosRepository(sqlite_engine)
+    entities = repo.fetch_as_entities(sent_from=datetime(2025, 9, 1), sent_to=datetime(2025, 9, 10))
+    sent = [str(e.sent_at) for e in entities]
+    assert len(sent) == 9
+    assert all("2025-09-01" <= s < "2025-09-10" for s in sent)
+
+
+def test_iter_frames_matches_entities(sqlite_engine):
+    repo = EnviosRepository(sqlite_engine)
+    frames = list(repo.iter_frames(chunk_size=8))
+    assert [len(f) for f in frames] == [8, 8, 8, 6]
+    frame = repo.fetch_frame(chunk_size=8)
+    entities = repo.fetch_as_entities()
+    assert list(frame["client_id"]) == [e.client_id for e in entities]
+    assert list(frame["status"]) == [e.transaction.status for e in entities]
+
+
+def test_columnar_features_match_entity_features(sqlite_engine):
+    repo = EnviosRepository(sqlite_engine)
+    from_entities = FeatureEngineering.compute_features(repo.fetch_as_entities())
+    from_frame = FeatureEngineering.compute_features_from_frame(repo.fetch_frame(chunk_size=8))
+    pd.testing.assert_frame_equal(from_frame, from_entities)
+
+
+def test_fetch_frame_empty_range(sqlite_engine):
+    frame = EnviosRepository(sqlite_engine).fetch_frame(sent_from=datetime(2030, 1, 1))
+    assert frame.empty
+    assert list(frame.columns) == EnviosRepository.ENVIOS_COLUMNS
+
+
+def test_train_accepts_columnar_frame(sqlite_engine, tmp_path):
+    repo = EnviosRepository(sqlite_engine)
+    trainer = TrainModelUseCase(ModelStore(str(tmp_path)), n_estimators=10, test_size=0.3)
+    metrics = trainer.execute(repo.fetch_frame(chunk_size=8))
+    assert 0.0 <= metrics["roc_auc"] <= 1.0
+    store = ModelStore(str(tmp_path))
+    assert (store.version_dir() / "model.pkl").exists()
+
+
+def test_sent_after_is_exclusive(sqlite_engine):
+    repo = EnviosRepository(sqlite_engine)
+    frame = repo.fetch_frame(sent_after=datetime(2025, 9, 18, 13, 55))
+    assert list(frame["sent_at"]) == ["2025-09-19 15:15:00"]
@@ -0,0 +1,233 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from src.tests.helpers import random_envios
+from src.domain.entities import EnviosCliente
+from src.domain.envios_batch import EnviosBatch
+from src.features.feature_encoder import FeatureEncoder
+from src.features.feature_engineering import FeatureEngineering
+from src.features.rolling import WINDOWS, RollingFeatureStore, to_micros, window_columns, window_values
+from src.infra import columnar
+from src.infra.models_store import ModelStore
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.ml.inference import FraudPredictor
+from src.usecases.predict_response import PredictResponseUseCase
+from src.usecases.train_model import TrainModelUseCase
+
+
+def brute_force(envios, i):
+    """Definición directa (O(n) por fila): eventos del cliente en [sent_at - ventana, sent_at)."""
+    target = envios[i]
+    t = to_micros(target.sent_at)
+    same = [e for e in envios if e.client_id == target.client_id]
+    out = {}
+    for suffix, seconds in WINDOWS:
+        start = t - seconds * 1_000_000
+        sent = sum(start <= to_micros(e.sent_at) < t for e in same)
+        delays = [
+            to_micros(e.response_at) - to_micros(e.sent_at)
+            for e in same if e.response_at and start <= to_micros(e.response_at) < t
+        ]
+        values = window_values(sent, len(delays), sum(delays))
+        out.update(zip((f"sent_{suffix}", f"response_rate_{suffix}", f"mean_delay_{suffix}"), values))
+    return out
+
+
+def dense_envios(n=800, n_clients=6, seed=0):
+    """Envíos concentrados en 10 días para que las ventanas de 1h tengan eventos."""
+    envios = random_envios(n, n_clients, seed=seed)
+    base = datetime(2025, 8, 1)
+    for e in envios:
+        shift = (e.sent_at - base) / 6
+        delay = e.response_at - e.sent_at if e.response_at else None
+        e.sent_at = base + shift
+        e.response_at = e.sent_at + delay if delay is not None else None
+    return envios
+
+
+def replay(store, envios):
+    """Alimenta el store con envíos y respuestas en orden temporal y devuelve las features de cada envío."""
+    events = []
+    for i, e in enumerate(envios):
+        events.append((to_micros(e.sent_at), 0, i))
+        if e.response_at:
+            events.append((to_micros(e.response_at), 1, i))
+    features = [None] * len(envios)
+    for _, kind, i in sorted(events):
+        e = envios[i]
+        if kind == 0:
+            features[i] = store.features(e.client_id, e.sent_at)
+            store.record_send(e.client_id, e.sent_at)
+        else:
+            store.record_response(e.client_id, (e.response_at - e.sent_at).total_seconds(), e.response_at)
+    return features
+
+
+def test_matches_brute_force():
+    envios = dense_envios()
+    features = FeatureEngineering.point_in_time_features(envios)
+    assert list(features.columns) == window_columns()
+    assert features["sent_1h"].sum() > 0
+    for i in range(0, len(envios), 7):
+        assert features.iloc[i].to_dict() == brute_force(envios, i)
+
+
+def test_window_bounds_and_no_future_information():
+    t0 = datetime(2025, 8, 1, 12, 0)
+    envios = [
+        EnviosCliente("a", "c1", t0 - timedelta(hours=1), t0 - timedelta(minutes=30)),   # borde: entra en 1h
+        EnviosCliente("b", "c1", t0 - timedelta(minutes=10), t0 + timedelta(minutes=5)),  # responde después de t0
+        EnviosCliente("c", "c1", t0, None),                                               # la fila evaluada
+        EnviosCliente("d", "c1", t0, None),                                               # simultáneo: no cuenta
+        EnviosCliente("e", "c2", t0 - timedelta(minutes=5), t0 - timedelta(minutes=1)),   # otro cliente
+    ]
+    row = FeatureEngineering.point_in_time_features(envios).iloc[2]
+    assert row["sent_1h"] == 2
+    assert row["response_rate_1h"] == 0.5
+    assert row["mean_delay_1h"] == 1800.0
+
+    # Agregar envíos posteriores no cambia las features de las filas anteriores
+    later = envios + [EnviosCliente("f", "c1", t0 + timedelta(minutes=1), t0 + timedelta(minutes=2))]
+    pd.testing.assert_frame_equal(
+        FeatureEngineering.point_in_time_features(later).iloc[:5], FeatureEngineering.point_in_time_features(envios)
+    )
+
+
+def test_online_store_matches_offline():
+    envios = dense_envios(seed=3)
+    offline = FeatureEngineering.point_in_time_features(envios)
+    online = replay(RollingFeatureStore(max_clients=None), envios)
+    assert pd.DataFrame(online, columns=window_columns()).equals(offline.astype({c: float for c in offline}))
+
+
+def test_online_store_prunes_old_events():
+    store = RollingFeatureStore(max_clients=None)
+    replay(store, random_envios(3000, 2, seed=4))  # 60 días de historial
+    # Solo sobreviven los eventos de la ventana mayor (7d) respecto del más reciente de cada cliente
+    assert store.stats()["events"] < 3000 * 0.3
+
+
+def test_out_of_order_events():
+    t0 = datetime(2025, 8, 1, 12, 0)
+    store = RollingFeatureStore(max_clients=None)
+    store.record_send("c1", t0 - timedelta(minutes=5))
+    store.record_send("c1", t0 - timedelta(minutes=50))
+    store.record_response("c1", 60.0, t0 - timedelta(minutes=4))
+    store.record_response("c1", 300.0, t0 - timedelta(minutes=45))
+    features = store.features("c1", t0)
+    assert (features["sent_1h"], features["response_rate_1h"], features["mean_delay_1h"]) == (2, 1.0, 180.0)
+    assert store.features("c1", t0 - timedelta(minutes=20))["sent_1h"] == 1
+    assert store.features("desconocido", t0) == dict.fromkeys(window_columns(), 0.0)
+
+
+def test_timezone_aware_dates_use_the_instant():
+    envios = dense_envios(n=300, seed=5)
+    naive = FeatureEngineering.point_in_time_features(envios)
+    tz = timezone(timedelta(hours=-3))
+    for e in envios:
+        e.sent_at = e.sent_at.replace(tzinfo=timezone.utc).astimezone(tz)
+        if e.response_at:
+            e.response_at = e.response_at.replace(tzinfo=timezone.utc).astimezone(tz)
+    pd.testing.assert_frame_equal(FeatureEngineering.point_in_time_features(envios), naive)
+
+
+def test_batch_and_frame_match_entities():
+    frame = SyntheticDataGenerator(seed=2, n_clients=25).envios_frame(600)
+    entities = SyntheticDataGenerator.to_entities(frame)
+    expected = FeatureEngineering.point_in_time_features(entities)
+    pd.testing.assert_frame_equal(FeatureEngineering.point_in_time_features(frame), expected)
+    pd.testing.assert_frame_equal(FeatureEngineering.point_in_time_features(EnviosBatch.from_frame(frame)), expected)
+
+
+def test_encoder_reads_window_columns():
+    columns = TrainModelUseCase.FEATURE_COLUMNS + window_columns()
+    encoder = FeatureEncoder(columns)
+    store = RollingFeatureStore()
+    store.record_send("c1", datetime(2025, 8, 1, 9, 0))
+    store.record_response("c1", 120.0, datetime(2025, 8, 1, 9, 2))
+    payloads = [store.enrich({"client_id": c, "timestamp": "2025-08-01T10:00:00"}) for c in ("c1", "c2")]
+    X = encoder.encode_batch(payloads)
+    assert X[0, columns.index("sent_24h")] == 1 and X[0, columns.index("mean_delay_24h")] == 120.0
+    assert not X[1, len(TrainModelUseCase.FEATURE_COLUMNS):].any()
+    batch_columns = {"client_id": np.array(["c1", "c2"]), "timestamp": np.array(["2025-08-01T10:00:00"] * 2)}
+    np.testing.assert_array_equal(encoder.encode_columns(store.enrich_columns(batch_columns), 2), X)
+
+
+def test_train_and_predict_with_point_in_time_features(tmp_path):
+    frame = SyntheticDataGenerator(seed=8, n_clients=60, fraud_ratio=0.2).envios_frame(1_500)
+    trainer = TrainModelUseCase(ModelStore(str(tmp_path)), n_estimators=10, test_size=0.3, point_in_time=True)
+    metrics = trainer.execute(frame)
+    assert ModelStore(str(tmp_path)).load_features(metrics["version"]) == trainer.feature_columns
+    with pytest.raises(ValueError):
+        trainer.execute_warm_start(frame)
+
+    store = RollingFeatureStore()
+    store.record_envios(SyntheticDataGenerator.to_entities(frame))
+    predictor = FraudPredictor(str(tmp_path), rolling_store=store)
+    assert predictor.rolling_store is store
+    client_id = str(frame["client_id"].iloc[0])
+    payload = {"client_id": client_id, "timestamp": "2025-07-01T12:00:00", "total_sent": 3,
+               "response_rate": 0.5, "mean_delay": 60.0}
+    assert predictor.predict(payload) == predictor.predict_batch([payload])[0]
+    assert predictor.predict_columns({k: np.array([v]) for k, v in payload.items()})[0] == \
+        predictor.predict(payload)["probability"]
+
+
+@pytest.fixture(scope="module")
+def point_in_time_model_dir(tmp_path_factory):
+    """Modelo entrenado con point_in_time=True (usa las columnas por ventana)."""
+    base_dir = tmp_path_factory.mktemp("pit_models")
+    frame = SyntheticDataGenerator(seed=8, n_clients=60, fraud_ratio=0.2).envios_frame(1_500)
+    TrainModelUseCase(ModelStore(str(base_dir)), n_estimators=10, test_size=0.3, point_in_time=True).execute(frame)
+    return base_dir
+
+
+def test_offset_timestamps_match_across_endpoints(api, point_in_time_model_dir, payloads):
+    # 12:00+02:00 es 10:00 UTC: el envío de las 09:30 (UTC, sin zona) cae en la ventana de 1h
+    store = RollingFeatureStore()
+    store.record_send("201", datetime(2025, 8, 1, 9, 30))
+    store.record_response("201", 60.0, datetime(2025, 8, 1, 9, 31))
+    audit = []
+    api.usecase = PredictResponseUseCase(
+        FraudPredictor(str(point_in_time_model_dir), rolling_store=store),
+        threshold=0.5,
+        audit=SimpleNamespace(record=audit.extend),
+    )
+    client = TestClient(api.app)
+    payload = {**payloads[1], "client_id": "201", "timestamp": "2025-08-01T12:00:00+02:00"}
+
+    assert client.post("/predict/batch", json=[payload]).status_code == 200
+    body = columnar.encode({k: np.array([v]) for k, v in payload.items()}, columnar.NPZ_CONTENT_TYPE)
+    npz = client.post("/predict/columnar", content=body, headers={"Content-Type": columnar.NPZ_CONTENT_TYPE})
+    assert npz.status_code == 200
+    arrow_columns = {k: pa.array([v]) for k, v in payload.items() if k != "timestamp"}
+    arrow_columns["timestamp"] = pa.array([datetime(2025, 8, 1, 10, tzinfo=timezone.utc)], pa.timestamp("us", "+02:00"))
+    sink = pa.BufferOutputStream()
+    table = pa.table(arrow_columns)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    arrow = client.post(
+        "/predict/columnar", content=sink.getvalue().to_pybytes(),
+        headers={"Content-Type": columnar.ARROW_CONTENT_TYPE},
+    )
+    assert arrow.status_code == 200
+
+    windows = [{name: record["payload"][name] for name in window_columns()} for record in audit]
+    assert len(windows) == 3 and windows[0] == windows[1] == windows[2]
+    assert windows[0]["sent_1h"] == 1 and windows[0]["mean_delay_1h"] == 60.0
+    # hour sigue siendo la hora local del texto en los dos caminos
+    assert [record["payload"]["timestamp"] for record in audit][1:] == [datetime(2025, 8, 1, 12)] * 2
+
+
+def test_enrich_columns_reads_datetime64_columns():
+    store = RollingFeatureStore()
+    store.record_send("c1", datetime(2025, 8, 1, 9, 0))
+    columns = {"client_id": np.array(["c1"]), "timestamp": np.array(["2025-08-01T09:30"], dtype="datetime64[s]")}
+    assert store.enrich_columns(columns)["sent_1h"] == [1]
+    assert store.enrich_columns(columns)["sent_1h"] == [store.features("c1", datetime(2025, 8, 1, 9, 30))["sent_1h"]]
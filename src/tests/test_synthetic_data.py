@@ -0,0 +1,66 @@
+import pandas as pd
+from sqlalchemy import text
+
+from src.features.feature_engineering import FeatureEngineering
+from src.infra.repository_postgres import EnviosRepository
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.usecases.schemas import PredictRequestDTO
+from scripts.benchmark import compare
+
+
+def test_same_seed_same_rows():
+    a_trx, a_env = SyntheticDataGenerator(seed=3).generate(500)
+    b_trx, b_env = SyntheticDataGenerator(seed=3).generate(500)
+    pd.testing.assert_frame_equal(a_trx, b_trx)
+    pd.testing.assert_frame_equal(a_env, b_env)
+    c_trx, _ = SyntheticDataGenerator(seed=4).generate(500)
+    assert not a_trx["amount"].equals(c_trx["amount"])
+
+
+def test_fraud_ratio_is_respected():
+    transacciones, envios = SyntheticDataGenerator(fraud_ratio=0.25).generate(20_000)
+    ratio = transacciones["status"].isin(["alert", "declined"]).mean()
+    assert abs(ratio - 0.25) < 0.02
+    assert (envios["transaction_id"] == transacciones["transaction_id"]).all()
+    assert (envios["response_class"] == "no_answer").eq(envios["response_at"].isna()).all()
+
+
+def test_rows_load_into_schema_and_repository(sqlite_engine):
+    # SQLite guarda las fechas como texto: sin los datos de ejemplo de
+    # schema.sql todas quedan con el mismo formato
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("DELETE FROM envios_cliente"))
+        conn.execute(text("DELETE FROM transacciones"))
+    generator = SyntheticDataGenerator(fraud_ratio=0.2, seed=1)
+    assert generator.load_into(sqlite_engine, 2_500, chunk_size=1_000) == 2_500
+
+    frame = EnviosRepository(sqlite_engine).fetch_frame()
+    assert len(frame) == 2_500
+    features = FeatureEngineering.compute_features_from_frame(frame)
+    assert features["status"].isin(["alert", "declined"]).sum() > 0
+
+
+def test_frame_and_entities_give_same_features():
+    generator = SyntheticDataGenerator(seed=2)
+    frame = generator.envios_frame(800)
+    pd.testing.assert_frame_equal(
+        FeatureEngineering.compute_features_from_frame(frame),
+        FeatureEngineering.compute_features(generator.to_entities(frame)),
+    )
+
+
+def test_payloads_are_valid_requests():
+    for payload in SyntheticDataGenerator().payloads(20):
+        PredictRequestDTO(**payload)
+
+
+def test_compare_flags_only_regressions():
+    baseline = {"results": {"predict": {"p50_ms": 1.0, "rows_per_s": 1000.0}, "train": {"wall_s": 10.0}}}
+    better = {"results": {"predict": {"p50_ms": 0.5, "rows_per_s": 2000.0}, "train": {"wall_s": 11.0}}}
+    worse = {"results": {"predict": {"p50_ms": 1.5, "rows_per_s": 700.0}, "train": {"wall_s": 10.5}}}
+
+    assert compare(better, baseline, tolerance=0.2) == []
+    regressions = compare(worse, baseline, tolerance=0.2)
+    assert len(regressions) == 2
+    assert any(r.startswith("predict.p50_ms") for r in regressions)
+    assert any(r.startswith("predict.rows_per_s") for r in regressions)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from src.infra.models_store import ModelStore
+from src.infra.synthetic_data import SyntheticDataGenerator
+from src.ml.inference import FraudPredictor
+from src.usecases.train_model import TrainModelUseCase
+from src.tests.helpers import FEATURE_COLUMNS, make_training_matrix
+
+
+def test_warm_start_adds_and_drops_trees(tmp_path, payloads):
+    store = ModelStore(str(tmp_path))
+    trainer = TrainModelUseCase(store, n_estimators=10)
+    trainer.execute(SyntheticDataGenerator(fraud_ratio=0.3, seed=1).envios_frame(3_000))
+    base_version = store.current_version()
+    base_model = store.load_model()
+
+    recent = SyntheticDataGenerator(fraud_ratio=0.3, seed=2, start="2025-07-01", days=30).envios_frame(1_500)
+    metrics = trainer.execute_warm_start(recent, n_new_trees=5, max_trees=12)
+
+    warm = metrics["warm_start"]
+    assert warm["base_version"] == base_version
+    assert (warm["base_trees"], warm["new_trees"], warm["dropped_trees"], warm["total_trees"]) == (10, 5, 3, 12)
+    assert store.current_version() == warm["version"] != base_version
+    assert 0.0 <= metrics["roc_auc"] <= 1.0
+    assert set(metrics["full_refit"]) >= {"roc_auc", "fit_seconds", "roc_auc_delta", "speedup"}
+
+    model = store.load_model()
+    assert len(model.estimators_) == model.n_estimators == 12
+    assert not model.warm_start
+    # Se conservan los árboles más recientes del modelo base y se agregan los nuevos
+    for kept, original in zip(model.estimators_[:7], base_model.estimators_[3:]):
+        np.testing.assert_array_equal(kept.tree_.threshold, original.tree_.threshold)
+    # El modelo base guardado no se modificó
+    assert len(ModelStore(str(tmp_path)).load_model(base_version).estimators_) == 10
+    assert store.load_metadata()["trees_grown"] == 15
+
+    # La versión nueva se sirve normalmente (también con el motor plano)
+    assert FraudPredictor(str(tmp_path), engine="flat").predict_batch(payloads) == \
+        FraudPredictor(str(tmp_path)).predict_batch(payloads)
+
+
+def test_warm_start_without_comparison(tmp_path):
+    store = ModelStore(str(tmp_path))
+    trainer = TrainModelUseCase(store, n_estimators=4)
+    trainer.execute(SyntheticDataGenerator(fraud_ratio=0.3, seed=3).envios_frame(1_000))
+    metrics = trainer.execute_warm_start(
+        SyntheticDataGenerator(fraud_ratio=0.3, seed=4).envios_frame(800), n_new_trees=2, compare_full_refit=False
+    )
+    assert "full_refit" not in metrics
+    assert metrics["warm_start"]["total_trees"] == 6
+
+
+def test_warm_start_requires_forest(tmp_path):
+    X, y = make_training_matrix(seed=1)
+    store = ModelStore(str(tmp_path))
+    store.save_model(LogisticRegression(max_iter=1000).fit(X, y), FEATURE_COLUMNS)
+    frame = SyntheticDataGenerator(fraud_ratio=0.3).envios_frame(500)
+    with pytest.raises(ValueError):
+        TrainModelUseCase(store).execute_warm_start(frame)
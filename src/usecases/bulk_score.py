@@ -0,0 +1,265 @@
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import FeatureEngineering
+from src.features.rolling import window_columns
+from src.infra.models_store import ModelStore
+from src.infra.repository_postgres import EnviosRepository, PredictionsRepository
+from src.infra.scoring_checkpoint import ScoringCheckpoint, ScoringCheckpointStore
+from src.usecases.predict_response import PredictResponseUseCase
+
+logger = logging.getLogger(__name__)
+
+# Estado de cada proceso del pool: el modelo y los agregados se cargan una
+# sola vez por worker (initializer) y no viajan con cada bloque
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(
+    model_dir: str,
+    version: str,
+    engine: str,
+    aggregates: pd.DataFrame,
+    reference: Tuple[float, float],
+    single_thread: bool,
+) -> None:
+    from src.ml.inference import FraudPredictor
+
+    predictor = FraudPredictor(model_dir, version=version, engine=engine)
+    if single_thread and predictor.engine == "sklearn" and hasattr(predictor.model, "n_jobs"):
+        # El paralelismo lo da el pool: un hilo por proceso evita sobresuscribir los núcleos
+        predictor.model.n_jobs = 1
+    _WORKER["predictor"] = predictor
+    _WORKER["aggregates"] = aggregates
+    _WORKER["reference"] = reference
+
+
+def _score_chunk(columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Features y probabilidad de un bloque; devuelve (probabilidad, response_rate, mean_delay)."""
+    rows = FeatureEngineering.project_rows(
+        columns["client_id"], columns["sent_at"], columns["response_at"], columns["status"]
+    )
+    features = FeatureEngineering.features_from_aggregates(rows, _WORKER["aggregates"], _WORKER["reference"])
+    predictor = _WORKER["predictor"]
+    X = features[predictor.feature_columns].to_numpy(dtype=np.float64)
+    return (
+        predictor.predict_proba_matrix(X),
+        features["response_rate"].to_numpy(dtype=float),
+        features["mean_delay"].to_numpy(dtype=float),
+    )
+
+
+class _InlineExecutor(Executor):
+    """Ejecuta cada bloque en el proceso actual (workers=0: depuración y pruebas)."""
+
+    def __init__(self, initializer: Callable, initargs: Tuple) -> None:
+        initializer(*initargs)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class BulkScoringUseCase:
+    """
+    Re-scoring masivo de envíos históricos con la versión activa (o indicada)
+    del modelo.
+
+    1. Primera pasada: agregados por cliente sobre todo el rango (sumas por
+       bloque, FeatureEngineering.aggregate_clients), así las features de cada
+       bloque son las mismas que sobre el historial completo. El mayor id leído
+       queda en el checkpoint (max_id).
+    2. Segunda pasada: bloques paginados por envios_cliente.id hasta max_id que se
+       puntúan en un pool de procesos (modelo cargado una vez por worker) y
+       se escriben en orden en la tabla predicciones, con un checkpoint
+       después de cada bloque. Una corrida interrumpida se retoma con el mismo
+       run_id: se borran los bloques escritos sin checkpoint y se sigue leyendo
+       desde el último id.
+    """
+
+    def __init__(
+        self,
+        repository: EnviosRepository,
+        predictions: PredictionsRepository,
+        model_store: ModelStore,
+        checkpoints: ScoringCheckpointStore,
+        threshold: float = 0.7,
+        workers: Optional[int] = None,
+        chunk_size: int = 50_000,
+        engine: str = "sklearn",
+        version: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            threshold (float): Umbral de decisión (settings.THRESHOLD).
+            workers (Optional[int]): Procesos del pool (None = os.cpu_count(), 0 = sin pool).
+            chunk_size (int): Envíos por bloque.
+            engine (str): Motor de inferencia de FraudPredictor en cada worker ("sklearn"
+                          recorre los árboles en C y rinde más con bloques grandes).
+            version (Optional[str]): Versión del modelo (por defecto la activa).
+        """
+        self.repository = repository
+        self.predictions = predictions
+        self.model_store = model_store
+        self.checkpoints = checkpoints
+        self.threshold = threshold
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.engine = engine
+        self.version = version
+
+    def execute(
+        self,
+        sent_from: Optional[datetime] = None,
+        sent_to: Optional[datetime] = None,
+        run_id: Optional[str] = None,
+        max_chunks: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Args:
+            sent_from / sent_to: Rango [sent_from, sent_to) de sent_at a puntuar.
+            run_id (Optional[str]): Corrida a retomar; por defecto una nueva.
+            max_chunks (Optional[int]): Cortar después de escribir esta cantidad de
+                                        bloques (la corrida queda retomable).
+
+        Returns:
+            Dict[str, Any]: Resumen (filas, bloques, segundos, filas/s, checkpoint).
+
+        Raises:
+            ValueError: Si el checkpoint de run_id es de otra versión u otro rango, o si
+                        el modelo usa features de ventana (point_in_time), que los
+                        agregados por cliente no calculan.
+        """
+        version = self.version or self.model_store.current_version()
+        run_id = run_id or f"{version}-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+        checkpoint = self._load_checkpoint(run_id, version, sent_from, sent_to)
+        windowed = sorted(set(window_columns()) & set(self.model_store.load_features(version)))
+        if windowed:
+            # Puntuarlas en cero daría probabilidades incorrectas sin ningún error
+            raise ValueError(
+                f"La versión {version} usa features de ventana {windowed}: el scoring masivo no las calcula"
+            )
+        summary = {"run_id": run_id, "model_version": version, "workers": self.workers, "rows": 0, "chunks": 0}
+        if checkpoint.completed:
+            summary["checkpoint"] = vars(checkpoint)
+            return summary
+
+        self.predictions.ensure_table()
+        # Bloques escritos después del último checkpoint (corrida interrumpida)
+        summary["deleted_rows"] = self.predictions.delete_from_chunk(run_id, checkpoint.next_chunk)
+
+        started = time.perf_counter()
+        aggregates = self.checkpoints.load_aggregates(run_id)
+        if aggregates is None:
+            aggregates, checkpoint.max_id = self._aggregate(sent_from, sent_to)
+            # Primero la cota: si se corta antes de guardar los agregados, se recalculan ambos
+            self.checkpoints.save(checkpoint)
+            self.checkpoints.save_aggregates(run_id, aggregates)
+        summary["aggregate_seconds"] = time.perf_counter() - started
+        reference = FeatureEngineering.flag_reference(aggregates)
+
+        started = time.perf_counter()
+        initargs = (str(self.model_store.base_dir), version, self.engine, aggregates, reference, self.workers > 1)
+        if self.workers == 0:
+            executor: Executor = _InlineExecutor(_init_worker, initargs)
+        else:
+            executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=initargs)
+
+        # Envíos insertados después de la primera pasada no tienen agregados: quedan fuera
+        frames = self.repository.iter_keyset_frames(
+            self.chunk_size, sent_from, sent_to, after_id=checkpoint.last_id, max_id=checkpoint.max_id
+        )
+        pending: "deque[Tuple[int, pd.DataFrame, Future]]" = deque()
+        max_in_flight = max(1, self.workers) * 2
+        first_chunk = next_chunk = checkpoint.next_chunk
+        interrupted = False
+        try:
+            for frame in frames:
+                if max_chunks is not None and next_chunk - first_chunk >= max_chunks:
+                    interrupted = True
+                    break
+                columns = {c: frame[c].to_numpy() for c in ("client_id", "sent_at", "response_at", "status")}
+                pending.append((next_chunk, frame, executor.submit(_score_chunk, columns)))
+                next_chunk += 1
+                # Se escribe en orden de lectura: el checkpoint avanza de a un bloque
+                while len(pending) >= max_in_flight:
+                    self._write(checkpoint, *pending.popleft(), summary)
+            while pending:
+                self._write(checkpoint, *pending.popleft(), summary)
+            if not interrupted:
+                checkpoint.completed = True
+                self.checkpoints.save(checkpoint)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        elapsed = time.perf_counter() - started
+        summary["score_seconds"] = elapsed
+        summary["rows_per_s"] = summary["rows"] / elapsed if elapsed > 0 else 0.0
+        summary["checkpoint"] = vars(checkpoint)
+        return summary
+
+    def _load_checkpoint(
+        self, run_id: str, version: str, sent_from: Optional[datetime], sent_to: Optional[datetime]
+    ) -> ScoringCheckpoint:
+        expected = ScoringCheckpoint(
+            run_id=run_id,
+            model_version=version,
+            sent_from=sent_from.isoformat() if sent_from else None,
+            sent_to=sent_to.isoformat() if sent_to else None,
+        )
+        checkpoint = self.checkpoints.load(run_id)
+        if checkpoint is None:
+            return expected
+        for field in ("model_version", "sent_from", "sent_to"):
+            if getattr(checkpoint, field) != getattr(expected, field):
+                raise ValueError(
+                    f"El checkpoint de {run_id} tiene {field}={getattr(checkpoint, field)!r}, "
+                    f"no {getattr(expected, field)!r}"
+                )
+        return checkpoint
+
+    def _aggregate(self, sent_from: Optional[datetime], sent_to: Optional[datetime]) -> Tuple[pd.DataFrame, int]:
+        """Agregados por cliente del rango y mayor envios_cliente.id leído (0 si no hay envíos)."""
+        aggregates, max_id = pd.DataFrame(), 0
+        for frame in self.repository.iter_keyset_frames(self.chunk_size, sent_from, sent_to):
+            rows = FeatureEngineering.project_rows(
+                frame["client_id"], frame["sent_at"], frame["response_at"], frame["status"]
+            )
+            aggregates = FeatureEngineering.merge_aggregates(aggregates, FeatureEngineering.aggregate_clients(rows))
+            max_id = int(frame["envio_id"].iloc[-1])
+        return aggregates, max_id
+
+    def _write(
+        self, checkpoint: ScoringCheckpoint, chunk_id: int, frame: pd.DataFrame, future: Future, summary: Dict
+    ) -> None:
+        probability, response_rate, mean_delay = future.result()
+        is_fraud = PredictResponseUseCase.decide(probability, response_rate, mean_delay, self.threshold)
+        output = pd.DataFrame({
+            "run_id": checkpoint.run_id,
+            "model_version": checkpoint.model_version,
+            "chunk_id": chunk_id,
+            "envio_id": frame["envio_id"].to_numpy(dtype="int64"),
+            "transaction_id": frame["transaction_id"].to_numpy(),
+            "client_id": frame["client_id"].astype(str).to_numpy(),
+            "probability": probability,
+            "prediction": np.where(is_fraud, "fraude", "no_fraude"),
+            "scored_at": datetime.now(),
+        })
+        written = self.predictions.write(output)
+
+        checkpoint.next_chunk = chunk_id + 1
+        checkpoint.last_id = int(frame["envio_id"].iloc[-1])
+        checkpoint.rows_written += written
+        self.checkpoints.save(checkpoint)
+        summary["rows"] += written
+        summary["chunks"] += 1
+        logger.info(f"Bloque {chunk_id}: {written} filas (total {checkpoint.rows_written})")
@@ -1,6 +1,10 @@
-from typing import Any, Dict
+import time
+import uuid
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import numpy as np
 from src.domain.behavior import BehaviorFlags, Probability
-from src.domain.services import PredictorService
+from src.domain.services import DecisionAuditLog, DriftMonitor, PredictorService
+from src.infra.metrics import FRAUD_DECISIONS, PREDICT_ERRORS, PREDICT_REQUESTS, PREDICT_STAGE_SECONDS
 
 class PredictResponseUseCase:
     """
@@ -9,34 +13,213 @@ class PredictResponseUseCase:
        para determinar si la transacción es fraude o no.
        """
 
-    def __init__(self, predictor: PredictorService, threshold: float) -> None:
+    def __init__(
+        self,
+        predictor: PredictorService,
+        threshold: float,
+        audit: Optional[DecisionAuditLog] = None,
+        drift: Optional[DriftMonitor] = None,
+    ) -> None:
         self.predictor = predictor
         self.threshold = threshold
+        # Cada decisión se encola para auditoría y etiquetado posterior (sin I/O en la request)
+        self.audit = audit
+        # Sketches de la entrada del modelo y la probabilidad frente a la referencia de entrenamiento
+        self.drift = drift
+
+    def _audit(self, payloads: List[Dict[str, Any]], results: List[Dict[str, Any]], model_version: Any) -> None:
+        logged_at = time.time()
+        self.audit.record([
+            {
+                "decision_id": uuid.uuid4().hex,
+                "logged_at": logged_at,
+                "client_id": payload.get("client_id"),
+                "request_timestamp": payload.get("timestamp"),
+                "model_version": model_version,
+                "probability": result["probability"],
+                "threshold": self.threshold,
+                "prediction": result["prediction"],
+                "unusual_response_rate": result["behavior_flags"]["unusual_response_rate"],
+                "unusual_mean_delay": result["behavior_flags"]["unusual_mean_delay"],
+                "payload": payload,
+            }
+            for payload, result in zip(payloads, results)
+        ])
 
     def execute(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        # Behavior flags
-        behavior_flags = BehaviorFlags(
-            unusual_response_rate=payload.get("response_rate", 1.0) < 0.25,
-            unusual_mean_delay=payload.get("mean_delay", 0) > 120.0,
-        )
-
-        # Inferencia
-        result = self.predictor.predict(payload)
-        probability = Probability(result["probability"])
-
-        is_fraud = (
-                probability.is_fraud(self.threshold) or
-                behavior_flags.unusual_response_rate or
-                behavior_flags.unusual_mean_delay
-        )
-
-        result["prediction"] = "fraude" if is_fraud else "no_fraude"
-        result["threshold_used"] = self.threshold
-
-        # Adjuntar flags de comportamiento al resultado
-        result["behavior_flags"] = {
-            "unusual_response_rate": behavior_flags.unusual_response_rate,
-            "unusual_mean_delay": behavior_flags.unusual_mean_delay,
-        }
+        # Una sola referencia por llamada: un hot swap no mezcla versiones
+        predictor = self.predictor
+        version = getattr(predictor, "version", None)
+
+        # Inferencia. score() devuelve el payload efectivo (con feature store,
+        # response_rate/mean_delay son los del servidor y no los que envió el
+        # cliente) y la matriz de entrada de esta misma llamada.
+        try:
+            payload, result, inputs = predictor.score(payload)
+        except Exception:
+            PREDICT_ERRORS.inc(stage="predict")
+            raise
+
+        # Behavior flags (sobre los mismos valores que vio el modelo)
+        with PREDICT_STAGE_SECONDS.time(stage="flags", mode="single"):
+            behavior_flags = BehaviorFlags(
+                unusual_response_rate=payload.get("response_rate", 1.0) < 0.25,
+                unusual_mean_delay=payload.get("mean_delay", 0) > 120.0,
+            )
+
+        with PREDICT_STAGE_SECONDS.time(stage="decision", mode="single"):
+            probability = Probability(result["probability"])
+
+            is_fraud = (
+                    probability.is_fraud(self.threshold) or
+                    behavior_flags.unusual_response_rate or
+                    behavior_flags.unusual_mean_delay
+            )
+
+            result["prediction"] = "fraude" if is_fraud else "no_fraude"
+            result["threshold_used"] = self.threshold
+
+            # Adjuntar flags de comportamiento al resultado
+            result["behavior_flags"] = {
+                "unusual_response_rate": behavior_flags.unusual_response_rate,
+                "unusual_mean_delay": behavior_flags.unusual_mean_delay,
+            }
 
+        if self.audit is not None:
+            self._audit([payload], [result], version)
+        if self.drift is not None:
+            self.drift.record(inputs, [result["probability"]], version)
+        PREDICT_REQUESTS.inc(mode="single")
+        FRAUD_DECISIONS.inc(prediction=result["prediction"])
         return result
+
+    @staticmethod
+    def behavior_flags(response_rate: np.ndarray, mean_delay: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Flags de comportamiento vectorizados (mismas reglas que BehaviorFlags en execute)."""
+        return np.asarray(response_rate) < 0.25, np.asarray(mean_delay) > 120.0
+
+    @staticmethod
+    def decide(
+        probability: np.ndarray, response_rate: np.ndarray, mean_delay: np.ndarray, threshold: float
+    ) -> np.ndarray:
+        """Decisión final por fila: probabilidad sobre el umbral o algún flag de comportamiento."""
+        unusual_response_rate, unusual_mean_delay = PredictResponseUseCase.behavior_flags(response_rate, mean_delay)
+        return (np.asarray(probability) >= threshold) | unusual_response_rate | unusual_mean_delay
+
+    def execute_batch(self, payloads: List[Dict[str, Any]], mode: str = "batch") -> List[Dict[str, Any]]:
+        """
+        Versión vectorizada de execute(): una sola inferencia para todo el lote
+        y umbral/flags evaluados sobre arrays. Devuelve lo mismo que llamar
+        execute() con cada payload, en el mismo orden.
+
+        mode etiqueta las métricas: "batch" para /predict/batch y "micro_batch"
+        para los /predict individuales que agrupa el MicroBatcher.
+        """
+        if not payloads:
+            return []
+        predictor = self.predictor
+        version = getattr(predictor, "version", None)
+
+        # Inferencia (payloads efectivos, ver execute)
+        try:
+            payloads, results, inputs = predictor.score_batch(payloads, mode=mode)
+        except Exception:
+            PREDICT_ERRORS.inc(stage="predict")
+            raise
+
+        # Behavior flags (mismas reglas que BehaviorFlags en execute)
+        with PREDICT_STAGE_SECONDS.time(stage="flags", mode=mode):
+            response_rate = np.array([p.get("response_rate", 1.0) for p in payloads], dtype=float)
+            mean_delay = np.array([p.get("mean_delay", 0) for p in payloads], dtype=float)
+            unusual_response_rate, unusual_mean_delay = self.behavior_flags(response_rate, mean_delay)
+
+        with PREDICT_STAGE_SECONDS.time(stage="decision", mode=mode):
+            probability = np.array([r["probability"] for r in results], dtype=float)
+
+            is_fraud = (probability >= self.threshold) | unusual_response_rate | unusual_mean_delay
+
+            for i, result in enumerate(results):
+                result["prediction"] = "fraude" if is_fraud[i] else "no_fraude"
+                result["threshold_used"] = self.threshold
+                result["behavior_flags"] = {
+                    "unusual_response_rate": bool(unusual_response_rate[i]),
+                    "unusual_mean_delay": bool(unusual_mean_delay[i]),
+                }
+
+        if self.audit is not None:
+            self._audit(payloads, results, version)
+        if self.drift is not None:
+            self.drift.record(inputs, probability, version)
+        n_fraud = int(is_fraud.sum())
+        PREDICT_REQUESTS.inc(len(results), mode=mode)
+        FRAUD_DECISIONS.inc(n_fraud, prediction="fraude")
+        FRAUD_DECISIONS.inc(len(results) - n_fraud, prediction="no_fraude")
+        return results
+
+    def execute_columns(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Versión columnar de execute_batch(): recibe el lote como columnas
+        (nombre -> array) y devuelve columnas de resultado, fila por fila
+        iguales a los campos de execute_batch() (probability, prediction,
+        threshold_used y los dos flags de comportamiento).
+        """
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        predictor = self.predictor
+        version = getattr(predictor, "version", None)
+
+        # Inferencia (columnas efectivas, ver execute)
+        try:
+            columns, probability, inputs = predictor.score_columns(columns)
+            probability = np.asarray(probability, dtype=float)
+        except Exception:
+            PREDICT_ERRORS.inc(stage="predict")
+            raise
+
+        with PREDICT_STAGE_SECONDS.time(stage="flags", mode="columnar"):
+            response_rate = (
+                np.asarray(columns["response_rate"], dtype=float) if "response_rate" in columns else np.ones(n_rows)
+            )
+            mean_delay = np.asarray(columns["mean_delay"], dtype=float) if "mean_delay" in columns else np.zeros(n_rows)
+            unusual_response_rate, unusual_mean_delay = self.behavior_flags(response_rate, mean_delay)
+
+        with PREDICT_STAGE_SECONDS.time(stage="decision", mode="columnar"):
+            is_fraud = (probability >= self.threshold) | unusual_response_rate | unusual_mean_delay
+            output = {
+                "probability": probability,
+                "prediction": np.where(is_fraud, "fraude", "no_fraude"),
+                "threshold_used": np.full(n_rows, self.threshold, dtype=float),
+                "unusual_response_rate": unusual_response_rate,
+                "unusual_mean_delay": unusual_mean_delay,
+            }
+
+        if self.audit is not None and n_rows:
+            payloads = [{name: _native(values[i]) for name, values in columns.items()} for i in range(n_rows)]
+            self._audit(payloads, self.rows_from_columns(output), version)
+        if self.drift is not None and n_rows:
+            self.drift.record(inputs, probability, version)
+        n_fraud = int(is_fraud.sum())
+        PREDICT_REQUESTS.inc(n_rows, mode="columnar")
+        FRAUD_DECISIONS.inc(n_fraud, prediction="fraude")
+        FRAUD_DECISIONS.inc(n_rows - n_fraud, prediction="no_fraude")
+        return output
+
+    @staticmethod
+    def rows_from_columns(output: Mapping[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Resultado columnar de execute_columns() -> una respuesta por fila como en execute_batch()."""
+        return [
+            {
+                "probability": float(output["probability"][i]),
+                "prediction": str(output["prediction"][i]),
+                "threshold_used": float(output["threshold_used"][i]),
+                "behavior_flags": {
+                    "unusual_response_rate": bool(output["unusual_response_rate"][i]),
+                    "unusual_mean_delay": bool(output["unusual_mean_delay"][i]),
+                },
+            }
+            for i in range(len(output["probability"]))
+        ]
+
+
+def _native(value: Any) -> Any:
+    """Escalar de NumPy -> tipo de Python (para serializar el payload de auditoría)."""
+    return value.item() if isinstance(value, np.generic) else value
@@ -1,5 +1,6 @@
+from datetime import datetime
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Literal, Optional, Dict
 
 # --- Entrada ---
 class PredictRequestDTO(BaseModel):
@@ -17,6 +18,12 @@ class PredictRequestDTO(BaseModel):
     response_rate: float
     mean_delay: float
 
+class ClientEventDTO(BaseModel):
+    client_id: str
+    event: Literal["send", "response"]
+    delay_seconds: Optional[float] = None  # requerido para event="response"
+    timestamp: Optional[datetime] = None  # fecha del evento (por defecto ahora), para las features por ventana
+
 # --- Salida ---
 class PredictResponseDTO(BaseModel):
     prediction: str
@@ -1,5 +1,10 @@
-from typing import List, Dict, Any
+import copy
+import time
+import warnings
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 import numpy as np
+import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import roc_auc_score, classification_report
@@ -7,8 +12,18 @@ from pathlib import Path
 import joblib
 
 from src.domain.entities import EnviosCliente
+from src.domain.envios_batch import EnviosBatch
 from src.features.feature_engineering import FeatureEngineering
+from src.features.rolling import window_columns
+from src.infra.metrics import TRAIN_STAGE_SECONDS
 from src.infra.models_store import ModelStore
+from src.infra.training_state import TrainingState, TrainingStateStore
+from src.ml.compaction import CompactionConfig, ForestCompactor
+from src.ml.drift import DriftReference
+
+
+# Envíos recientes que el entrenamiento incremental relee en cada corrida (respuestas tardías)
+DEFAULT_INCREMENTAL_LOOKBACK = pd.Timedelta(days=7)
 
 
 class TrainModelUseCase:
@@ -17,55 +32,397 @@ class TrainModelUseCase:
     Orquesta: extracción de features, entrenamiento, evaluación y persistencia.
     """
 
+    BACKENDS = ("random_forest", "lightgbm")
+
+    FEATURE_COLUMNS = [
+        "hour", "weekday", "total_sent_agg",
+        "response_rate", "mean_delay",
+        "unusual_response_rate", "unusual_mean_delay"
+    ]
+
     def __init__(
         self,
         model_store: ModelStore,
         n_estimators: int = 200,
         random_state: int = 42,
         test_size: float = 0.2,
+        backend: str = "random_forest",
+        compaction: Optional[CompactionConfig] = None,
+        threshold: float = 0.7,
+        point_in_time: bool = False,
     ):
+        """
+        Args:
+            compaction (Optional[CompactionConfig]): Si se indica, después de
+                guardar el bosque completo se guarda también su versión compacta
+                (que queda activa) y se reporta la fidelidad en metrics["compaction"].
+            threshold (float): Umbral de decisión (settings.THRESHOLD) para medir
+                la concordancia del modelo compacto.
+            point_in_time (bool): Agregar las features por ventana (1h, 24h, 7d)
+                calculadas a la fecha de cada envío, sin información futura
+                (FeatureEngineering.point_in_time_features). En línea las
+                calcula RollingFeatureStore. Solo aplica a execute.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend}. Opciones: {self.BACKENDS}")
+        if compaction is not None and backend != "random_forest":
+            raise ValueError("La compactación solo aplica al backend random_forest")
+        self.backend = backend
+        self.compaction = compaction
+        self.threshold = threshold
         self.model_store = model_store
         self.n_estimators = n_estimators
         self.random_state = random_state
         self.test_size = test_size
+        self.point_in_time = point_in_time
+        self.feature_columns = self.FEATURE_COLUMNS + (window_columns() if point_in_time else [])
 
-    def execute(self, envios: List[EnviosCliente]) -> Dict[str, Any]:
-        if not envios:
+    def execute(self, envios: Union[List[EnviosCliente], EnviosBatch, pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Args:
+            envios: Lista de EnviosCliente, EnviosBatch (EnviosRepository.fetch_batch)
+                    o DataFrame columnar (ver EnviosRepository.fetch_frame).
+        """
+        if len(envios) == 0:
             raise ValueError("No hay envíos para entrenar el modelo.")
 
+        stage_seconds: Dict[str, float] = {}
         # --- Feature engineering ---
-        features_df = FeatureEngineering.compute_features(envios)
-        feature_columns = [
-            "hour", "weekday", "total_sent_agg",
-            "response_rate", "mean_delay",
-            "unusual_response_rate", "unusual_mean_delay"
-        ]
-        X = features_df[feature_columns]
-        y = features_df["status"].apply(lambda s: 1 if s in ["alert", "declined"] else 0)
+        with self._stage("features", stage_seconds):
+            if isinstance(envios, pd.DataFrame):
+                features_df = FeatureEngineering.compute_features_from_frame(envios)
+            else:
+                features_df = FeatureEngineering.compute_features(envios)
+            if self.point_in_time:
+                features_df = pd.concat(
+                    [features_df.reset_index(drop=True), FeatureEngineering.point_in_time_features(envios)], axis=1
+                )
+        return self._fit_and_persist(features_df, stage_seconds)
 
-        # --- División train/test ---
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=self.test_size, random_state=self.random_state, stratify=y
+    def execute_features(self, features_df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Entrena con una matriz de features ya calculada (columnas de
+        FeatureEngineering.COLUMNS), p. ej. compute_features_from_projection
+        con la agregación por cliente resuelta en la base.
+        """
+        if features_df.empty:
+            raise ValueError("No hay envíos para entrenar el modelo.")
+        return self._fit_and_persist(features_df)
+
+    def execute_incremental(
+        self,
+        new_envios: pd.DataFrame,
+        state_store: TrainingStateStore,
+        full_rebuild: bool = False,
+        lookback: pd.Timedelta = DEFAULT_INCREMENTAL_LOOKBACK,
+        max_rows: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Entrenamiento incremental: combina solo los envíos posteriores al
+        watermark (ver EnviosRepository.fetch_frame(sent_after=...)) con los
+        agregados por cliente guardados en disco, y entrena con la matriz
+        resultante. Con full_rebuild=True se ignora el estado previo y
+        new_envios debe ser el historial completo (sirve para verificar que el
+        camino incremental da el mismo resultado).
+
+        Un envío se lee antes de que el cliente responda: los envíos de las
+        últimas `lookback` (respecto del mayor sent_at leído) se usan para
+        entrenar pero no se consolidan en el estado, así la corrida siguiente
+        los vuelve a leer con su respuesta. lookback debe cubrir la demora
+        máxima de respuesta y de carga de los envíos en la base.
+
+        Args:
+            new_envios (pd.DataFrame): Envíos en formato columnar (client_id,
+                                       sent_at, response_at, status).
+            state_store (TrainingStateStore): Dónde se guarda watermark y agregados.
+            full_rebuild (bool): Recalcular todo desde cero.
+            lookback (pd.Timedelta): Ventana de envíos que se releen en cada corrida.
+            max_rows (Optional[int]): Máximo de envíos (los más recientes) en la matriz de
+                                      entrenamiento y en el estado. Los agregados por cliente
+                                      siguen cubriendo todo el historial; acota el costo del
+                                      fit, que si no crece con el historial completo.
+        """
+        if self.point_in_time:
+            raise ValueError("El entrenamiento incremental no admite features point-in-time")
+        stage_seconds: Dict[str, float] = {}
+        with self._stage("features", stage_seconds):
+            previous = TrainingState() if full_rebuild else state_store.load()
+            state = self.merge_new_envios(previous, new_envios)
+            if state.rows.empty:
+                raise ValueError("No hay envíos para entrenar el modelo.")
+            features_df = self._incremental_features(state, max_rows)
+        metrics = self._fit_and_persist(features_df, stage_seconds)
+
+        # Solo se consolida lo que ya no puede cambiar; el estado se guarda si el entrenamiento terminó bien
+        settled = previous
+        if not new_envios.empty:
+            sent_at = pd.to_datetime(new_envios["sent_at"])
+            settled = self.merge_new_envios(previous, new_envios[(sent_at <= sent_at.max() - lookback).to_numpy()])
+        if max_rows is not None and len(settled.rows) > max_rows:
+            settled.rows = settled.rows.iloc[-max_rows:].reset_index(drop=True)
+        state_store.save(settled)
+        metrics["incremental"] = {
+            "full_rebuild": full_rebuild,
+            "new_rows": int(len(new_envios)),
+            "total_rows": int(len(features_df)),
+            "settled_rows": int(settled.aggregates["total_sent"].sum()) if not settled.aggregates.empty else 0,
+            "clients": int(len(state.aggregates)),
+            "watermark": settled.watermark.isoformat() if settled.watermark is not None else None,
+        }
+        return metrics
+
+    @staticmethod
+    def _incremental_features(state: TrainingState, max_rows: Optional[int]) -> pd.DataFrame:
+        if max_rows is None or len(state.rows) <= max_rows:
+            return FeatureEngineering.features_from_aggregates(state.rows, state.aggregates)
+        # Flags con los promedios de todo el historial, no solo de las filas que quedan
+        return FeatureEngineering.features_from_aggregates(
+            state.rows.iloc[-max_rows:].reset_index(drop=True), state.aggregates,
+            reference=FeatureEngineering.flag_reference(state.aggregates),
         )
 
-        # --- Entrenamiento ---
-        clf = RandomForestClassifier(
+    @staticmethod
+    def merge_new_envios(state: TrainingState, new_envios: pd.DataFrame) -> TrainingState:
+        """Agrega los envíos nuevos al estado: proyección por fila, sumas por cliente y watermark."""
+        if new_envios.empty:
+            return state
+
+        new_rows = FeatureEngineering.project_rows(
+            new_envios["client_id"], new_envios["sent_at"], new_envios["response_at"], new_envios["status"]
+        )
+        aggregates = FeatureEngineering.merge_aggregates(
+            state.aggregates, FeatureEngineering.aggregate_clients(new_rows)
+        )
+        rows = new_rows if state.rows.empty else pd.concat(
+            [state.rows.astype({"client_id": object, "status": object}), new_rows], ignore_index=True
+        )
+        watermark = pd.to_datetime(new_envios["sent_at"]).max()
+        if state.watermark is not None:
+            watermark = max(watermark, state.watermark)
+        return TrainingState(watermark=watermark, aggregates=aggregates, rows=rows)
+
+    @staticmethod
+    @contextmanager
+    def _stage(name: str, stage_seconds: Dict[str, float]) -> Iterator[None]:
+        """Mide una etapa del entrenamiento: la guarda en stage_seconds y en TRAIN_STAGE_SECONDS."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stage_seconds[name] = elapsed
+            TRAIN_STAGE_SECONDS.observe(elapsed, stage=name)
+
+    def _split(self, features_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+        X = features_df[self.feature_columns]
+        y = features_df["status"].apply(lambda s: 1 if s in ["alert", "declined"] else 0)
+        return train_test_split(X, y, test_size=self.test_size, random_state=self.random_state, stratify=y)
+
+    def _new_model(self) -> Any:
+        """Clasificador sin entrenar del backend configurado."""
+        if self.backend == "lightgbm":
+            try:
+                from lightgbm import LGBMClassifier
+            except ImportError as exc:
+                raise ImportError("El backend 'lightgbm' requiere instalar lightgbm (requirements.txt)") from exc
+            # Árboles por histogramas: escala a millones de filas y cada predicción es barata
+            return LGBMClassifier(
+                n_estimators=self.n_estimators,
+                learning_rate=0.05,
+                num_leaves=31,
+                class_weight="balanced",
+                random_state=self.random_state,
+                n_jobs=-1,
+                verbose=-1,
+            )
+        return self._new_forest()
+
+    def _new_forest(self) -> RandomForestClassifier:
+        return RandomForestClassifier(
             n_estimators=self.n_estimators,
             random_state=self.random_state,
             class_weight="balanced_subsample",
             n_jobs=-1,
         )
-        clf.fit(X_train, y_train)
 
-        # --- Evaluación ---
+    @staticmethod
+    def _evaluate(clf: Any, X_test: pd.DataFrame, y_test: pd.Series) -> Dict[str, Any]:
         preds_proba = clf.predict_proba(X_test)[:, 1]
         preds = clf.predict(X_test)
-        metrics = {
+        return {
             "roc_auc": float(roc_auc_score(y_test, preds_proba)),
             "classification_report": classification_report(y_test, preds, output_dict=True),
         }
 
+    @staticmethod
+    def _drift_reference(model: Any, feature_columns: List[str], X_train: Any, X_test: Any) -> Dict[str, Any]:
+        """Referencia del monitor de drift: features de entrenamiento y probabilidad sobre el holdout."""
+        X_train = np.asarray(X_train, dtype=float)
+        probabilities = model.predict_proba(np.asarray(X_test, dtype=float))[:, 1]
+        return DriftReference.build(feature_columns, X_train, probabilities).to_dict()
+
+    def _fit_and_persist(self, features_df: pd.DataFrame, stage_seconds: Dict[str, float] = None) -> Dict[str, Any]:
+        stage_seconds = {} if stage_seconds is None else stage_seconds
+        feature_columns = self.feature_columns
+
+        # --- División train/test ---
+        with self._stage("split", stage_seconds):
+            X_train, X_test, y_train, y_test = self._split(features_df)
+
+        # --- Entrenamiento ---
+        with self._stage("fit", stage_seconds):
+            clf = self._new_model()
+            clf.fit(X_train, y_train)
+
+        # --- Evaluación ---
+        with self._stage("evaluate", stage_seconds):
+            metrics = self._evaluate(clf, X_test, y_test)
+
         # --- Persistencia ---
-        self.model_store.save_model(clf, feature_columns)
+        with self._stage("persist", stage_seconds):
+            metrics["version"] = self.model_store.save_model(
+                clf, feature_columns, metadata={"backend": self.backend, "roc_auc": metrics["roc_auc"]},
+                drift_reference=self._drift_reference(clf, feature_columns, X_train, X_test),
+            )
+
+        metrics["backend"] = self.backend
+        if self.compaction is not None:
+            with self._stage("compact", stage_seconds):
+                metrics["compaction"] = self._compact(clf, metrics["version"], X_train, X_test, y_test)
+        metrics["stage_seconds"] = stage_seconds
+        return metrics
+
+    def _compact(
+        self, clf: Any, base_version: str, X_train: pd.DataFrame, X_test: pd.DataFrame, y_test: pd.Series
+    ) -> Dict[str, Any]:
+        """Compacta el bosque entrenado y lo guarda como versión nueva (activa) del ModelStore."""
+        compactor = ForestCompactor(self.compaction, threshold=self.threshold, random_state=self.random_state)
+        compact, report = compactor.compact(clf, X_train.to_numpy(), X_test.to_numpy(), y_test.to_numpy())
+        report["base_version"] = base_version
+        report["version"] = self.model_store.save_model(
+            compact,
+            self.feature_columns,
+            metadata={
+                "backend": self.backend,
+                # FlatForest de solo lectura: el warm start no puede agregarle árboles
+                "compacted": True,
+                "compacted_from": base_version,
+                "compaction": report["config"],
+                "fidelity": report["fidelity"],
+            },
+            drift_reference=self._drift_reference(compact, self.feature_columns, X_train, X_test),
+        )
+        return report
+
+    def execute_warm_start(
+        self,
+        recent_envios: Union[List[EnviosCliente], EnviosBatch, pd.DataFrame],
+        n_new_trees: int = 50,
+        max_trees: Optional[int] = None,
+        compare_full_refit: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Crecimiento incremental del bosque: carga el modelo activo del
+        ModelStore, le agrega n_new_trees árboles entrenados solo con los
+        envíos recientes (warm_start de sklearn) y, si se indica max_trees,
+        descarta los árboles más antiguos para acotar el tamaño del ensamble.
+
+        Args:
+            recent_envios: Envíos recientes (lista de entidades, EnviosBatch o DataFrame columnar).
+            n_new_trees (int): Árboles nuevos a agregar.
+            max_trees (Optional[int]): Tamaño máximo del ensamble; se quitan primero los más antiguos.
+            compare_full_refit (bool): Entrenar además un bosque completo (n_estimators
+                                       árboles) sobre el mismo split y reportar ambos.
+
+        Returns:
+            Dict[str, Any]: Métricas del modelo incremental sobre el holdout de los datos
+                            recientes; en "full_refit" las del reentrenamiento completo.
+
+        Raises:
+            ValueError: Si no hay modelo activo compatible o los datos no alcanzan.
+        """
+        if n_new_trees <= 0:
+            raise ValueError("n_new_trees debe ser positivo")
+        if self.point_in_time:
+            raise ValueError("El warm start no admite features point-in-time")
+        if len(recent_envios) == 0:
+            raise ValueError("No hay envíos para entrenar el modelo.")
+
+        current_version = self.model_store.current_version()
+        meta = self.model_store.load_metadata(current_version)
+        if meta.get("compacted"):
+            raise ValueError(
+                f"La versión activa {current_version} es un bosque compactado de {meta.get('compacted_from')}: "
+                "el warm start necesita el bosque completo (activar esa versión o reentrenar)"
+            )
+        base = self.model_store.load_model(current_version)
+        if not isinstance(base, RandomForestClassifier):
+            raise ValueError(f"El modelo activo ({type(base).__name__}) no admite crecimiento incremental")
+        if list(self.model_store.load_features(current_version)) != self.FEATURE_COLUMNS:
+            raise ValueError("Las features del modelo activo no coinciden con las de entrenamiento")
+
+        stage_seconds: Dict[str, float] = {}
+        with self._stage("features", stage_seconds):
+            if isinstance(recent_envios, pd.DataFrame):
+                features_df = FeatureEngineering.compute_features_from_frame(recent_envios)
+            else:
+                features_df = FeatureEngineering.compute_features(recent_envios)
+        with self._stage("split", stage_seconds):
+            X_train, X_test, y_train, y_test = self._split(features_df)
+
+        # --- Árboles nuevos sobre el modelo activo (copia: no se toca el cache del store) ---
+        with self._stage("fit", stage_seconds):
+            clf = copy.deepcopy(base)
+            n_old = len(clf.estimators_)
+            # Semilla distinta por ronda: con árboles descartados, la secuencia original
+            # repetiría semillas de árboles que siguen en el ensamble
+            trees_grown = int(meta.get("trees_grown", n_old))
+            clf.set_params(warm_start=True, n_estimators=n_old + n_new_trees,
+                           random_state=self.random_state + trees_grown)
+            with warnings.catch_warnings():
+                # class_weight se calcula sobre los datos recientes: es lo buscado
+                warnings.filterwarnings("ignore", message=".*class_weight presets.*")
+                clf.fit(X_train, y_train)
+            dropped = 0
+            if max_trees is not None and len(clf.estimators_) > max_trees:
+                dropped = len(clf.estimators_) - max_trees
+                clf.estimators_ = clf.estimators_[dropped:]
+            clf.set_params(warm_start=False, n_estimators=len(clf.estimators_))
+        fit_seconds = stage_seconds["fit"]
+
+        with self._stage("evaluate", stage_seconds):
+            metrics = self._evaluate(clf, X_test, y_test)
+
+        warm_start = {
+            "base_version": current_version,
+            "base_trees": n_old,
+            "new_trees": n_new_trees,
+            "dropped_trees": dropped,
+            "total_trees": len(clf.estimators_),
+            "fit_seconds": fit_seconds,
+        }
+        if compare_full_refit:
+            with self._stage("full_refit", stage_seconds):
+                started = time.perf_counter()
+                full = self._new_forest().fit(X_train, y_train)
+                full_seconds = time.perf_counter() - started
+                full_metrics = self._evaluate(full, X_test, y_test)
+            metrics["full_refit"] = {
+                "roc_auc": full_metrics["roc_auc"],
+                "n_estimators": self.n_estimators,
+                "fit_seconds": full_seconds,
+                "roc_auc_delta": metrics["roc_auc"] - full_metrics["roc_auc"],
+                "speedup": full_seconds / fit_seconds if fit_seconds else None,
+            }
 
-        return metrics
\ No newline at end of file
+        with self._stage("persist", stage_seconds):
+            version = self.model_store.save_model(clf, self.FEATURE_COLUMNS, metadata={
+                "training": "warm_start",
+                "trees_grown": trees_grown + n_new_trees,
+                **{k: v for k, v in warm_start.items() if k != "fit_seconds"},
+                "roc_auc": metrics["roc_auc"],
+            }, drift_reference=self._drift_reference(clf, self.FEATURE_COLUMNS, X_train, X_test))
+        warm_start["version"] = version
+        metrics["warm_start"] = warm_start
+        metrics["stage_seconds"] = stage_seconds
+        return metrics